@@ -0,0 +1,77 @@
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')  # Charts are only saved, never shown
+
+from analysis.aggregates import AggregateStore, default_store_path
+from analysis.engine import ReportEngine
+from analysis.query import ProductDatabase, default_database_path
+from analysis.reports import reports
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the analysis reports (CSV summaries and charts) in one pass over the dataset.")
+    parser.add_argument('dataset', nargs='?',
+                        help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+    parser.add_argument('--output-dir', default=None,
+                        help="Folder for the report files (default: the dataset's folder)")
+    parser.add_argument('--reports', nargs='+', choices=list(reports), default=None, metavar='REPORT',
+                        help="Reports to build (default: all; see --list)")
+    parser.add_argument('--render-workers', type=int, default=0,
+                        help="Processes that draw the charts while the reports compute (default: 0, draw in this process)")
+    parser.add_argument('--scatter', choices=['density', 'points'], default='density',
+                        help="Ratings vs. reviews charts as a density chart, or one point per product (small samples only)")
+    parser.add_argument('--log-reviews', action='store_true',
+                        help="Put review counts on a log scale in the ratings vs. reviews charts")
+    parser.add_argument('--aggregates', nargs='?', const='', default=None, metavar='STORE',
+                        help="Fold new dataset rows into an incremental aggregate store and read the seller, category, "
+                             "status and discount tier summaries from it (default store: <dataset>.aggregates.sqlite3)")
+    parser.add_argument('--database', nargs='?', const='', default=None, metavar='DATABASE',
+                        help="Run the reports as queries against an indexed SQLite copy of the dataset, loading it first "
+                             "if the dataset changed (default database: <dataset>.products.sqlite3)")
+    parser.add_argument('--chunksize', type=int, default=None, metavar='ROWS',
+                        help="Stream the top-k, price distribution and rating reports through the dataset ROWS rows at a "
+                             "time with bounded memory, for datasets larger than memory (default: load the dataset)")
+    parser.add_argument('--list', action='store_true',
+                        help="List the available reports and exit")
+    args = parser.parse_args()
+    if not args.list and args.dataset is None:
+        parser.error("the dataset path is required")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.list:
+        for name in reports:
+            print(name)
+    else:
+        start = time.perf_counter()
+        store = None
+        if args.aggregates is not None:
+            store = AggregateStore(args.aggregates or default_store_path(args.dataset), args.dataset)
+            rows = store.update()
+            print(f"Folded {rows:,} new rows into {store.path} in {time.perf_counter() - start:.2f}s")
+        database = None
+        if args.database is not None:
+            loading = time.perf_counter()
+            database = ProductDatabase(args.database or default_database_path(args.dataset), args.dataset)
+            rows = database.update()
+            if rows:
+                print(f"Loaded {rows:,} rows into {database.path} in {time.perf_counter() - loading:.2f}s")
+
+        engine = ReportEngine(args.dataset, args.reports or list(reports), args.output_dir,
+                              render_workers=args.render_workers, scatter=args.scatter, log_reviews=args.log_reviews,
+                              store=store, chunksize=args.chunksize, database=database)
+        timings = engine.run()
+        if store is not None:
+            store.close()
+        if database is not None:
+            database.close()
+
+        print(f"\n{'Report':36} {'Seconds':>8}")
+        for name, seconds in timings.items():
+            print(f"{name:36} {seconds:8.2f}")
+        print(f"\n{len(engine.outputs)} files written in {time.perf_counter() - start:.2f}s:")
+        for path in engine.outputs:
+            print(f" - {path}")
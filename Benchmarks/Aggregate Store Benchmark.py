@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(script_dir))
+
+from analysis import reports
+from analysis.aggregates import AggregateStore, store_frames
+from analysis.dataset import load_dataset
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+# The summaries the store keeps, computed from the rows as the reports do without a store
+def recompute(path):
+    df = load_dataset(path, ['Seller', 'Category', 'Status', 'Discount', 'Product', 'Sale Price USD', 'Stars'])
+    return {
+        'seller_counts': reports.seller_counts(df),
+        'status_counts': reports.status_counts(df),
+        'category_prices': reports.category_prices(df),
+        'seller_summary': reports.seller_summary(reports.rated(df)),
+        'availability_by_discount': reports.availability_by_discount(reports.bitmaps(df)),
+    }
+
+# Seller, category, status and discount tier summaries: recomputed from the rows versus read from
+# the aggregate store, and the cost of folding in an appended batch of rows
+parser = argparse.ArgumentParser(description="Compare recomputing report summaries with reading them from the aggregate store.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+parser.add_argument('--batch', type=int, default=50, help="Rows in the appended batch (about one scraped listing page)")
+args = parser.parse_args()
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    # Start from the dataset minus its last rows, then append them as the scraper would
+    source = os.path.join(temp_dir, 'products.csv')
+    df = pd.read_csv(args.dataset)
+    df.iloc[:-args.batch].to_csv(source, index=False)
+    store = AggregateStore(os.path.join(temp_dir, 'aggregates.sqlite3'), source)
+    _, build_seconds = timed(store.update)
+    with open(source, 'a', newline='', encoding='utf-8') as f:
+        df.iloc[-args.batch:].to_csv(f, index=False, header=False)
+    folded, fold_seconds = timed(store.update)
+
+    load_dataset(source)  # Cache the typed copy so the recompute doesn't include CSV parsing
+    expected, recompute_seconds = timed(lambda: recompute(source))
+    actual, read_seconds = timed(lambda: {name: frame(store) for name, frame in store_frames.items()})
+    store.close()
+
+mismatched = []
+for name, frame in expected.items():
+    try:
+        if isinstance(frame, pd.Series):
+            pd.testing.assert_series_equal(actual[name], frame, check_dtype=False, check_index_type=False,
+                                           check_categorical=False, check_names=False)
+        else:
+            pd.testing.assert_frame_equal(actual[name], frame, check_dtype=False, check_index_type=False,
+                                          check_categorical=False, check_names=False, check_column_type=False)
+    except AssertionError:
+        mismatched.append(name)
+
+print(f"{f'Build the store from {len(df) - args.batch:,} rows:':40} {build_seconds:8.3f}s")
+print(f"{f'Fold in {folded:,} appended rows:':40} {fold_seconds:8.3f}s")
+print(f"{'Recompute the summaries from the rows:':40} {recompute_seconds:8.3f}s")
+print(f"{'Read the summaries from the store:':40} {read_seconds:8.3f}s")
+print(f"Summaries that differ: {len(mismatched)}" + (f" ({', '.join(mismatched)})" if mismatched else ""))
+
+sys.exit(1 if mismatched else 0)
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Make the analysis package importable when running from the Benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from analysis.bitmaps import BitmapIndex, bitmap_columns
+from analysis.dataset import load_dataset
+from analysis.pricing import discount_tiers
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+# Filter mask of the rows matching `where`, scanning the frame
+def frame_mask(df, where):
+    mask = pd.Series(True, index=df.index)
+    for column, value in where.items():
+        mask &= df[column].isin(value if isinstance(value, list) else [value])
+    return mask
+
+# Cross-tabs and filtered counts the reports and drill-downs ask for, answered by scanning the
+# frame with pandas (as the scripts did) and from the bitmap index built once over the frame
+def questions(df):
+    category = df['Category'].mode()[0]
+    available = ['Available', 'Out of Stock', 'Limited Availability']
+    return [
+        ("Status share per discount tier",
+         lambda: df.groupby('Discount Tier', observed=True)['Status'].value_counts(normalize=True).unstack().fillna(0),
+         lambda index: (lambda counts: counts.div(counts.sum(axis=1), axis=0))(index.crosstab('Discount Tier', 'Status'))),
+        ("Status x shipping, known statuses",
+         lambda: df[frame_mask(df, {'Status': available})].pivot_table(index='Status', columns='Shipping', aggfunc='size',
+                                                                       observed=True, fill_value=0),
+         lambda index: index.crosstab('Status', 'Shipping', where={'Status': available})),
+        (f"Status x shipping in {category}",
+         lambda: df[df['Category'] == category].pivot_table(index='Status', columns='Shipping', aggfunc='size',
+                                                            observed=True, fill_value=0),
+         lambda index: index.crosstab('Status', 'Shipping', where={'Category': category})),
+        (f"Free shipping, in stock, {category}",
+         lambda: int(frame_mask(df, {'Shipping': 'Free Shipping', 'Status': 'Available', 'Category': category}).sum()),
+         lambda index: index.count({'Shipping': 'Free Shipping', 'Status': 'Available', 'Category': category})),
+        ("Products per category, discounted",
+         lambda: df[df['Discount Tier'].notna()]['Category'].value_counts().sort_index().loc[lambda counts: counts > 0],
+         lambda index: index.counts('Category', where={'Discount Tier': index.values['Discount Tier']})),
+    ]
+
+# Whether two answers agree: counts exactly, shares to rounding
+def same(expected, result):
+    if isinstance(expected, pd.DataFrame):
+        expected, result = expected.astype(float), result.astype(float)
+        return expected.shape == result.shape and ((expected - result.loc[expected.index, expected.columns]).abs() < 1e-12).all().all()
+    if isinstance(expected, pd.Series):
+        return list(expected.index.astype(str)) == list(result.index.astype(str)) and (expected.to_numpy() == result.to_numpy()).all()
+    return expected == result
+
+parser = argparse.ArgumentParser(description="Compare pandas scans with bitmap index lookups for filtered counts and cross-tabs.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+parser.add_argument('--repeat', type=int, default=5, help="Runs of each question (the fastest is reported)")
+args = parser.parse_args()
+
+df = load_dataset(args.dataset, ['Status', 'Shipping', 'Category', 'Discount'])
+df['Discount Tier'] = discount_tiers(df['Discount'])
+index, build_seconds = timed(lambda: BitmapIndex(df, bitmap_columns), 1)
+print(f"{len(df):,} rows, bitmap index built in {build_seconds * 1000:.1f} ms "
+      f"({sum(bitmaps.nbytes for bitmaps in index.bitmaps.values()) / 1024:,.0f} KiB)\n")
+
+print(f"{'Question':40} {'pandas ms':>10} {'Bitmap ms':>10} {'Speedup':>8} {'Same':>5}")
+for description, scan, lookup in questions(df):
+    expected, scan_seconds = timed(scan, args.repeat)
+    result, lookup_seconds = timed(lambda: lookup(index), args.repeat)
+    print(f"{description[:40]:40} {scan_seconds * 1000:10.2f} {lookup_seconds * 1000:10.2f} "
+          f"{scan_seconds / lookup_seconds:7.1f}x {str(same(expected, result)):>5}")
@@ -0,0 +1,55 @@
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(script_dir))
+
+from analysis.dataset import cached_copy
+from analysis.engine import ReportEngine
+from analysis.reports import reports
+
+# Wall-clock time of the full report set with the charts drawn in this process versus in a
+# pool of render workers, and whether both produce the same files
+parser = argparse.ArgumentParser(description="Compare serial and parallel chart rendering for the full report set.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+parser.add_argument('--render-workers', type=int, default=os.cpu_count(), help="Processes for the parallel run")
+parser.add_argument('--repeat', type=int, default=3, help="Runs of each mode; the fastest is reported")
+args = parser.parse_args()
+
+cached_copy(args.dataset)  # Build the cached copy first so both modes start from it
+
+def run(output_dir, render_workers):
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        engine = ReportEngine(args.dataset, list(reports), output_dir, render_workers=render_workers)
+        with contextlib.redirect_stdout(io.StringIO()):  # The reports' printed tables
+            engine.run()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return engine.outputs, best
+
+with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+    outputs, serial_seconds = run(serial_dir, 0)
+    _, parallel_seconds = run(parallel_dir, args.render_workers)
+    names = [os.path.basename(path) for path in outputs]
+    _, different, missing = filecmp.cmpfiles(serial_dir, parallel_dir, names, shallow=False)
+
+charts = sum(name.endswith('.png') for name in names)
+print(f"{len(reports)} reports, {charts} charts, {len(names) - charts} CSVs")
+print(f"Serial rendering:                {serial_seconds:7.2f}s")
+print(f"Parallel rendering ({args.render_workers:2d} workers): {parallel_seconds:7.2f}s ({serial_seconds / parallel_seconds:.1f}x)")
+print(f"Files that differ: {len(different) + len(missing)}" + (f" ({', '.join(different + missing)})" if different or missing else ""))
+
+sys.exit(1 if different or missing else 0)
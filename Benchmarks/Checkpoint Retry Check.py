@@ -0,0 +1,59 @@
+import contextlib
+import csv
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+from urllib.parse import urlparse
+
+# Make the scraper package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(script_dir)
+sys.path.insert(0, repo_dir)
+
+from scraper.fakesite import FakeSite
+
+spec = importlib.util.spec_from_file_location('scraper_script', os.path.join(repo_dir, 'Mercado Libre Scraper.py'))
+scraper = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scraper)
+
+# Paths of the product URLs in the scraper's CSV, one per row
+def scraped_paths():
+    with open(scraper.csv_file, newline='', encoding='utf-8') as f:
+        return [urlparse(row['Product URL']).path for row in csv.DictReader(f)]
+
+# Crawl the fake site with the scraper script's main(), its printouts hidden
+def crawl():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.main(rate=1000, host_rate=1000)
+
+# Check that a product that gave up after retries is scraped by the next run: the first run gets
+# only 5xx answers for one product, the second run finds the site healthy again and must scrape
+# that product (and nothing twice), although every listing page was finished by the first run
+failures = []
+
+def check(passed, description):
+    print(f"{'ok  ' if passed else 'FAIL'} {description}")
+    if not passed:
+        failures.append(description)
+
+with tempfile.TemporaryDirectory() as scratch, FakeSite(max_pages=2, products_per_page=5) as site:
+    for name in ['last_page_file', 'checkpoint_file', 'seen_index_file', 'csv_file', 'parquet_dir']:
+        setattr(scraper, name, os.path.join(scratch, os.path.basename(getattr(scraper, name))))
+    scraper.base_url = site.base_url
+    scraper.max_retries = 1
+    broken = urlparse(site.product_url(1, 2)).path
+
+    site.break_path(broken, 503)
+    crawl()
+    paths = scraped_paths()
+    check(len(paths) == 9 and broken not in paths, f"the first run scrapes 9 of 10 products ({len(paths)})")
+
+    site.repair_path(broken)
+    crawl()
+    paths = scraped_paths()
+    check(broken in paths, "the second run scrapes the product that failed")
+    check(len(paths) == len(set(paths)) == 10, f"every product is in the CSV once ({len(paths)} rows)")
+
+sys.exit(1 if failures else 0)
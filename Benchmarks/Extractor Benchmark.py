@@ -0,0 +1,62 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import statistics
+import sys
+import time
+
+# Make the scraper package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(script_dir))
+
+from scraper.extract import extractors
+
+# Parity check and per-page parse-time benchmark for the extractor backends.
+# Every backend must return exactly the same dict as the 'bs4' reference on each saved page.
+parser = argparse.ArgumentParser(description="Compare the product page extractor backends.")
+parser.add_argument('fixtures', nargs='?', default=os.path.join(script_dir, 'Fixtures'),
+                    help="Directory of saved product page HTML files")
+parser.add_argument('--repeat', type=int, default=50, help="Parses per page and backend")
+args = parser.parse_args()
+
+pages = {}
+for path in sorted(glob.glob(os.path.join(args.fixtures, '*.html'))):
+    with open(path, encoding='utf-8') as f:
+        pages[os.path.basename(path)] = f.read()
+if not pages:
+    print(f"No .html files found in {args.fixtures}")
+    sys.exit(1)
+
+# Parity: compare every field of every backend against the reference
+mismatches = 0
+with contextlib.redirect_stdout(io.StringIO()):  # Silence the "Star rating not available" notes
+    reference = {name: extractors['bs4'](page, name) for name, page in pages.items()}
+    results = {backend: {name: extract(page, name) for name, page in pages.items()}
+               for backend, extract in extractors.items() if backend != 'bs4'}
+for backend, backend_results in results.items():
+    for name, details in backend_results.items():
+        for field, expected in reference[name].items():
+            if details.get(field) != expected:
+                mismatches += 1
+                print(f"[{backend}] {name} - {field}: expected {expected!r}, got {details.get(field)!r}")
+print(f"Parity: {len(pages)} pages, {len(results)} backend(s) compared with bs4, {mismatches} mismatched fields")
+
+# Timing: median parse time per page for each backend
+timings = {}
+for backend, extract in extractors.items():
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, page in pages.items():
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                extract(page, name)
+                samples.append(time.perf_counter() - start)
+    timings[backend] = statistics.median(samples)
+
+print(f"\n{'Backend':<10}{'Median ms/page':>16}{'Speedup':>10}")
+for backend, seconds in timings.items():
+    print(f"{backend:<10}{seconds * 1000:>16.3f}{timings['bs4'] / seconds:>9.1f}x")
+
+sys.exit(1 if mismatches else 0)
@@ -0,0 +1,51 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(script_dir)
+sys.path.insert(0, repo_dir)
+
+from analysis.dataset import cached_copy, load_dataset
+from analysis.reports import report_columns
+
+# Peak resident memory (MB) of a fresh process that loads the dataset, either every column (as
+# the reports used to) or only `columns`
+def peak_memory(path, columns):
+    # VmHWM rather than ru_maxrss, which a child inherits from this (larger) process on Linux
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {repo_dir!r})\n"
+        "from analysis.dataset import load_dataset\n"
+        f"df = load_dataset({path!r}, {columns!r})\n"
+        "print(next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmHWM')) / 1024)\n"
+    )
+    return float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+
+def timed_load(path, columns):
+    start = time.perf_counter()
+    df = load_dataset(path, columns)
+    return df, time.perf_counter() - start
+
+# Memory footprint of each report's data, loading every column versus only the report's columns
+parser = argparse.ArgumentParser(description="Compare each report's memory footprint with and without column projection.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+args = parser.parse_args()
+
+cached_copy(args.dataset)  # Build the cached copy first so every load below reads it
+
+full, full_seconds = timed_load(args.dataset, None)
+full_mb = full.memory_usage(deep=True).sum() / 2**20
+full_peak = peak_memory(args.dataset, None)
+del full
+
+print(f"{'Report':36} {'Frame MB':>17} {'Peak RSS MB':>17} {'Load s':>15}")
+print(f"{'':36} {'before':>8} {'after':>8} {'before':>8} {'after':>8} {'before':>7} {'after':>7}")
+for report, columns in report_columns.items():
+    df, seconds = timed_load(args.dataset, columns)
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+    peak = peak_memory(args.dataset, columns)
+    print(f"{report:36} {full_mb:8.1f} {frame_mb:8.1f} {full_peak:8.1f} {peak:8.1f} {full_seconds:7.3f} {seconds:7.3f}")
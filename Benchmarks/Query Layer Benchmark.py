@@ -0,0 +1,92 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')  # Charts are only saved, never shown
+
+import pandas as pd
+
+# Make the analysis package importable when running from the Benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from analysis.dataset import apply_schema, cached_copy, load_dataset
+from analysis.engine import ReportEngine
+from analysis.query import ProductDatabase
+from analysis.reports import reports
+from scraper.seen_index import normalize_item_id
+
+def timed(function, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+# Ad-hoc questions answered three ways: re-parsing the CSV the way the Visualizations scripts did,
+# loading the columns needed from the cached Parquet copy, and querying the product database.
+# Each question is (description, columns, pandas answer from a frame, SQL, SQL parameters).
+def questions(df):
+    seller = df['Seller'].mode()[0]
+    category = df['Category'].mode()[0]
+    brand = df['Marca'].mode()[0]
+    small_seller = df['Seller'].value_counts().index[-1]
+    item_id = normalize_item_id(load_dataset(args.dataset, ['Product URL'])['Product URL'].iloc[len(df) // 2])
+    return [
+        (f"Average price, free shipping, {seller} in {category}", ['Seller', 'Category', 'Shipping', 'Sale Price USD'],
+         lambda df: df.loc[(df['Seller'] == seller) & (df['Category'] == category) & (df['Shipping'] == 'Free Shipping'),
+                           'Sale Price USD'].mean(),
+         'SELECT mean("Sale Price USD") FROM products WHERE "Seller" = ? AND "Category" = ? AND "Shipping" = ?',
+         (seller, category, 'Free Shipping')),
+        (f"{brand} products out of stock", ['Marca', 'Status'],
+         lambda df: int(((df['Marca'] == brand) & (df['Status'] == 'Out of Stock')).sum()),
+         'SELECT COUNT(*) FROM products WHERE "Marca" = ? AND "Status" = ?', (brand, 'Out of Stock')),
+        (f"Best rating per status in {category}", ['Category', 'Status', 'Stars'],
+         lambda df: df[df['Category'] == category].groupby('Status', observed=True)['Stars'].max().sum(),
+         'SELECT SUM(best) FROM (SELECT MAX("Stars") AS best FROM products WHERE "Category" = ? GROUP BY "Status")', (category,)),
+        (f"Products listed by {small_seller}", ['Seller'],
+         lambda df: int((df['Seller'] == small_seller).sum()),
+         'SELECT COUNT(*) FROM products WHERE "Seller" = ?', (small_seller,)),
+        ("Sale price of one item, by item ID", ['Product URL', 'Sale Price USD'],
+         lambda df: df.loc[df['Product URL'].map(normalize_item_id) == item_id, 'Sale Price USD'].iloc[0],
+         'SELECT "Sale Price USD" FROM products WHERE "Item ID" = ?', (item_id,)),
+    ]
+
+# Run `names` reports over the dataset, loaded or from the database, writing into a scratch folder
+def run_reports(path, names, database):
+    with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+        ReportEngine(path, names, output_dir, database=database).run()
+
+parser = argparse.ArgumentParser(description="Compare pandas scripts with SQL queries against the product database.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+parser.add_argument('--repeat', type=int, default=3, help="Runs of each question (the fastest is reported)")
+args = parser.parse_args()
+
+cached_copy(args.dataset)  # Build the cached copy first so the loads below read it
+with tempfile.TemporaryDirectory() as scratch:
+    database = ProductDatabase(os.path.join(scratch, 'products.sqlite3'), args.dataset)
+    start = time.perf_counter()
+    rows = database.update()
+    print(f"Loaded {rows:,} rows into the database in {time.perf_counter() - start:.2f}s (once per dataset version)\n")
+
+    print(f"{'Question':58} {'CSV ms':>9} {'Parquet ms':>11} {'SQL ms':>8} {'Same':>5}")
+    for description, columns, answer, sql, params in questions(load_dataset(args.dataset)):
+        csv_answer, csv_seconds = timed(lambda: answer(apply_schema(pd.read_csv(args.dataset))), args.repeat)
+        parquet_answer, parquet_seconds = timed(lambda: answer(load_dataset(args.dataset, columns)), args.repeat)
+        sql_answer, sql_seconds = timed(lambda: database.query(sql, params).iloc[0, 0], args.repeat)
+        same = all(abs(other - csv_answer) <= 1e-9 * max(1, abs(csv_answer)) for other in (parquet_answer, sql_answer))
+        print(f"{description[:58]:58} {csv_seconds * 1000:9.1f} {parquet_seconds * 1000:11.1f} {sql_seconds * 1000:8.2f} {str(same):>5}")
+
+    # Each report end to end, loading its frames or querying them (its charts take the same time either way)
+    print(f"\n{'Report':36} {'Loaded s':>9} {'SQL s':>7}")
+    for name in reports:
+        _, loaded_seconds = timed(lambda: run_reports(args.dataset, [name], None), 1)
+        _, sql_seconds = timed(lambda: run_reports(args.dataset, [name], database), 1)
+        print(f"{name:36} {loaded_seconds:9.2f} {sql_seconds:7.2f}")
+    database.close()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(script_dir))
+
+from analysis.engine import render_chart
+from analysis.reports import draw_ratings_density, draw_ratings_scatter, ratings_density
+
+# Render time and PNG size of the ratings vs. reviews chart, one point per product versus the
+# density chart, for growing numbers of synthetic products
+parser = argparse.ArgumentParser(description="Compare point scatter and density rendering of the ratings vs. reviews chart.")
+parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help="Numbers of products")
+parser.add_argument('--log-reviews', action='store_true', help="Review counts on a log scale")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+labels = ('Product Ratings vs. Number of Reviews', 'Reviews Count', 'Stars')
+
+print(f"{'Products':>10} {'Points s':>9} {'Points KB':>10} {'Density s':>10} {'Density KB':>11}")
+with tempfile.TemporaryDirectory() as temp_dir:
+    path = os.path.join(temp_dir, 'chart.png')
+    for size in args.sizes:
+        reviews = rng.lognormal(6, 2, size).round()
+        stars = rng.integers(0, 51, size) / 10
+
+        start = time.perf_counter()
+        render_chart(path, draw_ratings_scatter, (reviews, stars, *labels, 'purple'), {'log_reviews': args.log_reviews})
+        points_seconds = time.perf_counter() - start
+        points_size = os.path.getsize(path)
+
+        # Timed from the raw data, so the histogram counts too
+        start = time.perf_counter()
+        counts, x_edges, y_edges = ratings_density(reviews, stars, args.log_reviews)
+        render_chart(path, draw_ratings_density, (counts, x_edges, y_edges, *labels, 'Purples'), {'log_reviews': args.log_reviews})
+        density_seconds = time.perf_counter() - start
+        density_size = os.path.getsize(path)
+
+        print(f"{size:10,d} {points_seconds:9.2f} {points_size / 1024:10.0f} {density_seconds:10.2f} {density_size / 1024:11.0f}")
@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(script_dir))
+
+from analysis.pricing import add_sale_price_to_csv, sale_prices
+
+# The row-wise calculation the Sales Price Calculator used before, kept as the reference
+def calculate_sale_price(row):
+    if "OFF" in row['Discount']:
+        discount_percent = float(row['Discount'].replace('% OFF', '').strip()) / 100
+        sale_price = row['USD'] * (1 - discount_percent)
+    else:
+        sale_price = row['USD']  # No discount
+    return round(sale_price, 2)
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+# Compare the vectorized sale price engine with the row-wise version on a dataset with
+# 'USD' and 'Discount' columns, then time the in-memory and chunked end-to-end runs
+parser = argparse.ArgumentParser(description="Benchmark the sale price calculation.")
+parser.add_argument('dataset', help="CSV file with 'USD' and 'Discount' columns")
+parser.add_argument('--chunksize', type=int, default=100000, help="Rows per chunk for the streaming run")
+args = parser.parse_args()
+
+df, load_seconds = timed(lambda: pd.read_csv(args.dataset))
+df['USD'] = pd.to_numeric(df['USD'].astype(str).str.replace(',', ''), errors='coerce')
+print(f"Loaded {len(df):,} rows in {load_seconds:.2f}s")
+
+row_wise, row_seconds = timed(lambda: df.apply(calculate_sale_price, axis=1))
+vectorized, vector_seconds = timed(lambda: sale_prices(df['USD'], df['Discount']))
+
+# Parity: both must give exactly the same prices (NaN prices compare equal)
+different = ~np.isclose(row_wise.to_numpy(dtype=float), vectorized.to_numpy(), rtol=0, atol=0, equal_nan=True)
+print(f"Parity: {different.sum()} of {len(df):,} rows differ")
+print(f"Row-wise apply:  {row_seconds:8.3f}s")
+print(f"Vectorized:      {vector_seconds:8.3f}s ({row_seconds / vector_seconds:.0f}x faster)")
+
+# End to end (read, compute, write), whole file versus streamed in chunks
+with tempfile.TemporaryDirectory() as temp_dir:
+    output_file = os.path.join(temp_dir, 'sale_price.csv')
+    _, whole_seconds = timed(lambda: add_sale_price_to_csv(args.dataset, output_file))
+    _, chunked_seconds = timed(lambda: add_sale_price_to_csv(args.dataset, output_file, chunksize=args.chunksize))
+print(f"End to end, whole file:        {whole_seconds:8.3f}s")
+print(f"End to end, {args.chunksize:,}-row chunks: {chunked_seconds:8.3f}s")
+
+sys.exit(1 if different.any() else 0)
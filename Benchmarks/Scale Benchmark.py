@@ -0,0 +1,138 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(script_dir)
+sys.path.insert(0, repo_dir)
+
+from analysis.reports import reports
+from analysis.synthetic import base_rows, description_chars, synthetic_dataset
+
+# Time growth (relative to the rows) above which a report is flagged as scaling worse than linearly
+superlinear_exponent = 1.2
+
+# Code run in a fresh process for each measurement, so every peak is the measurement's own:
+# (re)builds the cached copy of the dataset (report None) or runs one report with its charts drawn in a
+# render worker. A report's seconds are the engine's own timing of it (plus the dataset passes, when
+# streamed), which leaves out process startup and the chart rendering waited for afterwards, so
+# only the report's compute path is timed. Prints the seconds and the peak resident memory above
+# the interpreter's own after the imports, in MB.
+measure_code = '''
+import json, sys, tempfile, time
+sys.path.insert(0, {repo_dir!r})
+from analysis.dataset import cached_copy
+from analysis.engine import ReportEngine
+
+def memory(key):
+    return next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith(key)) / 1024
+
+baseline = memory('VmRSS')
+if {report!r} is None:
+    start = time.perf_counter()
+    cached_copy({path!r}, refresh=True)
+    seconds = time.perf_counter() - start
+else:
+    with tempfile.TemporaryDirectory() as output_dir:
+        timings = ReportEngine({path!r}, [{report!r}], output_dir, render_workers=1, chunksize={chunksize!r}).run()
+    seconds = timings[{report!r}] + timings.get('Streaming', 0)
+print(json.dumps({{'seconds': seconds, 'memory': memory('VmHWM') - baseline}}))
+'''
+
+# Seconds and peak memory of building the cached copy (report None) or of running a report, or
+# the reason the process failed (e.g. killed for running out of memory)
+def measure(path, report, chunksize):
+    code = measure_code.format(repo_dir=repo_dir, path=path, report=report, chunksize=chunksize)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if result.returncode != 0:
+        reason = 'killed (out of memory?)' if result.returncode == -9 else result.stderr.strip().splitlines()[-1]
+        return {'error': reason}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# How a measure grows with the rows between the two largest scales (where fixed costs such as
+# starting a process matter least): the exponent k of measure ~ rows^k (1 is linear)
+def growth(results, key, scales):
+    if len(scales) < 2:
+        return None
+    first, last = results.get(str(scales[-2]), {}), results.get(str(scales[-1]), {})
+    if key not in first or key not in last or first[key] <= 0 or last[key] <= 0:
+        return None
+    return math.log(last[key] / first[key]) / math.log(scales[-1] / scales[-2])
+
+def cell(result, key, format):
+    if 'error' in result:
+        return 'failed'
+    return format.format(result[key]) if key in result else '-'
+
+# Time and peak memory of every report's compute path on synthetic datasets at several multiples
+# of the real dataset's size, flagging reports whose cost grows faster than their input and, with
+# --compare, changes against the results of an earlier run
+parser = argparse.ArgumentParser(description="Time and memory-profile every report on synthetic datasets of growing size.")
+parser.add_argument('--scales', type=float, nargs='+', default=[1, 10, 100],
+                    help=f"Dataset sizes in multiples of the real dataset ({base_rows:,} rows, about 67 MB)")
+parser.add_argument('--reports', nargs='+', default=list(reports), metavar='REPORT', help="Reports to measure (default: all)")
+parser.add_argument('--description-chars', type=int, default=description_chars,
+                    help="Average description length; lower it to reach large row counts with smaller files")
+parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic datasets")
+parser.add_argument('--chunksize', type=int, default=None,
+                    help="Run the reports that have a streamed version this many rows at a time")
+parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'mercadolibre_synthetic'),
+                    help="Folder the synthetic datasets are kept in, so later runs reuse them")
+parser.add_argument('--save', metavar='JSON', help="Save the results to this file")
+parser.add_argument('--compare', metavar='JSON', help="Compare with results saved by an earlier run")
+parser.add_argument('--tolerance', type=float, default=0.2, help="Relative change flagged as a regression with --compare")
+args = parser.parse_args()
+
+scales = sorted(set(args.scales))
+settings = {'description_chars': args.description_chars, 'seed': args.seed, 'chunksize': args.chunksize}
+results = {}  # Report ('Load' for the cached copy) -> scale -> {'seconds', 'memory'} or {'error'}
+for scale in scales:
+    path = synthetic_dataset(args.data_dir, scale, args.seed, args.description_chars)
+    print(f"{scale:g}x: {int(base_rows * scale):,} rows, {os.path.getsize(path) / 1e6:,.0f} MB ({path})")
+    # Building the cached copy parses the whole CSV once; the reports then read the copy
+    results.setdefault('Load', {})[str(scale)] = measure(path, None, None)
+    for name in args.reports:
+        results.setdefault(name, {})[str(scale)] = measure(path, name, args.chunksize)
+print()
+
+headers = ''.join(f" {f'{scale:g}x s':>9} {f'{scale:g}x MB':>9}" for scale in scales)
+print(f"{'Report':36}{headers} {'Time ~ rows^':>12} {'MB ~ rows^':>10}")
+flagged = []
+for name, by_scale in results.items():
+    cells = ''.join(f" {cell(by_scale.get(str(scale), {}), 'seconds', '{:.2f}'):>9} "
+                    f"{cell(by_scale.get(str(scale), {}), 'memory', '{:.0f}'):>9}" for scale in scales)
+    time_growth, memory_growth = growth(by_scale, 'seconds', scales), growth(by_scale, 'memory', scales)
+    print(f"{name[:36]:36}{cells} {time_growth if time_growth is not None else float('nan'):12.2f} "
+          f"{memory_growth if memory_growth is not None else float('nan'):10.2f}")
+    if any('error' in result for result in by_scale.values()):
+        failures = [f"{scale}x ({result['error']})" for scale, result in by_scale.items() if 'error' in result]
+        flagged.append(f"{name}: failed at {', '.join(failures)}")
+    elif time_growth is not None and time_growth > superlinear_exponent:
+        flagged.append(f"{name}: time grows like rows^{time_growth:.2f}")
+
+if flagged:
+    print("\nScaling problems:\n  " + '\n  '.join(flagged))
+
+if args.compare:
+    with open(args.compare, encoding='utf-8') as f:
+        previous = json.load(f)
+    if previous['settings'] != settings:
+        print(f"\nWarning: {args.compare} was measured with {previous['settings']}, this run with {settings}")
+    regressions = []
+    for name, by_scale in results.items():
+        for scale, result in by_scale.items():
+            before = previous['results'].get(name, {}).get(scale, {})
+            for key, unit in [('seconds', 's'), ('memory', 'MB')]:
+                if key in result and before.get(key, 0) > 0 and result[key] > before[key] * (1 + args.tolerance):
+                    regressions.append(f"{name} at {scale}x: {before[key]:.2f} -> {result[key]:.2f} {unit}")
+    print(f"\nCompared with {args.compare}: " + ("no regressions" if not regressions else
+                                                  f"{len(regressions)} regressions\n  " + '\n  '.join(regressions)))
+
+if args.save:
+    with open(args.save, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'results': results}, f, indent=2)
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Make the scraper package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(script_dir)
+sys.path.insert(0, repo_dir)
+
+from scraper.extract import etree
+from scraper.fakesite import FakeSite, load_pages
+
+# Crawl modes compared: main() arguments, plus the extractor backend
+modes = {
+    'sequential': {'workers': 1},
+    'threads': {'workers': 8},
+    'threads + parse processes': {'workers': 8, 'parse_workers': 2},
+    'threads + lxml': {'workers': 8, 'extractor': 'lxml'},
+}
+
+# Code run in a fresh process for each mode: the scraper script's main() crawls the fake site with
+# every file it keeps (CSV, checkpoint, seen index) in a scratch folder. Prints the wall time,
+# the CPU time and peak memory of the process and of its parse workers, and the scrape metrics.
+measure_code = '''
+import contextlib, importlib.util, io, json, os, resource, sys, tempfile, time
+sys.path.insert(0, {repo_dir!r})
+spec = importlib.util.spec_from_file_location('scraper_script', os.path.join({repo_dir!r}, 'Mercado Libre Scraper.py'))
+scraper = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scraper)
+
+options = {options!r}
+with tempfile.TemporaryDirectory() as scratch:
+    for name in ['last_page_file', 'checkpoint_file', 'seen_index_file', 'csv_file', 'parquet_dir']:
+        setattr(scraper, name, os.path.join(scratch, os.path.basename(getattr(scraper, name))))
+    scraper.base_url = {base_url!r}
+    scraper.extractor_backend = options.pop('extractor', 'bs4')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.main(rate={rate!r}, host_rate={rate!r}, **options)
+    seconds = time.perf_counter() - start
+
+usage, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+with scraper.metrics.lock:
+    counters = {{name: dict(counter) for name, counter in scraper.metrics.counters.items()}}
+    stages = {{stage: histogram.sum for stage, histogram in scraper.metrics.histograms.items()}}
+print(json.dumps({{
+    'seconds': seconds,
+    'cpu': usage.ru_utime + usage.ru_stime,
+    'worker_cpu': children.ru_utime + children.ru_stime,
+    'memory': usage.ru_maxrss / 1024,
+    'worker_memory': children.ru_maxrss / 1024,
+    'pages': counters.get('pages', {{}}).get('', 0),
+    'products': counters.get('products', {{}}),
+    'stages': stages,
+}}))
+'''
+
+def measure(site, options, rate):
+    code = measure_code.format(repo_dir=repo_dir, options=options, base_url=site.base_url, rate=rate)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# End-to-end throughput of the scraper's crawl modes against a local stand-in of the site, with
+# its latency, error rate and throttling configurable, so no request reaches mercadolibre.com.mx
+parser = argparse.ArgumentParser(description="Benchmark the scraper end to end against a local fake site.")
+parser.add_argument('--modes', nargs='+', choices=list(modes), default=list(modes), help="Crawl modes to run")
+parser.add_argument('--pages', type=int, default=5, help="Listing pages on the site")
+parser.add_argument('--products-per-page', type=int, default=48, help="Product links per listing page")
+parser.add_argument('--page-kb', type=int, default=300, help="Size pages are padded to, like real pages (KB)")
+parser.add_argument('--recorded', nargs='?', const=os.path.join(script_dir, 'Fixtures'), default=None, metavar='DIR',
+                    help="Serve the recorded product pages in DIR instead of templated ones (default: Benchmarks/Fixtures)")
+parser.add_argument('--latency', type=float, default=0.05, help="Seconds the site takes to answer each request")
+parser.add_argument('--latency-jitter', type=float, default=0.05, help="Up to this many extra seconds per answer")
+parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with a 500 or 503")
+parser.add_argument('--throttle-rate', type=float, default=None, help="Requests per second the site allows before answering 429")
+parser.add_argument('--rate', type=float, default=1000.0,
+                    help="Request rate the scraper's limiter allows (high, so the crawl itself is measured)")
+args = parser.parse_args()
+
+if etree is None and 'threads + lxml' in args.modes:
+    print("lxml is not installed; skipping the lxml mode")
+    args.modes.remove('threads + lxml')
+
+pages = load_pages(args.recorded) if args.recorded else None
+with FakeSite(max_pages=args.pages, products_per_page=args.products_per_page, throttle_rate=args.throttle_rate,
+              latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+              page_kb=args.page_kb, pages=pages) as site:
+    print(f"{args.pages} listing pages of {args.products_per_page} products, {args.page_kb} KB pages, "
+          f"{args.latency * 1000:.0f}-{(args.latency + args.latency_jitter) * 1000:.0f} ms latency, "
+          f"{args.error_rate:.0%} errors\n")
+    print(f"{'Mode':27} {'Pages/s':>8} {'Products/s':>11} {'Failed':>7} {'CPU s':>7} {'CPU %':>6} "
+          f"{'Peak MB':>8} {'Fetch s':>8} {'Parse s':>8}")
+    for mode in args.modes:
+        result = measure(site, dict(modes[mode]), args.rate)
+        seconds = result['seconds']
+        cpu = result['cpu'] + result['worker_cpu']
+        memory = result['memory'] + result['worker_memory']  # Parse workers counted by the largest one
+        products = result['products']
+        print(f"{mode:27} {result['pages'] / seconds:8.2f} {products.get('scraped', 0) / seconds:11.1f} "
+              f"{products.get('failed', 0):7d} {cpu:7.2f} {cpu / seconds:6.0%} {memory:8.0f} "
+              f"{result['stages'].get('fetch', 0):8.2f} {result['stages'].get('parse', 0):8.2f}")
+    print(f"\nResponses served: {dict(sorted(site.status_counts.items()))}")
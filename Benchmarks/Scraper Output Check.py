@@ -0,0 +1,87 @@
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import sys
+import tempfile
+
+import matplotlib
+
+matplotlib.use('Agg')  # Charts are only saved
+
+# Make the analysis and scraper packages importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(script_dir))
+
+from analysis.aggregates import AggregateStore
+from analysis.engine import ReportEngine
+from analysis.query import ProductDatabase
+from analysis.reports import reports
+from scraper.extract import extract_product_details
+from scraper.fakesite import templated_product_page
+from scraper.records import record_fields
+from scraper.writers import CsvWriter
+
+# Report CSVs that must have rows for the scraper's output (they are empty when no sale price is derived)
+priced_outputs = ['expensive_summary.csv', 'category_summary.csv', 'seller_analysis.csv']
+
+# Write a CSV the way the scraper does (raw and typed columns, no USD or sale price columns),
+# with `products` templated product pages of the fake site
+def scraper_csv(path, products):
+    writer = CsvWriter(path, record_fields)
+    writer.write([extract_product_details(templated_product_page(str(item)), f'https://articulo.mercadolibre.com.mx/'
+                                          f'MLM-{1000000 + item}-producto-_JM', backend='bs4') for item in range(products)])
+    writer.flush()
+    writer.close()
+
+# Run every report over the scraper's CSV in one of the engine's modes, with their printouts hidden.
+# Each mode must write the same report CSVs as the SQLite query mode; the streamed mode runs before
+# any mode builds the cached copy, so it parses the CSV in chunks.
+def run_mode(path, mode, output_dir):
+    options = {}
+    if mode == 'streamed':
+        options['chunksize'] = 50
+    if mode == 'aggregates':
+        options['store'] = AggregateStore(path + '.aggregates.sqlite3', path)
+        options['store'].update()
+    if mode == 'database':
+        options['database'] = ProductDatabase(path + '.products.sqlite3', path)
+        options['database'].update()
+    engine = ReportEngine(path, list(reports), output_dir, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.run()
+    for connection in ['store', 'database']:
+        if connection in options:
+            options[connection].close()
+
+parser = argparse.ArgumentParser(description="Check that every report mode works on the scraper's own CSV output.")
+parser.add_argument('--products', type=int, default=300, help="Products in the generated scraper CSV")
+args = parser.parse_args()
+
+modes = ['database', 'streamed', 'default', 'aggregates']
+problems = []
+with tempfile.TemporaryDirectory() as scratch:
+    path = os.path.join(scratch, 'mercadolibre_products_extended.csv')
+    scraper_csv(path, args.products)
+    for mode in modes:
+        output_dir = os.path.join(scratch, mode)
+        try:
+            run_mode(path, mode, output_dir)
+        except Exception as e:
+            problems.append(f"{mode}: {type(e).__name__}: {e}")
+            continue
+        for name in priced_outputs:
+            with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+                if sum(1 for _ in f) < 2:
+                    problems.append(f"{mode}: {name} has no rows")
+        if mode != modes[0]:
+            reference = os.path.join(scratch, modes[0])
+            csvs = sorted(name for name in os.listdir(reference) if name.endswith('.csv'))
+            _, mismatch, missing = filecmp.cmpfiles(reference, output_dir, csvs, shallow=False)
+            problems += [f"{mode}: {name} differs from the {modes[0]} mode" for name in mismatch]
+            problems += [f"{mode}: {name} was not written" for name in missing]
+        print(f"{mode}: ok" if not any(problem.startswith(mode + ':') for problem in problems) else f"{mode}: FAILED")
+
+print(f"\n{len(problems)} problems" + ''.join(f"\n  {problem}" for problem in problems))
+sys.exit(1 if problems else 0)
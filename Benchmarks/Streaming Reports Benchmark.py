@@ -0,0 +1,60 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+# Make the analysis package importable when running from the Benchmarks folder
+script_dir = os.path.dirname(os.path.realpath(__file__))
+repo_dir = os.path.dirname(script_dir)
+sys.path.insert(0, repo_dir)
+
+from analysis.reports import streaming_reports
+
+# Peak resident memory (MB) and seconds of a fresh process building the reports that can stream
+# over `path`, loading the dataset or (with `chunksize`) streaming it
+def run_reports(path, output_dir, chunksize):
+    # VmHWM rather than ru_maxrss, which a child inherits from this process on Linux
+    code = (
+        "import contextlib, io, sys, time\n"
+        f"sys.path.insert(0, {repo_dir!r})\n"
+        "import matplotlib\n"
+        "matplotlib.use('Agg')\n"
+        "from analysis.engine import ReportEngine\n"
+        "start = time.perf_counter()\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    ReportEngine({path!r}, {list(streaming_reports)!r}, {output_dir!r}, chunksize={chunksize!r}).run()\n"
+        "seconds = time.perf_counter() - start\n"
+        "print(next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmHWM')) / 1024, seconds)\n"
+    )
+    peak, seconds = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+    return float(peak), float(seconds)
+
+# Peak memory of the streamable reports (top-k products, price distribution, best and worst rated)
+# as the dataset grows: the dataset is repeated 1x, 2x, 4x... into a scratch folder, and each size
+# is reported loaded and streamed. Streaming reads the CSV itself (the cached copy is never built),
+# so its peak should stay flat while the loaded one grows with the file.
+parser = argparse.ArgumentParser(description="Compare the peak memory of loaded and streamed reports as the dataset grows.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+parser.add_argument('--copies', type=int, nargs='+', default=[1, 2, 4], help="Dataset sizes, as copies of the dataset")
+parser.add_argument('--chunksize', type=int, default=2000, help="Rows per chunk when streaming")
+args = parser.parse_args()
+
+with tempfile.TemporaryDirectory() as scratch:
+    print(f"{'Copies':>6} {'Rows':>10} {'CSV MB':>8} {'Loaded MB':>10} {'Streamed MB':>12} {'Loaded s':>9} {'Streamed s':>11}")
+    for copies in args.copies:
+        path = os.path.join(scratch, f'products_x{copies}.csv')
+        rows = 0
+        # Written a chunk at a time, so this process doesn't hold the larger datasets either
+        for copy in range(copies):
+            for chunk in pd.read_csv(args.dataset, chunksize=args.chunksize, dtype=str, keep_default_na=False):
+                chunk.to_csv(path, mode='a', header=rows == 0, index=False)
+                rows += len(chunk)
+
+        streamed_peak, streamed_seconds = run_reports(path, os.path.join(scratch, 'streamed'), args.chunksize)
+        loaded_peak, loaded_seconds = run_reports(path, os.path.join(scratch, 'loaded'), None)
+        print(f"{copies:6} {rows:10,} {os.path.getsize(path) / 2**20:8.1f} {loaded_peak:10.1f} {streamed_peak:12.1f} "
+              f"{loaded_seconds:9.2f} {streamed_seconds:11.2f}")
+        os.remove(path)
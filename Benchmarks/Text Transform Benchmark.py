@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Make the analysis package importable when running from the Benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from analysis.dataset import normalize_categories, other_category, other_category_labels
+from analysis.text import map_unique, normalize, short_name
+
+# Category normalization as the loader used to do it, one row at a time
+def row_wise_categories(series):
+    return series.astype(str).apply(normalize).replace(other_category_labels, other_category).fillna(other_category)
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+# Per-row versus once-per-distinct-value text transforms on a dataset's Category and Product
+# columns: the loader's category normalization and the reports' short product names
+parser = argparse.ArgumentParser(description="Compare per-row and per-distinct-value text transforms on a dataset.")
+parser.add_argument('dataset', help="Dataset CSV, e.g. Datasets/mercadolibre_products_extended.csv")
+parser.add_argument('--repeat', type=int, default=3, help="Runs of each transform (the fastest is reported)")
+args = parser.parse_args()
+
+df = pd.read_csv(args.dataset, usecols=['Category', 'Product'])
+print(f"{len(df):,} rows, {df['Category'].nunique():,} distinct categories, {df['Product'].nunique():,} distinct products\n")
+
+print(f"{'Transform':22} {'Per row s':>10} {'Distinct s':>11} {'Speedup':>8} {'Same':>5}")
+for name, column, row_wise, distinct in [
+    ('Category names', 'Category', row_wise_categories, normalize_categories),
+    ('Short product names', 'Product', lambda series: series.apply(short_name), lambda series: map_unique(series, short_name)),
+]:
+    expected, row_seconds = timed(lambda: row_wise(df[column]), args.repeat)
+    result, distinct_seconds = timed(lambda: distinct(df[column]), args.repeat)
+    same = result.astype(object).equals(expected.astype(object))
+    print(f"{name:22} {row_seconds:10.3f} {distinct_seconds:11.3f} {row_seconds / distinct_seconds:7.1f}x {str(same):>5}")
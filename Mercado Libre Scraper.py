@@ -1,11 +1,23 @@
-import requests
 from bs4 import BeautifulSoup
-import time
 import csv
-import re
-import json
 import os
+import argparse
+import sys
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import HTTPError, RequestException
+from scraper.rate_limit import AdaptiveRateLimiter, fetch_with_retries
+from scraper.archive import HtmlArchive, re_extract
+from scraper.checkpoint import Checkpoint
+from scraper.extract import extract_product_details, extract_product_details_timed, extractors
+from scraper.metrics import MetricsExporter, ScrapeMetrics
+from scraper.pipeline import ScrapePipeline
+from scraper.records import record_fields
+from scraper.refresh import RefreshState, changed_fields, conditional_headers, delta_fields
+from scraper.seen_index import SeenIndex, normalize_item_id
+from scraper.session import ScraperSession, default_timeout, format_stats
+from scraper.writers import CsvWriter, ParquetWriter
 
 # Base URL for MercadoLibre
 base_url = 'https://www.mercadolibre.com.mx/ofertas?page='
@@ -18,168 +30,105 @@ headers = {
 # Get the directory where the script is located
 script_dir = os.path.dirname(os.path.realpath(__file__))
 
-# Paths for last page file and CSV file
+# Paths for last page file, checkpoint database and CSV file
 last_page_file = os.path.join(script_dir, 'last_page.txt')
+checkpoint_file = os.path.join(script_dir, 'scrape_checkpoint.sqlite3')
+seen_index_file = os.path.join(script_dir, 'seen_items.idx')
+archive_dir = os.path.join(script_dir, 'html_archive')
+refresh_state_file = os.path.join(script_dir, 'refresh_state.sqlite3')
+delta_csv_file = os.path.join(script_dir, 'mercadolibre_products_delta.csv')
+metrics_file = os.path.join(script_dir, 'scrape_metrics.prom')
+parquet_dir = os.path.join(script_dir, 'mercadolibre_products_parquet')
 csv_file = os.path.join(script_dir, 'mercadolibre_products_extended.csv')
 
+# Columns of the CSV file, in order: the raw scraped text, then the typed fields
+# (numeric price, discount fraction, stars, review count and the free-shipping flag)
+fieldnames = record_fields
+
+# Request rate targets (requests per second per host, shared by all workers).
+# The limiter starts at request_rate, backs off on 429/5xx responses and speeds back up
+# towards max_host_rate while responses stay healthy.
+request_rate = 0.5
+max_host_rate = 1.0
+max_retries = 5
+
+# Seconds between saves of the seen-items index during a run
+seen_index_save_interval = 300
+
+# Rows are buffered and flushed to the outputs every batch_size products, or after
+# flush_interval seconds when the crawl is slow
+batch_size = 100
+flush_interval = 60
+
+# HTML extraction backend for product pages ('bs4' is the reference, 'lxml' is faster)
+extractor_backend = 'bs4'
+
+# Seconds between exports of the scrape metrics (and progress lines)
+metrics_interval = 15
+
+# Metrics, rate limiter and HTTP session used by the scraping functions; replaced in main() once
+# the rates and worker count are known
+metrics = ScrapeMetrics()
+limiter = AdaptiveRateLimiter(request_rate, max_rate=max_host_rate)
+session = ScraperSession(headers=headers)
+
+# Compressed archive of the fetched product pages (None when archiving is off)
+archive = None
+
+# Function to download a product page; returns its HTML, or None if the fetch failed
+def fetch_product_page(product_url):
+    with metrics.timer('fetch'):
+        try:
+            response = fetch_with_retries(session.get, product_url, limiter, max_retries)
+        except HTTPError as e:
+            print(f"HTTP error occurred while scraping product: {product_url} - {e}")
+            return None
+        except RequestException as e:
+            print(f"Request failed while scraping product: {product_url} - {e}")
+            return None
+    if archive is not None:
+        archive.add(product_url, response.text)
+    return response.text
+
 # Function to extract product details from a product page
 def scrape_product_details(product_url):
-    try:
-        response = requests.get(product_url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Extract product title
-        title_tag = soup.find('h1', class_='ui-pdp-title')
-        title = title_tag.text.strip() if title_tag else 'N/A'
-
-        # Extract price
-        price_tag = soup.find('span', class_='andes-money-amount__fraction')
-        price = price_tag.text.strip() if price_tag else 'N/A'
-
-        # Extract rating (stars)
-        rating_tag = soup.find('span', class_='ui-pdp-review__rating')
-        rating = rating_tag.text.strip() if rating_tag else 'N/A'
-
-        if rating_tag:
-            rating = rating_tag.text.strip()
-        else:
-            print(f"Star rating not available for: {product_url}")
-
-        # Extract availability status
-        status_tag = soup.find('span', class_='ui-pdp-buybox__quantity__available')
-        status = status_tag.text.strip() if status_tag else 'Available'
-
-        # Extract seller name using two strategies
-        seller = 'N/A'
-        # Primary strategy: Extract from 'ui-pdp-seller__label-text-with-icon'
-        seller_tag = soup.find('span', class_='ui-pdp-seller__label-text-with-icon')
-        if seller_tag:
-            seller = seller_tag.get_text(strip=True)
-        else:
-            # Secondary strategy: Extract from 'ui-pdp-seller__label-sold' and its sibling
-            vendido_por_span = soup.find('span', class_='ui-pdp-seller__label-sold')
-            if vendido_por_span:
-                seller_span = vendido_por_span.find_next_sibling('span', class_='')
-                if seller_span:
-                    seller = seller_span.get_text(strip=True)
-
-        # Extract brand (Marca) using multiple strategies
-        brand = 'N/A'
-        brand_extraction_method = 'None'
-
-        # Strategy 1: Remove prefixes from 'ui-pdp-brand__link' or 'ui-pdp-color--BLUE' elements
-        brand_tag = soup.find('a', class_='ui-pdp-brand__link') or soup.find('p', class_='ui-pdp-color--BLUE')
-        if brand_tag:
-            brand_text = brand_tag.get_text(strip=True)
-            brand = re.sub(r'^(Visita la Tienda oficial de\s+|Ver más productos marca\s+)', '', brand_text, flags=re.I)
-            brand_extraction_method = 'Strategy 1: Brand link or title'
-
-        # Strategy 2: Extract brand from JSON-LD scripts
-        if brand == 'N/A':
-            scripts = soup.find_all('script', type='application/ld+json')
-            for script in scripts:
-                try:
-                    data = json.loads(script.string)
-                    if 'brand' in data:
-                        if isinstance(data['brand'], dict):
-                            brand = data['brand'].get('name', 'N/A')
-                        else:
-                            brand = data['brand']
-                        brand = brand.strip()
-                        brand_extraction_method = 'Strategy 2: JSON-LD script'
-                        break
-                except (json.JSONDecodeError, TypeError):
-                    continue
-
-        # Strategy 3: Extract brand from 'brandId' pattern in page source
-        if brand == 'N/A':
-            match = re.search(r'"brandId":"([^"]+)"', response.text)
-            if match:
-                brand = match.group(1).strip()
-                brand_extraction_method = 'Strategy 3: brandId pattern'
-
-        # Strategy 4: Extract brand from attributes in JSON-like structures
-        if brand == 'N/A':
-            match = re.search(r'"attributes":\[\{"id":"Marca","name":"Marca","value_name":"([^"]+)"', response.text)
-            if match:
-                brand = match.group(1).strip()
-                brand_extraction_method = 'Strategy 4: JSON attributes'
-
-        # Exclude incorrect values
-        if brand.lower() in ['iva incluido'] or brand.lower().startswith('en '):
-            brand_extraction_method += ' (Filtered Out)'
-            brand = 'N/A'
-
-        # Extract description
-        description_tag = soup.find('p', class_='ui-pdp-description__content')
-        description = description_tag.text.strip() if description_tag else 'N/A'
-
-        # Extract shipping info
-        shipping = 'Paid Shipping'
-        shipping_tag = soup.find('span', class_='ui-pdp-color--GREEN ui-pdp-family--SEMIBOLD')
-        if shipping_tag and 'Envío gratis' in shipping_tag.text:
-            shipping = 'Free Shipping'
-
-        # Extract discount information
-        discount = 'No Discount'
-        discount_tag = soup.find('span', class_='ui-pdp-price__second-line__label')
-        if discount_tag:
-            discount = discount_tag.text.strip()
-
-        # Extract reviews count
-        reviews_count = 'No Reviews'
-        reviews_tag = soup.find('span', class_='ui-pdp-review__amount')
-        if reviews_tag:
-            reviews_count = reviews_tag.text.strip()
-
-        # Extract category
-        category = 'N/A'
-        category_tag = soup.find('a', class_='andes-breadcrumb__link')
-        if category_tag:
-            category = category_tag.text.strip()
-
-        return {
-            'Product': title,
-            'Product URL': product_url,
-            'Price': price,
-            'Stars': rating,
-            'Status': status,
-            'Seller': seller,
-            'Marca': brand,
-            'Brand Extraction Method': brand_extraction_method,
-            'Description': description,
-            'Shipping': shipping,
-            'Discount': discount,
-            'Reviews Count': reviews_count,
-            'Category': category
-        }
-
-    except HTTPError as e:
-        print(f"HTTP error occurred while scraping product: {product_url} - {e}")
-        return None
-    except RequestException as e:
-        print(f"Request failed while scraping product: {product_url} - {e}")
+    page_source = fetch_product_page(product_url)
+    if page_source is None:
         return None
+    return extract_product_details(page_source, product_url, backend=extractor_backend)
+
+# Function to revisit a known product with a conditional request. Returns the product details
+# (None when the server answered 304 Not Modified) and the validators for the next visit.
+def refresh_product_details(product_url, etag=None, last_modified=None):
+    response = fetch_with_retries(session.get, product_url, limiter, max_retries,
+                                  headers=conditional_headers(etag, last_modified))
+    if response.status_code == 304:
+        metrics.product(None, 'not_modified')
+        return None, etag, last_modified
+    record, timings = extract_product_details_timed(response.text, product_url, backend=extractor_backend)
+    for stage, seconds in timings.items():
+        metrics.observe(stage, seconds)
+    metrics.product(record)
+    return record.to_row(), response.headers.get('ETag'), response.headers.get('Last-Modified')
 
 # Function to extract product links from a search results page
 def scrape_search_results(page_number):
     url = base_url + str(page_number)
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        with metrics.timer('listing'):
+            response = fetch_with_retries(session.get, url, limiter, max_retries)
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'html.parser')
 
-        product_links = []
-        for link in soup.find_all('a', class_='poly-component__title'):
-            product_url = link['href']
-            # Skip click-tracking URLs
-            if 'click1.mercadolibre.com.mx' in product_url:
-                print(f"Skipping click-tracking URL: {product_url}")
-                continue
+            product_links = []
+            for link in soup.find_all('a', class_='poly-component__title'):
+                product_url = link['href']
+                # Skip click-tracking URLs
+                if 'click1.mercadolibre.com.mx' in product_url:
+                    print(f"Skipping click-tracking URL: {product_url}")
+                    continue
 
-            product_links.append(product_url)
+                product_links.append(product_url)
 
         if not product_links:
             print(f"No product links found on page {page_number}")
@@ -193,71 +142,314 @@ def scrape_search_results(page_number):
         print(f"Request failed while scraping page {page_number}: {e}")
         return []
 
-# Save progress to last_page.txt
-def save_last_page(page_number):
-    with open(last_page_file, 'w') as f:
-        f.write(str(page_number))
-
-# Get the last page scraped from last_page.txt
+# Get the last page scraped from last_page.txt (written by runs from before the checkpoint database)
 def get_last_page():
     if os.path.exists(last_page_file):
         with open(last_page_file, 'r') as f:
             return int(f.read().strip())
     return 1  # Start from the first page if no last_page.txt exists
 
-# Main function to orchestrate the scraping
-def main():
-    all_product_details = []
-    
-    # Get the last page scraped
-    start_page = get_last_page()
+# Command line options for the scraper
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape product listings from MercadoLibre ofertas.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of product pages fetched concurrently (default: 1, sequential)")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Processes that parse the downloaded pages (default: 0, parse in the fetching threads)")
+    parser.add_argument('--queue-size', type=int, default=64,
+                        help="Downloaded pages allowed to wait for a parser before fetching pauses")
+    parser.add_argument('--rate', type=float, default=request_rate,
+                        help="Starting request rate per host (requests per second, all workers combined)")
+    parser.add_argument('--max-host-rate', type=float, default=max_host_rate,
+                        help="Highest request rate per host the limiter may speed up to")
+    parser.add_argument('--max-retries', type=int, default=max_retries,
+                        help="Retries for a throttled or failed page/product fetch before giving up")
+    parser.add_argument('--timeout', type=float, nargs=2, default=default_timeout, metavar=('CONNECT', 'READ'),
+                        help="Connect and read timeouts in seconds for every request")
+    parser.add_argument('--extractor', choices=sorted(extractors), default=extractor_backend,
+                        help="HTML extraction backend for product pages")
+    parser.add_argument('--base-url', default=base_url,
+                        help="Listing URL prefix the page number is appended to")
+    parser.add_argument('--refresh-after', type=float, default=None, metavar='DAYS',
+                        help="Scrape a product again once its last scrape is older than this (default: never)")
+    parser.add_argument('--archive', nargs='?', const=archive_dir, default=None, metavar='DIR',
+                        help=f"Keep a compressed copy of every product page (default directory: {archive_dir})")
+    parser.add_argument('--re-extract', nargs='?', const=archive_dir, default=None, metavar='DIR',
+                        help="Rebuild the CSV from an archive instead of scraping (no network access)")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="With --re-extract, drop the CSV rows of products that have no archived page")
+    parser.add_argument('--refresh', nargs='?', type=int, const=1000, default=None, metavar='N',
+                        help="Revisit the N most volatile known products (default 1000) instead of crawling "
+                             f"the listing pages; changed rows go to {delta_csv_file}")
+    parser.add_argument('--output', nargs='+', choices=['csv', 'parquet'], default=['csv'],
+                        help=f"Output formats: the CSV file and/or typed Parquet parts in {parquet_dir}")
+    parser.add_argument('--batch-size', type=int, default=batch_size,
+                        help="Products buffered before the outputs are flushed and checkpointed")
+    parser.add_argument('--max-pages', type=int, default=10000,
+                        help="Last page to scrape")
+    parser.add_argument('--metrics-file', nargs='?', const=metrics_file, default=None, metavar='PATH',
+                        help="Write per-stage timings and counters in the Prometheus text format to this file "
+                             f"every --metrics-interval seconds (default file: {metrics_file})")
+    parser.add_argument('--metrics-port', type=int, default=None, metavar='PORT',
+                        help="Serve the metrics at http://127.0.0.1:PORT/metrics for Prometheus")
+    parser.add_argument('--metrics-interval', type=float, default=metrics_interval, metavar='SECONDS',
+                        help="Seconds between metrics exports and progress lines")
+    args = parser.parse_args()
+    if args.max_retries < 0:
+        parser.error("--max-retries must be 0 or more")
+    return args
 
-    max_pages = 10000  # Adjust the number of pages for the full run
-
-    # If CSV exists, append data; if not, create a new file
-    file_exists = os.path.isfile(csv_file)
+# Main function to orchestrate the scraping
+def main(workers=1, rate=request_rate, host_rate=max_host_rate, max_pages=10000, timeout=default_timeout,
+         parse_workers=0, queue_size=64, refresh_after=None, archive_path=None, output_formats=('csv',),
+         metrics_path=None, metrics_port=None):
+    global metrics, limiter, session, archive
+    metrics = ScrapeMetrics()
+    limiter = AdaptiveRateLimiter(min(rate, host_rate), max_rate=host_rate, metrics=metrics)
+    # One pooled connection per worker, plus one for the listing pages
+    session = ScraperSession(pool_size=workers + 1, timeout=tuple(timeout), headers=headers, metrics=metrics)
+    if archive_path is not None:
+        archive = HtmlArchive(archive_path)
+
+    # Product-level checkpoint
+    checkpoint = Checkpoint(checkpoint_file)
+
+    # Get the first page to scrape. last_page.txt holds the last *completed* page, so an old
+    # run resumes on the page after it.
+    start_page = checkpoint.resume_page(default=get_last_page() + 1 if os.path.exists(last_page_file) else 1)
+
+    # Products seen on earlier pages and runs, by item ID. Anything scraped less than
+    # refresh_after days ago is skipped; without refresh_after, seen products are never scraped again.
+    seen_index = SeenIndex(seen_index_file)
+    max_age = refresh_after * 86400 if refresh_after is not None else None
+    refresh_cutoff = time.time() - max_age if max_age is not None else None
+    queued_items = set()  # Item IDs queued during this run, so a reshuffled listing can't queue one twice
+    last_index_save = time.monotonic()
+    print(f"Loaded {len(seen_index)} seen products from {seen_index_file}")
+
+    # Output writers (the CSV and/or typed Parquet parts). Each one first drops anything written
+    # after the last checkpoint commit; outputs that predate the checkpoint count as written.
+    writer_classes = {'csv': (CsvWriter, csv_file), 'parquet': (ParquetWriter, parquet_dir)}
+    outputs = []
+    for output_format in output_formats:
+        writer_class, path = writer_classes[output_format]
+        committed = checkpoint.output_position(writer_class.position_key)
+        output = writer_class(path, fieldnames, committed=committed)
+        if output.recovered:
+            print(f"Removed output written after the last checkpoint from {path}")
+        if committed is None:
+            checkpoint.set_output_position(writer_class.position_key, output.flush())
+        outputs.append(output)
+
+    unflushed = []  # Products in the writers' buffers, (page, url, scraped)
+    finished_pages = []  # Pages whose products are all in the writers' buffers
+    last_flush = time.monotonic()
+
+    # Make the buffered rows durable, then record their products and finished pages in the
+    # checkpoint, so a crash can't lose or duplicate a row
+    def flush_outputs():
+        nonlocal last_flush
+        with metrics.timer('flush'):
+            positions = {output.position_key: output.flush() for output in outputs}
+            checkpoint.record(unflushed, positions)
+            for page in finished_pages:
+                checkpoint.complete_page(page)
+            for _, product_url, scraped in unflushed:
+                if scraped:
+                    seen_index.add(product_url)
+        unflushed.clear()
+        finished_pages.clear()
+        last_flush = time.monotonic()
+
+    # Called by the pipeline's writer with every batch of finished products, as (page, url,
+    # (record, parse timings)) tuples. Rows are buffered and flushed every batch_size products
+    # (or flush_interval seconds).
+    def write_rows(products):
+        records = []
+        for page, product_url, result in products:
+            record, timings = result if result is not None else (None, {})
+            for stage, seconds in timings.items():
+                metrics.observe(stage, seconds)
+            metrics.product(record)
+            unflushed.append((page, product_url, record is not None))
+            if record is not None:
+                records.append(record)
+        with metrics.timer('write'):
+            for output in outputs:
+                output.write(records)
+        if len(unflushed) >= batch_size or time.monotonic() - last_flush >= flush_interval:
+            flush_outputs()
+
+    # Called by the pipeline's writer for every finished listing page
+    def page_done(page):
+        nonlocal last_index_save
+        finished_pages.append(page)
+        if time.monotonic() - last_index_save >= seen_index_save_interval:
+            seen_index.save()
+            last_index_save = time.monotonic()
+
+    # Fetch, parse and write stages, each with its own number of workers
+    pipeline = ScrapePipeline(
+        fetch_product_page,
+        functools.partial(extract_product_details_timed, backend=extractor_backend),
+        write_rows,
+        page_done,
+        fetch_workers=workers,
+        parse_workers=parse_workers,
+        queue_size=queue_size,
+    )
+    exporter = MetricsExporter(metrics, metrics_path, metrics_port, metrics_interval)
+    if exporter.url:
+        print(f"Serving scrape metrics at {exporter.url}")
 
-    for page in range(start_page, max_pages + 1):
-        print(f"Scraping page {page}...")
+    try:
+        # Products that failed in an earlier run on a page the crawl won't visit again; their pages
+        # are queued again as they were, minus products scraped since under another URL
+        retry_pages = {}
+        for page, product_url in checkpoint.failed(before_page=start_page):
+            item_id = normalize_item_id(product_url)
+            if item_id in queued_items or seen_index.is_fresh(product_url, max_age):
+                continue
+            queued_items.add(item_id)
+            retry_pages.setdefault(page, []).append(product_url)
+        if retry_pages:
+            print(f"Retrying {sum(map(len, retry_pages.values()))} products that failed in earlier runs")
+        for page, product_links in retry_pages.items():
+            pipeline.submit_page(page, product_links)
+
+        for page in range(start_page, max_pages + 1):
+            print(f"Scraping page {page}...")
+
+            # Get all product links on the current page
+            product_links = scrape_search_results(page)
+
+            # If no links found, break the loop as the page might not exist or IP is blocked
+            if not product_links:
+                print(f"No product links found on page {page}. Ending scrape.")
+                break
+            metrics.count('pages')
+
+            # Queue each product that wasn't scraped recently, here or under another URL
+            new_links = []
+            for product_url in product_links:
+                item_id = normalize_item_id(product_url)
+                if item_id in queued_items or seen_index.is_fresh(product_url, max_age):
+                    continue
+                queued_items.add(item_id)
+                new_links.append(product_url)
+            pending_links = checkpoint.pending(new_links, finished_after=refresh_cutoff)
+            if len(pending_links) < len(product_links):
+                print(f"Skipping {len(product_links) - len(pending_links)} products already scraped")
+            checkpoint.start_page(page, len(pending_links))
+            pipeline.submit_page(page, pending_links)
+    finally:
+        pipeline.close()
+        flush_outputs()
+        for output in outputs:
+            output.close()
+        checkpoint.close()
+        seen_index.save()
+        if archive is not None:
+            archive.close()
+        exporter.close()
+        print(format_stats(session.stats()))
+        print(metrics.summary())
+        session.close()
 
-        # Get all product links on the current page
-        product_links = scrape_search_results(page)
+    print("Scraping complete.")
 
-        # If no links found, break the loop as the page might not exist or IP is blocked
-        if not product_links:
-            print(f"No product links found on page {page}. Ending scrape.")
-            break
-
-        # Visit each product page and scrape details
-        for product_url in product_links:
-            print(f"Scraping product: {product_url}")
-            details = scrape_product_details(product_url)
-            if details:
-                all_product_details.append(details)
-
-            # Delay to avoid overloading the server
-            time.sleep(15)  # Significantly increased delay
-
-        # Write data to the CSV file after each page
-        with open(csv_file, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Product', 'Product URL', 'Price', 'Stars', 'Status', 'Seller', 'Marca', 
-                          'Brand Extraction Method', 'Description', 'Shipping', 'Discount', 'Reviews Count', 'Category']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+# Incremental refresh: revisit known products, most volatile first, and append only the
+# products whose price, discount, status, stars or review count changed to the delta file
+def refresh(limit=1000, workers=1, rate=request_rate, host_rate=max_host_rate, timeout=default_timeout,
+            metrics_path=None, metrics_port=None):
+    global metrics, limiter, session
+    metrics = ScrapeMetrics()
+    limiter = AdaptiveRateLimiter(min(rate, host_rate), max_rate=host_rate, metrics=metrics)
+    session = ScraperSession(pool_size=workers, timeout=tuple(timeout), headers=headers, metrics=metrics)
+
+    # Track every product of the main CSV, then pick the next batch to revisit
+    state = RefreshState(refresh_state_file)
+    if os.path.isfile(csv_file):
+        added = state.seed_from_csv(csv_file)
+        if added:
+            print(f"Tracking {added} new products from {csv_file}")
+    products = list(state.queue(limit))
+
+    def refresh_one(product):
+        product_url, etag, last_modified, _ = product
+        print(f"Refreshing product: {product_url}")
+        try:
+            return product, refresh_product_details(product_url, etag, last_modified)
+        except HTTPError as e:
+            print(f"HTTP error occurred while refreshing product: {product_url} - {e}")
+        except RequestException as e:
+            print(f"Request failed while refreshing product: {product_url} - {e}")
+        metrics.product(None)
+        return product, None
+
+    unchanged = changed = failed = 0
+    exporter = MetricsExporter(metrics, metrics_path, metrics_port, metrics_interval)
+    if exporter.url:
+        print(f"Serving refresh metrics at {exporter.url}")
+    file_exists = os.path.isfile(delta_csv_file) and os.path.getsize(delta_csv_file) > 0
+    try:
+        with open(delta_csv_file, 'a', newline='', encoding='utf-8') as deltafile, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            writer = csv.DictWriter(deltafile, fieldnames=delta_fields + fieldnames)
             if not file_exists:
-                writer.writeheader()  # Write header only once
-                file_exists = True  # Set flag so that header isn't written again
-            writer.writerows(all_product_details)
-
-        # Save progress to last_page.txt
-        save_last_page(page)
-
-        # Clear the product details list to free up memory
-        all_product_details.clear()
+                writer.writeheader()
 
-        # Additional delay between pages
-        time.sleep(60)
-
-    print("Scraping complete.")
+            for (product_url, _, _, old_values), result in executor.map(refresh_one, products):
+                if result is None:
+                    failed += 1
+                    continue
+                details, etag, last_modified = result
+                fields = changed_fields(old_values, details) if details else []
+                state.record(product_url, details, etag, last_modified, bool(fields))
+                if fields:
+                    changed += 1
+                    writer.writerow({'Checked At': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                                     'Changed Fields': ', '.join(fields), **details})
+                    deltafile.flush()
+                else:
+                    unchanged += 1
+                if (changed + unchanged) % 100 == 0:
+                    state.commit()
+    finally:
+        state.close()
+        exporter.close()
+        print(format_stats(session.stats()))
+        print(metrics.summary())
+        session.close()
+
+    print(f"Refresh complete: {changed} changed, {unchanged} unchanged, {failed} failed.")
 
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    base_url = args.base_url
+    max_retries = args.max_retries
+    batch_size = args.batch_size
+    extractor_backend = args.extractor
+    metrics_interval = args.metrics_interval
+    if args.re_extract is not None:
+        # Offline mode: parse the archived pages again and rebuild the CSV
+        print(f"Re-extracting products from {args.re_extract} into {csv_file}...")
+        try:
+            rows = re_extract(args.re_extract, csv_file, fieldnames, backend=extractor_backend,
+                              workers=args.parse_workers or None, allow_missing=args.allow_missing)
+        except (FileNotFoundError, ValueError) as e:
+            sys.exit(f"Re-extraction refused: {e}. The CSV was left unchanged"
+                     + (" (pass --allow-missing to rebuild it anyway)." if isinstance(e, ValueError) else "."))
+        # The CSV was rewritten, so the checkpoint must not treat its new size as a torn write
+        checkpoint = Checkpoint(checkpoint_file)
+        checkpoint.set_output_position(CsvWriter.position_key, os.path.getsize(csv_file))
+        checkpoint.close()
+        print(f"Re-extraction complete: {rows} products written.")
+    elif args.refresh is not None:
+        refresh(limit=args.refresh, workers=args.workers, rate=args.rate, host_rate=args.max_host_rate,
+                timeout=args.timeout, metrics_path=args.metrics_file, metrics_port=args.metrics_port)
+    else:
+        main(workers=args.workers, rate=args.rate, host_rate=args.max_host_rate, max_pages=args.max_pages,
+             timeout=args.timeout, parse_workers=args.parse_workers, queue_size=args.queue_size,
+             refresh_after=args.refresh_after, archive_path=args.archive, output_formats=args.output,
+             metrics_path=args.metrics_file, metrics_port=args.metrics_port)
@@ -1,66 +1,14 @@
-import pandas as pd
 import os
-import matplotlib.pyplot as plt
+import sys
+
+# Make the analysis package importable from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..')))
+from analysis.engine import run_reports
 
 # Prompt for file path and clean it
 file_path = input("Enter the file path of the dataset: ").strip('"').replace("\\", "/")
-output_dir = os.path.dirname(file_path)
-
-# Load the dataset
-df = pd.read_csv(file_path)
-
-# Ensure that 'Sale Price USD' is numeric
-df['Sale Price USD'] = pd.to_numeric(df['Sale Price USD'], errors='coerce')
-
-# Remove rows with missing price data
-df = df.dropna(subset=['Sale Price USD'])
-
-# Find the top 10 most expensive products
-most_expensive = df.nlargest(10, 'Sale Price USD')
-
-# Find the top 10 least expensive products
-least_expensive = df.nsmallest(10, 'Sale Price USD')
-
-# Simplify product names for cleaner charts
-most_expensive['Short Name'] = most_expensive['Product'].apply(lambda x: ' '.join(str(x).split()[:3]) + '...')
-least_expensive['Short Name'] = least_expensive['Product'].apply(lambda x: ' '.join(str(x).split()[:3]) + '...')
-
-# Combine both results for easy export
-expensive_summary = pd.concat([most_expensive, least_expensive])
-output_file = os.path.join(output_dir, 'expensive_summary.csv')
-expensive_summary.to_csv(output_file, index=False)
-
-# Display the summary
-print("Most Expensive Products:")
-print(most_expensive[['Short Name', 'Sale Price USD', 'Seller', 'Marca']])
-
-print("\nLeast Expensive Products:")
-print(least_expensive[['Short Name', 'Sale Price USD', 'Seller', 'Marca']])
-
-print(f"Summary of most and least expensive products saved to {output_file}")
-
-# Plot the top 10 most expensive products
-plt.figure(figsize=(10, 6))
-plt.barh(most_expensive['Short Name'], most_expensive['Sale Price USD'], color='green')
-plt.xlabel('Sale Price USD')
-plt.ylabel('Product')
-plt.title('Top 10 Most Expensive Products')
-plt.gca().invert_yaxis()  # Highest price on top
-plt.tight_layout()
-most_expensive_chart = os.path.join(output_dir, 'most_expensive_chart.png')
-plt.savefig(most_expensive_chart)
-plt.show()
-
-# Plot the top 10 least expensive products
-plt.figure(figsize=(10, 6))
-plt.barh(least_expensive['Short Name'], least_expensive['Sale Price USD'], color='blue')
-plt.xlabel('Sale Price USD')
-plt.ylabel('Product')
-plt.title('Top 10 Least Expensive Products')
-plt.gca().invert_yaxis()  # Lowest price on top
-plt.tight_layout()
-least_expensive_chart = os.path.join(output_dir, 'least_expensive_chart.png')
-plt.savefig(least_expensive_chart)
-plt.show()
 
-print(f"Charts saved as {most_expensive_chart} and {least_expensive_chart}")
+# Build the report (see analysis/reports.py), saving its files next to the dataset, and show the charts.
+# "Analysis Reports.py" builds every report in one run without prompting.
+outputs = run_reports(file_path, ['Most and Least Expensive Products'], show=True)
+print("Files saved:\n" + "\n".join(f" - {path}" for path in outputs))
@@ -1,7 +1,9 @@
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import os
+import sys
+
+# Make the analysis package importable from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..')))
+from analysis.engine import run_reports
 
 # Function to clean file paths
 def clean_file_path(file_path):
@@ -10,42 +12,14 @@ def clean_file_path(file_path):
 
 # Prompt for input file path
 input_file = input("Enter the path to your CSV file: ").strip()
-input_file = clean_file_path(input_file)
+file_path = clean_file_path(input_file)
 
 # Ensure the input file path is cleaned and exists
-if not os.path.isfile(input_file):
+if not os.path.isfile(file_path):
     print("File not found. Please check the path and try again.")
     exit()
 
-# Load the dataset
-df = pd.read_csv(input_file)
-
-# Clean and convert the Price column to numeric
-df['Sale Price USD'] = pd.to_numeric(df['Sale Price USD'].replace('[^\d.]', '', regex=True), errors='coerce')
-
-# Drop rows with NaN values in the Price column
-df = df.dropna(subset=['Sale Price USD'])
-
-# Create output directory if it doesn't exist
-output_dir = os.path.dirname(input_file)
-output_file_hist = os.path.join(output_dir, 'price_distribution_histogram.png')
-output_file_box = os.path.join(output_dir, 'price_distribution_boxplot.png')
-
-# Plot histogram for price distribution
-plt.figure(figsize=(10, 6))
-sns.histplot(df['Sale Price USD'], bins=30, kde=True)
-plt.title("Sale Price Distribution of *Ofertas* Products")
-plt.xlabel("Sale Price")
-plt.ylabel("Frequency")
-plt.savefig(output_file_hist)
-print(f"Histogram saved to {output_file_hist}")
-plt.show()
-
-# Plot box plot for price distribution
-plt.figure(figsize=(8, 4))
-sns.boxplot(x=df['Sale Price USD'])
-plt.title("Sale Price Range and Outliers")
-plt.xlabel("Sale Price")
-plt.savefig(output_file_box)
-print(f"Box plot saved to {output_file_box}")
-plt.show()
+# Build the report (see analysis/reports.py), saving its files next to the dataset, and show the charts.
+# "Analysis Reports.py" builds every report in one run without prompting.
+outputs = run_reports(file_path, ['Price Distribution Analysis'], show=True)
+print("Files saved:\n" + "\n".join(f" - {path}" for path in outputs))
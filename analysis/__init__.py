@@ -0,0 +1 @@
+# Helpers shared by the analysis scripts (Sales Price Calculator.py and the Visualizations/ scripts)
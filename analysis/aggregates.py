@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import io
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.dataset import apply_schema
+from analysis.pricing import discount_tier_labels, discount_tiers
+
+# Groupings kept in the store: name -> (function selecting the rows that count, or None for
+# all rows, and the columns the rows are grouped by)
+dimensions = {
+    'seller': (None, ['Seller']),
+    'rated seller': (lambda df: df[df['Stars'] > 0], ['Seller']),
+    'category': (None, ['Category']),
+    'status': (None, ['Status']),
+    'discount tier': (lambda df: df[df['Discount'] != 'No Discount'], ['Discount Tier']),
+    'discount tier status': (lambda df: df[df['Discount'] != 'No Discount'], ['Discount Tier', 'Status']),
+}
+
+# Columns summarized in every group: numeric ones get count, sum, min and max (and a histogram),
+# text ones only the count of non-missing values. Rows are counted under the measure 'rows'.
+numeric_measures = ['Sale Price USD', 'Stars']
+text_measures = ['Product']
+
+# Fixed histogram bins, so histograms from different batches of rows add up: sale prices on a
+# log scale from 1 cent to 1,000,000 USD, star ratings one bin per 0.1 star
+histogram_edges = {
+    'Sale Price USD': np.concatenate([[0], np.logspace(-2, 6, 81)]),
+    'Stars': np.linspace(-0.05, 5.05, 52),
+}
+
+# Bytes at the start of a source CSV whose hash identifies it
+signature_size = 1 << 16
+
+# Position just past the last newline in f between `offset` and `size`, searched backwards from
+# the end in 64 KB blocks (`offset` when there is none)
+def _last_line_end(f, offset, size):
+    position = size
+    while position > offset:
+        block_start = max(offset, position - (1 << 16))
+        f.seek(block_start)
+        newline = f.read(position - block_start).rfind(b'\n')
+        if newline >= 0:
+            return block_start + newline + 1
+        position = block_start
+    return offset
+
+# Read-only view of the next `length` bytes of a binary file, for parsing part of a file as a stream
+class _FileSlice(io.RawIOBase):
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+# Mergeable per-group aggregates (count, sum, min, max and histogram bins) of one dataset, kept in
+# SQLite so reports can read their numbers without going through the rows:
+#   aggregates: dimension, group key, measure -> count, sum, min, max
+#   histograms: dimension, group key, measure, bin -> count
+#   meta:       how far the source has been folded in
+# update() folds in only the rows added to the source since the last update: the bytes past the
+# last folded offset of a CSV the scraper appends to, or Parquet parts not seen before. If the
+# source was rewritten instead of appended to (e.g. truncated by the scraper's crash recovery),
+# the store is rebuilt from scratch. Rows are typed by the shared loader (apply_schema), which
+# derives 'Sale Price USD' for the scraper's output, so its price measures are folded too.
+class AggregateStore:
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.db = sqlite3.connect(path)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS aggregates (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                subkey TEXT NOT NULL,
+                measure TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL,
+                min REAL,
+                max REAL,
+                PRIMARY KEY (dimension, key, subkey, measure)
+            );
+            CREATE TABLE IF NOT EXISTS histograms (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                subkey TEXT NOT NULL,
+                measure TEXT NOT NULL,
+                bin INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (dimension, key, subkey, measure, bin)
+            );
+            CREATE TABLE IF NOT EXISTS folded_parts (
+                part TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+
+    def _meta(self, key, default=None):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(value)))
+
+    def _reset(self):
+        for name in ('aggregates', 'histograms', 'folded_parts', 'meta'):
+            self.db.execute(f'DELETE FROM {name}')
+
+    # Number of source rows folded in so far
+    def rows(self):
+        return int(self._meta('rows', 0))
+
+    # Fold the rows added to the source since the last update into the aggregates. Returns the
+    # number of rows folded.
+    def update(self, chunksize=100000):
+        if self._meta('source') != os.path.abspath(self.source):
+            self._reset()
+            self._set_meta('source', os.path.abspath(self.source))
+        frames = self._new_parquet_rows() if os.path.isdir(self.source) else self._new_csv_rows(chunksize)
+        rows = 0
+        for frame in frames:
+            self.fold(apply_schema(frame))
+            rows += len(frame)
+        self._set_meta('rows', self.rows() + rows)
+        self.db.commit()
+        return rows
+
+    # New rows of a CSV source, in chunks. Rows are read up to the last complete line, so a row
+    # the scraper is still writing is left for the next update (the scraper flushes whole batches,
+    # so this only matters while a flush is in progress). The new bytes are streamed from the file
+    # `chunksize` rows at a time, so memory doesn't grow with how much was appended.
+    def _new_csv_rows(self, chunksize):
+        with open(self.source, 'rb') as f:
+            header = f.readline()
+            offset = int(self._meta('offset', f.tell()))
+            signature_length = int(self._meta('signature_length', 0))
+            f.seek(0)
+            start = f.read(signature_length)
+            size = os.fstat(f.fileno()).st_size
+            if size < offset or hashlib.sha256(start).hexdigest() != self._meta('signature', hashlib.sha256(b'').hexdigest()):
+                print(f"{self.source} was rewritten; rebuilding the aggregates")
+                self._reset()
+                self._set_meta('source', os.path.abspath(self.source))
+                offset = len(header)
+            end = _last_line_end(f, offset, size)
+            f.seek(0)
+            start = f.read(min(end, signature_size))
+
+        self._set_meta('offset', end)
+        self._set_meta('signature_length', len(start))
+        self._set_meta('signature', hashlib.sha256(start).hexdigest())
+        if end > offset:
+            names = pd.read_csv(io.BytesIO(header), nrows=0).columns
+            with open(self.source, 'rb') as f:
+                f.seek(offset)
+                rows = io.BufferedReader(_FileSlice(f, end - offset), buffer_size=1 << 20)
+                yield from pd.read_csv(rows, names=names, header=None, chunksize=chunksize)
+
+    # Parquet parts of a source directory (e.g. the scraper's Parquet output) not folded yet
+    def _new_parquet_rows(self):
+        parts = sorted(os.path.relpath(os.path.join(root, name), self.source)
+                       for root, _, files in os.walk(self.source)
+                       for name in files if name.endswith('.parquet'))
+        folded = {row[0] for row in self.db.execute('SELECT part FROM folded_parts')}
+        if folded - set(parts):
+            print(f"Parts were removed from {self.source}; rebuilding the aggregates")
+            self._reset()
+            self._set_meta('source', os.path.abspath(self.source))
+            folded = set()
+        for part in parts:
+            if part not in folded:
+                yield pd.read_parquet(os.path.join(self.source, part))
+                self.db.execute('INSERT INTO folded_parts VALUES (?)', (part,))
+
+    # Merge the aggregates of a batch of typed rows into the store
+    def fold(self, df):
+        if 'Discount' in df:
+            df = df.assign(**{'Discount Tier': discount_tiers(df['Discount'])})
+        for dimension, (select, columns) in dimensions.items():
+            if not all(column in df for column in columns):
+                continue
+            rows = select(df) if select is not None else df
+            if rows.empty:
+                continue
+            groups = rows.groupby(columns, observed=True)
+            sizes = groups.size()
+            keys = [self._group_key(key) for key in sizes.index]
+
+            self._merge(dimension, keys, 'rows', sizes.to_numpy(), None, None, None)
+            for measure in text_measures:
+                if measure in rows:
+                    self._merge(dimension, keys, measure, groups[measure].count().to_numpy(), None, None, None)
+            for measure in numeric_measures:
+                if measure in rows:
+                    stats = groups[measure].agg(['count', 'sum', 'min', 'max'])
+                    self._merge(dimension, keys, measure, stats['count'].to_numpy(), stats['sum'].to_numpy(),
+                                stats['min'].to_numpy(), stats['max'].to_numpy())
+                    self._merge_histogram(dimension, columns, rows, measure)
+
+    # (key, subkey) text of a group index entry
+    def _group_key(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        return str(key[0]), str(key[1]) if len(key) > 1 else ''
+
+    def _merge(self, dimension, keys, measure, counts, sums, mins, maxes):
+        def value(values, i):
+            return None if values is None or pd.isna(values[i]) else float(values[i])
+        self.db.executemany('''
+            INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (dimension, key, subkey, measure) DO UPDATE SET
+                count = count + excluded.count,
+                sum = coalesce(sum, 0) + coalesce(excluded.sum, 0),
+                min = min(coalesce(min, excluded.min), coalesce(excluded.min, min)),
+                max = max(coalesce(max, excluded.max), coalesce(excluded.max, max))
+        ''', [(dimension, key, subkey, measure, int(counts[i]), value(sums, i), value(mins, i), value(maxes, i))
+              for i, (key, subkey) in enumerate(keys)])
+
+    def _merge_histogram(self, dimension, columns, rows, measure):
+        values = rows[measure]
+        present = values.notna()
+        edges = histogram_edges[measure]
+        bins = np.clip(np.searchsorted(edges, values[present].to_numpy(), side='right') - 1, 0, len(edges) - 2)
+        counts = rows.loc[present, columns].assign(bin=bins).groupby(columns + ['bin'], observed=True).size()
+        self.db.executemany('''
+            INSERT INTO histograms VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (dimension, key, subkey, measure, bin) DO UPDATE SET count = count + excluded.count
+        ''', [(dimension, *self._group_key(key[:-1]), measure, int(key[-1]), int(count)) for key, count in counts.items()])
+
+    # One row per group of `dimension`: the group key column(s), 'rows', and '<measure> count',
+    # plus sum, min, max and mean for numeric measures. Groups are sorted by key.
+    def summary(self, dimension):
+        columns = dimensions[dimension][1]
+        # One SQL pass turns the (group, measure) rows into one row per group
+        selects = ["SUM(CASE WHEN measure = 'rows' THEN count END)"]
+        names = ['rows']
+        for measure in text_measures + numeric_measures:
+            stats = ['count', 'sum', 'min', 'max'] if measure in numeric_measures else ['count']
+            selects += [f"SUM(CASE WHEN measure = '{measure}' THEN {stat} END)" for stat in stats]
+            names += [f'{measure} {stat}' for stat in stats]
+        records = self.db.execute(f"SELECT key, subkey, {', '.join(selects)} FROM aggregates WHERE dimension = ? "
+                                  "GROUP BY key, subkey ORDER BY key, subkey", (dimension,)).fetchall()
+        summary = pd.DataFrame(records, columns=columns + ['subkey'] * (2 - len(columns)) + names)
+        for measure in numeric_measures:
+            count = summary[f'{measure} count']
+            summary[f'{measure} mean'] = summary[f'{measure} sum'].where(count > 0) / count
+        return summary.drop(columns=['subkey'], errors='ignore')
+
+    # Histogram of `measure` for one group of `dimension`: counts per bin, with the bin edges
+    def histogram(self, dimension, key, measure, subkey=''):
+        edges = histogram_edges[measure]
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        for bin_number, count in self.db.execute('SELECT bin, count FROM histograms WHERE dimension = ? AND key = ? '
+                                                 'AND subkey = ? AND measure = ?', (dimension, key, subkey, measure)):
+            counts[bin_number] = count
+        return counts, edges
+
+    def close(self):
+        self.db.close()
+
+# Frames the reports read (see analysis.reports), built from the store instead of the rows
+
+def seller_counts(store):
+    summary = store.summary('seller')
+    return pd.Series(summary['rows'].to_numpy(), index=pd.Index(summary['Seller'], name='Seller'))
+
+def status_counts(store):
+    summary = store.summary('status').sort_values('rows', ascending=False, kind='stable')
+    return pd.Series(summary['rows'].to_numpy(), index=pd.Index(summary['Status'], name='Status'), name='count')
+
+def category_prices(store):
+    summary = store.summary('category')
+    category_summary = pd.DataFrame({'Category': summary['Category'], 'Average Price (USD)': summary['Sale Price USD mean']})
+    return category_summary.sort_values(by='Average Price (USD)', ascending=True)
+
+def seller_summary(store):
+    summary = store.summary('rated seller')
+    return pd.DataFrame({
+        'Seller': summary['Seller'],
+        'Product_Count': summary['Product count'],
+        'Average_Price': summary['Sale Price USD mean'],
+        'Average_Rating': summary['Stars mean'],
+    })
+
+def availability_by_discount(store):
+    summary = store.summary('discount tier status')
+    counts = summary.pivot(index='Discount Tier', columns='Status', values='rows').fillna(0)
+    counts = counts.reindex([tier for tier in discount_tier_labels if tier in counts.index])
+    counts.index = pd.CategoricalIndex(counts.index, categories=discount_tier_labels, name='Discount Tier')
+    return counts.div(counts.sum(axis=1), axis=0)
+
+store_frames = {
+    'seller_counts': seller_counts,
+    'status_counts': status_counts,
+    'category_prices': category_prices,
+    'seller_summary': seller_summary,
+    'availability_by_discount': availability_by_discount,
+}
+
+# Default store location for a source: next to it, named after it
+def default_store_path(source):
+    return os.path.join(os.path.dirname(os.path.abspath(source)), os.path.basename(os.path.normpath(source)) + '.aggregates.sqlite3')
+
+# Fold new rows of a dataset CSV or Parquet directory into its aggregate store
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold new dataset rows into the incremental aggregate store.")
+    parser.add_argument('source', help="Dataset CSV (e.g. the scraper's CSV) or Parquet output directory")
+    parser.add_argument('--store', default=None, help="Store file (default: <source>.aggregates.sqlite3 next to it)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = AggregateStore(args.store or default_store_path(args.source), args.source)
+    rows = store.update()
+    print(f"Folded {rows:,} new rows in {time.perf_counter() - start:.2f}s ({store.rows():,} in total) into {store.path}")
+    store.close()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# Columns the reports' bitmap index covers: the low-cardinality ones reports filter and
+# cross-tabulate by ('Discount Tier' is derived from 'Discount')
+bitmap_columns = ['Status', 'Shipping', 'Discount Tier', 'Category']
+
+# Set bits per byte value, for numpy versions without np.bitwise_count
+popcount_table = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+# Number of set bits along the last axis of packed bitmaps
+def popcount(bitmaps):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitmaps).sum(axis=-1, dtype=np.int64)
+    return popcount_table[bitmaps].sum(axis=-1, dtype=np.int64)
+
+# Bitmap index over low-cardinality columns: for each distinct value of a column, one bit per row
+# (bit-packed, 1 bit per row) saying whether the row holds that value. Built once, it answers any
+# combination of filters and cross-tabs with bitwise ANDs and ORs and popcounts instead of scanning
+# the frame. Missing values get no bit. `where` filters are {column: value or list of values}:
+# a row matches when it holds one of the values of every column.
+class BitmapIndex:
+    def __init__(self, df, columns):
+        self.rows = len(df)
+        self.values = {}  # column -> its distinct values, in category order
+        self.bitmaps = {}  # column -> packed bitmaps, one row per value
+        for column in columns:
+            if column not in df:
+                continue
+            series = df[column].astype('category')
+            codes = series.cat.codes.to_numpy()
+            self.values[column] = list(series.cat.categories)
+            self.bitmaps[column] = np.packbits(codes[None, :] == np.arange(len(self.values[column]))[:, None], axis=1)
+
+    # Bitmap of the rows holding `value` (or any of a list of values) in `column`
+    def bitmap(self, column, value):
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        positions = [self.values[column].index(value) for value in values if value in self.values[column]]
+        return np.bitwise_or.reduce(self.bitmaps[column][positions], axis=0) if positions else self._none()
+
+    def _none(self):
+        return np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+
+    def _all(self):
+        return np.packbits(np.ones(self.rows, dtype=bool))
+
+    # Bitmap of the rows matching every filter in `where`
+    def mask(self, where=None):
+        mask = self._all()
+        for column, value in (where or {}).items():
+            mask &= self.bitmap(column, value)
+        return mask
+
+    # Number of rows matching `where`
+    def count(self, where=None):
+        return int(popcount(self.mask(where)))
+
+    # Rows matching `where` per value of `column`, as a Series (values no matching row holds are
+    # left out, like value_counts() on observed categories)
+    def counts(self, column, where=None):
+        counts = popcount(self.bitmaps[column] & self.mask(where))
+        return pd.Series(counts, index=pd.Index(self.values[column], name=column), name='count')[counts > 0]
+
+    # Rows matching `where` per pair of values of `index` and `columns`, as a frame with a row per
+    # value of `index` and a column per value of `columns` (like pivot_table(aggfunc='size',
+    # observed=True, fill_value=0), leaving out values no matching row holds)
+    def crosstab(self, index, columns, where=None):
+        rows = self.bitmaps[index] & self.mask(where)
+        counts = popcount(rows[:, None, :] & self.bitmaps[columns][None, :, :])
+        table = pd.DataFrame(counts, index=pd.Index(self.values[index], name=index),
+                             columns=pd.Index(self.values[columns], name=columns))
+        return table.loc[counts.sum(axis=1) > 0, counts.sum(axis=0) > 0]
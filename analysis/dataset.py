@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from analysis.pricing import with_sale_price
+from analysis.text import map_unique, normalize
+
+# pyarrow is optional: without it the CSV is parsed on every load instead of cached
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Columns holding numbers; anything that doesn't parse (e.g. 'N/A') becomes NaN
+numeric_columns = ['MXN', 'MXN to USD Rate', 'USD', 'Stars', 'Reviews Count', 'Sale Price USD']
+
+# Low-cardinality text columns, stored as pandas categoricals. 'Scraped Category' keeps the
+# Category text as scraped, before normalize_categories(), for the row exports
+category_columns = ['Seller', 'Marca', 'Category', 'Scraped Category', 'Status', 'Shipping']
+
+# Category labels merged into one bucket, along with missing categories
+other_category = 'Otras Categorias'
+other_category_labels = ['Unknown', 'Otras Categorias', 'nan']
+
+# Rows per row group in the cached copy
+row_group_size = 10000
+
+# Typed columns the scraper writes next to the raw text ones (see scraper.records); they are read
+# instead of parsing the text again, which is only done for CSVs written before they existed
+typed_columns = {'Stars': 'Stars Value', 'Reviews Count': 'Reviews Count Value'}
+
+# Bump when the schema above changes, so cached copies made with the old schema are rebuilt
+schema_version = 5
+
+# A number in text, once thousands separators are removed
+number_pattern = r'(-?\d+(?:\.\d+)?)'
+
+# First number ("-" sign included) in each value of a column that may hold text such as
+# "1,299.00", "4.5 de 5" or 'N/A', thousands separators dropped, as scraper.records.parse_number does
+def to_numeric(series):
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.astype(str).str.replace(',', '', regex=False).str.extract(number_pattern, expand=False)
+    return pd.to_numeric(series, errors='coerce')
+
+# Category name without accents, with the unknown/other/missing ones combined
+def category_label(category):
+    if pd.isna(category):
+        return other_category
+    category = normalize(str(category))
+    return other_category if category in other_category_labels else category
+
+# Category names without accents, with the unknown/other/missing ones combined, as a categorical;
+# each distinct name is normalized once
+def normalize_categories(series):
+    return map_unique(series, category_label)
+
+# Columns of the scraper's output that 'Sale Price USD' (and the 'MXN' and 'USD' prices it is
+# computed from) are derived from when a dataset doesn't have them (see pricing.with_sale_price)
+price_sources = {
+    'Sale Price USD': [['USD', 'Discount'], ['Price Value', 'Discount Fraction']],
+    'USD': [['Price Value', 'Discount Fraction']],
+    'MXN': [['Price Value', 'Discount Fraction']],
+}
+
+# Columns to read from the CSV at `path` so that apply_schema() gives `columns` (None for all):
+# the typed version of a column when it has one, otherwise the column itself, plus those the
+# missing prices are derived from
+def source_columns(path, columns):
+    if columns is None:
+        return None
+    header = list(pd.read_csv(path, nrows=0).columns)
+    wanted = []
+    for column in columns:
+        if typed_columns.get(column) in header:
+            sources = [typed_columns[column]]
+        elif column in header:
+            sources = [column]
+        else:
+            sources = next((sources for sources in price_sources.get(column, [])
+                            if all(source in header for source in sources)), [])
+        wanted += [source for source in sources if source not in wanted]
+    return wanted
+
+# Give a freshly read dataset its dtypes: numeric columns as floats (taken from their typed
+# column when there is one), 'Sale Price USD' computed if it is missing (e.g. the scraper's
+# output), the Category column normalized (its text as scraped kept as 'Scraped Category'), and
+# the low-cardinality columns as categoricals
+def apply_schema(df):
+    for column in numeric_columns:
+        source = typed_columns.get(column)
+        if source not in df:
+            source = column
+        if source in df:
+            df[column] = to_numeric(df[source])
+    df = with_sale_price(df)
+    if 'Category' in df:
+        df['Scraped Category'] = df['Category']
+        df['Category'] = normalize_categories(df['Category'])
+    for column in category_columns:
+        if column in df:
+            df[column] = df[column].astype('category')
+    return df
+
+# SHA-256 of a file, read in 1 MB blocks
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Hash of the source file. The hash is remembered in the cache directory together with the
+# file's mtime and size, so an unchanged file is only hashed once.
+def source_digest(path, cache_dir):
+    index_file = os.path.join(cache_dir, 'index.json')
+    try:
+        with open(index_file, encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    entry = index.get(key)
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry['sha256']
+
+    index[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_digest(path)}
+    with open(index_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    os.replace(index_file + '.tmp', index_file)
+    return index[key]['sha256']
+
+# Path of the typed Parquet copy of a dataset CSV in `cache_dir` (default: a .dataset_cache
+# folder next to the CSV), named after the CSV's hash. The copy may not exist yet.
+def cache_path(path, cache_dir=None):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.dataset_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}-{source_digest(path, cache_dir)[:16]}-v{schema_version}.parquet')
+
+# Path of the typed Parquet copy of a dataset CSV (see cache_path()). The copy is built if it
+# doesn't exist yet (or `refresh` is set), in which case the full typed frame is returned with the
+# path; an edited CSV gets a new copy and the old one is removed. Returns (path, frame or None).
+def cached_copy(path, cache_dir=None, refresh=False):
+    cache_file = cache_path(path, cache_dir)
+    cache_dir, cache_name = os.path.split(cache_file)
+    stem = os.path.splitext(os.path.basename(path))[0]
+
+    if os.path.exists(cache_file) and not refresh:
+        return cache_file, None
+
+    df = apply_schema(pd.read_csv(path))
+    # Small row groups let load_rows() read a handful of rows without decoding whole columns
+    df.to_parquet(cache_file + '.tmp', index=False, row_group_size=row_group_size)
+    os.replace(cache_file + '.tmp', cache_file)
+
+    # Drop copies cached for older versions of the same file
+    for name in os.listdir(cache_dir):
+        if name.endswith('.parquet') and name.rsplit('-', 2)[0] == stem and name != cache_name:
+            os.remove(os.path.join(cache_dir, name))
+    return cache_file, df
+
+# Load a dataset CSV with its dtypes applied, reading only `columns` (all by default). Loads
+# come from the cached Parquet copy, so only the first one parses the CSV and each column is
+# read on its own; the rows keep their position in the CSV as index.
+def load_dataset(path, columns=None, cache_dir=None, refresh=False):
+    if pq is None:
+        df = apply_schema(pd.read_csv(path, usecols=source_columns(path, columns)))
+        return df if columns is None else df[columns]
+
+    cache_file, df = cached_copy(path, cache_dir, refresh)
+    if df is None:
+        return pd.read_parquet(cache_file, columns=columns)
+    return df if columns is None else df[columns]
+
+# Read a dataset CSV `chunksize` rows at a time, with its dtypes applied, reading only `columns`
+# (all by default). Yields frames whose rows keep their position in the CSV as index; a numeric
+# column may be integers in some chunks and floats in others. The cached Parquet copy is read when there is one, but
+# never built, since building it takes the whole dataset in memory.
+def read_chunks(path, columns=None, chunksize=row_group_size, cache_dir=None):
+    if pq is not None:
+        cache_file = cache_path(path, cache_dir)
+        if os.path.exists(cache_file):
+            start = 0
+            for batch in pq.ParquetFile(cache_file).iter_batches(batch_size=chunksize, columns=columns):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+            return
+
+    for chunk in pd.read_csv(path, usecols=source_columns(path, columns), chunksize=chunksize):
+        chunk = apply_schema(chunk)
+        yield chunk if columns is None else chunk[columns]
+
+# Full rows (or just `columns`) for the given row labels of a frame from load_dataset(), in that
+# order. Reports select rows using the small columns and fetch the large text ones (Product,
+# Description) for the selected rows only; only the row groups holding them are read. With
+# `chunksize` and no cached copy yet, the CSV is scanned that many rows at a time instead of
+# being cached, so memory use doesn't grow with the dataset (see read_chunks()).
+def load_rows(path, rows, columns=None, cache_dir=None, chunksize=None):
+    rows = list(rows)
+    if chunksize and (pq is None or not os.path.exists(cache_path(path, cache_dir))):
+        wanted = set(rows)
+        pieces = []
+        integers = {}  # Numeric column -> whether it held only integers in every chunk so far
+        for chunk in read_chunks(path, columns, chunksize, cache_dir):
+            pieces.append(chunk[chunk.index.isin(wanted)])
+            for column in numeric_columns:
+                if column in chunk:
+                    integers[column] = integers.get(column, True) and pd.api.types.is_integer_dtype(chunk[column])
+        df = pd.concat(pieces).loc[rows]
+        # The dtypes load_dataset() would give the columns, reading the whole CSV at once
+        for column, integer in integers.items():
+            df[column] = df[column].astype('int64' if integer else float)
+        return df
+    if pq is None:
+        return load_dataset(path, columns).loc[rows]
+
+    cache_file, df = cached_copy(path, cache_dir)
+    if df is not None:
+        return (df if columns is None else df[columns]).loc[rows]
+
+    parquet = pq.ParquetFile(cache_file)
+    wanted = sorted(set(rows))
+    pieces = []
+    start = 0
+    for group in range(parquet.num_row_groups):
+        end = start + parquet.metadata.row_group(group).num_rows
+        positions = [row for row in wanted if start <= row < end]
+        if positions:
+            piece = parquet.read_row_group(group, columns=columns).take([row - start for row in positions]).to_pandas()
+            piece.index = positions
+            pieces.append(piece)
+        start = end
+    return pd.concat(pieces).loc[rows]
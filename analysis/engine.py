@@ -0,0 +1,199 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from analysis.aggregates import store_frames
+from analysis.dataset import load_dataset, load_rows, read_chunks
+from analysis.query import query_frames
+from analysis.reports import intermediates, report_columns, reports, streaming_reports
+
+# Render worker setup: draw without a display
+def headless():
+    matplotlib.use('Agg')
+
+# Draw a chart with `draw(*args, **kwargs)` and save it as `path` (run in a render worker)
+def render_chart(path, draw, args, kwargs):
+    draw(*args, **kwargs)
+    plt.savefig(path)
+    plt.close()
+
+# Runs a set of reports over one dataset in a single pass. Each intermediate frame the reports
+# depend on (see analysis.reports) is built once, when first asked for, and dropped as soon as
+# nothing left to run reads it. Frames can instead come from an AggregateStore (`store`) or a
+# ProductDatabase (`database`), or be streamed `chunksize` rows at a time; charts can be drawn
+# in `render_workers` processes.
+class ReportEngine:
+    def __init__(self, path, names, output_dir=None, show=False, render_workers=0, scatter='density', log_reviews=False,
+                 store=None, chunksize=None, database=None):
+        unknown = [name for name in names if name not in reports]
+        if unknown:
+            raise ValueError(f"Unknown reports: {', '.join(unknown)}")
+        self.path = path
+        self.names = list(names)
+        self.output_dir = output_dir if output_dir is not None else os.path.dirname(path)
+        self.show = show
+        self.render_workers = render_workers
+        self.scatter = scatter
+        self.log_reviews = log_reviews
+        self.store = store
+        self.database = database
+        self.chunksize = chunksize
+        self.streamed = [name for name in self.names if chunksize and name in streaming_reports]
+        self.executor = None
+        self.renders = []
+        self.outputs = []
+        self.frames = {}
+
+        # Number of pending reports and intermediates that still read each frame
+        self.readers = {}
+        for name in self.names:
+            if name not in self.streamed:
+                self._add_reader(reports[name][0])
+
+    def _add_reader(self, inputs):
+        for name in inputs:
+            self.readers[name] = self.readers.get(name, 0) + 1
+            if self.readers[name] == 1 and name in intermediates and not self._served(name):
+                self._add_reader(intermediates[name][0])
+
+    def _from_store(self, name):
+        return self.store is not None and name in store_frames
+
+    def _from_database(self, name):
+        return self.database is not None and name in query_frames
+
+    # Whether a frame is read whole from the store or the database rather than built
+    def _served(self, name):
+        return self._from_store(name) or self._from_database(name)
+
+    # Every column the selected reports read (only the streamed ones with `streamed`)
+    def columns(self, streamed=False):
+        columns = []
+        for name in self.names:
+            if (name in self.streamed) == streamed:
+                columns += [column for column in report_columns[name] if column not in columns]
+        return columns
+
+    # A frame by name, loading or building it (and the frames it is built from) if needed
+    def frame(self, name):
+        if name not in self.frames:
+            if self._from_store(name):
+                self.frames[name] = store_frames[name](self.store)
+            elif self._from_database(name):
+                self.frames[name] = query_frames[name](self.database, self.columns())
+            elif name == 'dataset':
+                self.frames[name] = load_dataset(self.path, self.columns())
+            else:
+                inputs, build = intermediates[name]
+                self.frames[name] = build(*[self.frame(source) for source in inputs])
+                self._release(inputs)
+        return self.frames[name]
+
+    # One read of each of `inputs` is done; drop frames nothing pending reads any more
+    def _release(self, inputs):
+        for name in inputs:
+            self.readers[name] -= 1
+            if self.readers[name] == 0:
+                self.frames.pop(name, None)
+
+    # A frame by name for one chunk of the dataset, building it from the chunk's `frames`
+    def chunk_frame(self, name, frames):
+        if name not in frames:
+            inputs, build = intermediates[name]
+            frames[name] = build(*[self.chunk_frame(source, frames) for source in inputs])
+        return frames[name]
+
+    # Full dataset rows (every column) for row labels of the frames above
+    def rows(self, index):
+        if self.database is not None:
+            return self.database.rows_at(index)
+        return load_rows(self.path, index, chunksize=self.chunksize)
+
+    # Run the streamed reports. Each pass over the dataset feeds every chunk to all their
+    # summaries, and passes repeat while any summary needs another (a histogram whose range was
+    # unknown, a box plot's whiskers); then each report writes its files. Returns the seconds
+    # the passes took under 'Streaming', and each report's.
+    def stream(self):
+        start = time.perf_counter()
+        summaries = {}
+        for name in self.streamed:
+            summaries[name] = streaming_reports[name][1](self)
+        pending = [(streaming_reports[name][0], summary) for name in self.streamed for summary in summaries[name].values()]
+        while pending:
+            for chunk in read_chunks(self.path, self.columns(streamed=True), self.chunksize):
+                frames = {'dataset': chunk}
+                for input, summary in pending:
+                    summary.update(self.chunk_frame(input, frames))
+            pending = [(input, summary) for input, summary in pending if summary.end_pass()]
+        timings = {'Streaming': time.perf_counter() - start}
+
+        for name in self.streamed:
+            start = time.perf_counter()
+            streaming_reports[name][2](self, **summaries[name])
+            timings[name] = time.perf_counter() - start
+        return timings
+
+    def output_path(self, filename):
+        return os.path.join(self.output_dir, filename)
+
+    def save_csv(self, frame, filename):
+        path = self.output_path(filename)
+        frame.to_csv(path, index=False)
+        self.outputs.append(path)
+        return path
+
+    # Draw a chart with `draw(*args, **kwargs)` and save it as `filename`: in a render worker,
+    # or here, showing it afterwards when the engine is interactive
+    def chart(self, filename, draw, *args, **kwargs):
+        path = self.output_path(filename)
+        self.outputs.append(path)
+        if self.executor is not None:
+            self.renders.append(self.executor.submit(render_chart, path, draw, args, kwargs))
+        elif self.show:
+            draw(*args, **kwargs)
+            plt.savefig(path)
+            plt.show()
+        else:
+            render_chart(path, draw, args, kwargs)
+        return path
+
+    # Run every selected report in order (the streamed ones first). Returns the seconds each one
+    # took (including any intermediates built for it) keyed by report name; with render workers, charts still being
+    # drawn when the last report finishes are waited for under 'Rendering'.
+    def run(self):
+        os.makedirs(self.output_dir or '.', exist_ok=True)
+        if self.render_workers and not self.show:
+            self.executor = ProcessPoolExecutor(self.render_workers, initializer=headless)
+        timings = {}
+        try:
+            if self.streamed:
+                timings.update(self.stream())
+            for name in self.names:
+                if name in self.streamed:
+                    continue
+                start = time.perf_counter()
+                inputs, run = reports[name]
+                run(self, *[self.frame(source) for source in inputs])
+                self._release(inputs)
+                timings[name] = time.perf_counter() - start
+
+            if self.executor is not None:
+                start = time.perf_counter()
+                for render in self.renders:
+                    render.result()  # Raises if the chart failed
+                timings['Rendering'] = time.perf_counter() - start
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+        return timings
+
+# Run reports over the dataset at `path` (all of them by default), saving their CSVs and
+# charts in `output_dir` (default: next to the dataset). Returns the paths written.
+def run_reports(path, names=None, output_dir=None, show=False, render_workers=0, scatter='density', log_reviews=False):
+    engine = ReportEngine(path, names or list(reports), output_dir, show, render_workers, scatter, log_reviews)
+    engine.run()
+    return engine.outputs
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# "35% OFF" -> 35; the percentage the row-wise calculator read with .replace('% OFF', '')
+discount_pattern = r'(\d+(?:\.\d+)?)\s*%\s*OFF'
+
+# Discount fraction per row: 0.35 for "35% OFF", 0 for rows without "OFF" (e.g. 'No Discount')
+def discount_fractions(discount):
+    percent = discount.astype(str).str.extract(discount_pattern, expand=False).astype(float)
+    return (percent / 100).fillna(0.0)
+
+# Pesos per dollar the dataset's USD prices were converted at (its 'USD' column is 'MXN' / 20)
+mxn_per_usd = 20
+
+# Prices rounded to cents with NumPy, landing on the same cent as Python's round() in the old
+# per-row calculation. round() rounds the price's exact binary value, while price * 100 is itself
+# rounded, so within a hair of half a cent the two can disagree (and np.round does): those few
+# prices get round()'s answer.
+def cents(prices, index):
+    prices = np.asarray(prices, dtype=float)
+    scaled = prices * 100
+    rounded = np.rint(scaled) / 100
+    with np.errstate(invalid='ignore'):  # inf - inf for infinite prices, which are never ties
+        ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(price, 2) for price in prices[ties].tolist()]
+    return pd.Series(rounded, index=index, dtype=float)
+
+# Sale price in USD for whole columns at once: the numeric USD price times (1 - discount),
+# rounded to cents. The arithmetic is vectorized.
+def sale_prices(usd, discount):
+    usd = pd.to_numeric(usd, errors='coerce')
+    return cents(usd.to_numpy(dtype=float) * (1 - discount_fractions(discount).to_numpy()), usd.index)
+
+# Add 'Sale Price USD' to a frame that has 'USD' and 'Discount' columns (the 'USD' column is
+# converted to numeric, as the calculator always did)
+def add_sale_price(df):
+    df['USD'] = pd.to_numeric(df['USD'].astype(str).str.replace(',', '', regex=False), errors='coerce')
+    df['Sale Price USD'] = sale_prices(df['USD'], df['Discount'])
+    return df
+
+# Add 'MXN', 'USD' and 'Sale Price USD' to the scraper's output, which has the price in pesos
+# ('Price Value') and the discount already parsed ('Discount Fraction')
+def add_sale_price_from_pesos(df):
+    mxn = pd.to_numeric(df['Price Value'], errors='coerce')
+    fraction = pd.to_numeric(df['Discount Fraction'], errors='coerce').fillna(0.0)
+    df['MXN'] = mxn
+    df['USD'] = mxn / mxn_per_usd
+    df['Sale Price USD'] = cents(df['USD'].to_numpy(dtype=float) * (1 - fraction.to_numpy()), df.index)
+    return df
+
+# A frame with 'Sale Price USD', computed from whichever prices it has when it is missing:
+# the dataset's 'USD' and 'Discount', or the scraper's 'Price Value' and 'Discount Fraction'
+def with_sale_price(df):
+    if 'Sale Price USD' in df:
+        return df
+    if 'USD' in df and 'Discount' in df:
+        return add_sale_price(df)
+    if 'Price Value' in df and 'Discount Fraction' in df:
+        return add_sale_price_from_pesos(df)
+    return df
+
+# Read a dataset, add 'Sale Price USD' and write it out. With `chunksize`, the file is streamed
+# chunk by chunk so files larger than memory can be processed. Returns the number of rows.
+def add_sale_price_to_csv(input_file, output_file, chunksize=None):
+    if chunksize is None:
+        df = add_sale_price(pd.read_csv(input_file))
+        df.to_csv(output_file, index=False)
+        return len(df)
+
+    rows = 0
+    for number, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize)):
+        add_sale_price(chunk).to_csv(output_file, mode='w' if number == 0 else 'a', header=number == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+# Discount tiers used by the price sensitivity analysis, by discount percentage
+discount_tier_bins = [0, 10, 30, 50, 70, 100]
+discount_tier_labels = ['0-10%', '11-30%', '31-50%', '51-70%', '71-100%']
+
+# Discount tier per row ("35% OFF" -> '31-50%'); NaN for rows without a discount
+def discount_tiers(discount):
+    return pd.cut(discount_fractions(discount) * 100, bins=discount_tier_bins, labels=discount_tier_labels)
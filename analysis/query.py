@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from analysis.dataset import apply_schema, category_columns, numeric_columns, read_chunks, schema_version
+from analysis.reports import intermediates
+from scraper.seen_index import normalize_item_id
+
+# Columns the product rows are indexed on: the ones questions filter by, and the item ID the
+# scraper identifies products by
+indexed_columns = ['Seller', 'Marca', 'Category', 'Status', 'Item ID']
+
+# Long text columns, kept in a table of their own so the rows questions scan stay small (a row
+# with its description fills a whole page)
+wide_columns = ['Image URL', 'Description']
+
+# Rows inserted per batch while loading
+load_chunksize = 50000
+
+# SQL aggregate mean(column): the mean of the non-NULL values with Kahan-compensated summation,
+# as pandas computes group means, so queries give the same averages as the pandas reports did
+class Mean:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.compensation = 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.count += 1
+        y = value - self.compensation
+        t = self.sum + y
+        self.compensation = t - self.sum - y
+        if self.compensation != self.compensation:  # inf - inf
+            self.compensation = 0.0
+        self.sum = t
+
+    def finalize(self):
+        return self.sum / self.count if self.count else None
+
+# The rows of a dataset (a CSV, or the scraper's Parquet output folder) in indexed SQLite tables,
+# so ad-hoc questions are a query instead of a script that re-parses the whole CSV:
+#   products:     "row" (the row's position in the dataset), every dataset column but the long
+#                 text ones, and the normalized "Item ID" of its Product URL
+#   product_text: "row" and the long text columns (join them on "row" when needed)
+#   meta:     the size and modification time of the source files it was loaded from, the
+#             dataset's columns and the dtypes the loader gives each of them
+# update() reloads the table when the source has changed since it was loaded. Datasets without a
+# 'Sale Price USD' column (the scraper's output) get it computed by the loader (see apply_schema).
+# 'bool', 'int64' or 'float64' for a column of booleans, integers or floats (e.g. the scraper's
+# typed columns), None for text
+def _numeric_dtype(series):
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(series):
+        return 'int64'
+    if pd.api.types.is_float_dtype(series):
+        return 'float64'
+    return None
+
+def _sql_type(column, series):
+    if column in numeric_columns:
+        return 'REAL'
+    return {'bool': 'INTEGER', 'int64': 'INTEGER', 'float64': 'REAL'}.get(_numeric_dtype(series), 'TEXT')
+
+class ProductDatabase:
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.db = sqlite3.connect(path)
+        self.db.create_aggregate('mean', 1, Mean)
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.dtypes = json.loads(self._meta('dtypes', '{}'))
+        self.columns = json.loads(self._meta('columns', '[]'))
+
+    def _meta(self, key, default=None):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
+
+    # Size and modification time of the source file (or of every part of a source folder), and the
+    # schema version its rows were typed with
+    def _source_signature(self):
+        if os.path.isdir(self.source):
+            files = sorted(os.path.join(root, name) for root, _, names in os.walk(self.source)
+                           for name in names if name.endswith('.parquet'))
+        else:
+            files = [self.source]
+        return json.dumps([schema_version] + [[os.path.relpath(path, self.source), os.stat(path).st_size,
+                                                os.stat(path).st_mtime_ns] for path in files])
+
+    # Typed chunks of the source's rows, labelled with their positions in the dataset
+    def _source_chunks(self):
+        if not os.path.isdir(self.source):
+            yield from read_chunks(self.source, chunksize=load_chunksize)
+            return
+        start = 0
+        for root, _, names in sorted(os.walk(self.source)):
+            for name in sorted(names):
+                if name.endswith('.parquet'):
+                    chunk = apply_schema(pd.read_parquet(os.path.join(root, name)))
+                    chunk.index = pd.RangeIndex(start, start + len(chunk))
+                    start += len(chunk)
+                    yield chunk
+
+    # Load the source into the products table if it changed since the last load. Returns the
+    # number of rows loaded (0 when the table was already up to date).
+    def update(self):
+        signature = self._source_signature()
+        if self._meta('signature') == signature:
+            return 0
+
+        self.db.execute('DROP TABLE IF EXISTS products')
+        self.db.execute('DROP TABLE IF EXISTS product_text')
+        rows = 0
+        table_columns = []
+        integers = {}  # Numeric column -> whether it held only integers in every chunk so far
+        categories = {}  # Category column -> the distinct values seen
+        typed = {}  # Other column -> 'bool', 'int64' or 'float64' if it held only those in every chunk so far, else None
+        for chunk in self._source_chunks():
+            if rows == 0:
+                self.columns = list(chunk)
+            if 'Product URL' in chunk:
+                chunk['Item ID'] = chunk['Product URL'].map(normalize_item_id, na_action='ignore')
+            for column in chunk:
+                if column in numeric_columns:
+                    integers[column] = integers.get(column, True) and pd.api.types.is_integer_dtype(chunk[column])
+                elif column in category_columns:
+                    categories.setdefault(column, set()).update(chunk[column].dropna().astype(str))
+                    chunk[column] = chunk[column].astype(object)
+                else:
+                    dtype = _numeric_dtype(chunk[column])
+                    seen = typed.get(column, dtype)
+                    typed[column] = dtype if seen == dtype else 'float64' if {seen, dtype} == {'int64', 'float64'} else None
+            if rows == 0:
+                table_columns = list(chunk)
+                self._create_tables(chunk)
+            text = [column for column in chunk if column in wide_columns]
+            chunk.drop(columns=text).to_sql('products', self.db, if_exists='append', index=True, index_label='row')
+            chunk[text].to_sql('product_text', self.db, if_exists='append', index=True, index_label='row')
+            rows += len(chunk)
+
+        for column in indexed_columns:
+            if column in table_columns:
+                name = 'products_' + column.lower().replace(' ', '_')
+                self.db.execute(f'CREATE INDEX {name} ON products ("{column}")')
+        self.db.execute('ANALYZE')  # Statistics the query planner picks indexes with
+
+        # The dtypes load_dataset() would give the columns, reading the whole dataset at once
+        self.dtypes = {column: 'int64' if integer else 'float64' for column, integer in integers.items()}
+        self.dtypes.update({column: sorted(values) for column, values in categories.items()})
+        self.dtypes.update({column: dtype for column, dtype in typed.items() if dtype is not None})
+        self._set_meta('dtypes', json.dumps(self.dtypes))
+        self._set_meta('columns', json.dumps(self.columns))
+        self._set_meta('signature', signature)
+        self.db.commit()
+        return rows
+
+    # The products and product_text tables for a dataset's columns
+    # Tables for the columns of the first chunk, with the SQLite type each column's values take
+    def _create_tables(self, chunk):
+        def definitions(columns):
+            return ''.join(f', "{column}" {_sql_type(column, chunk[column])}' for column in columns)
+        narrow = [column for column in chunk if column not in wide_columns]
+        wide = [column for column in chunk if column in wide_columns]
+        self.db.execute(f'CREATE TABLE products ("row" INTEGER PRIMARY KEY{definitions(narrow)})')
+        self.db.execute(f'CREATE TABLE product_text ("row" INTEGER PRIMARY KEY{definitions(wide)})')
+
+    def rows(self):
+        return self.db.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    # Result of a SQL query as a frame
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.db, params=params)
+
+    # `columns` (the dataset's columns by default) of the rows matching the SQL condition `where`
+    # (all by default), typed and labelled like load_dataset()'s rows
+    def select(self, columns=None, where=None, params=()):
+        columns = columns or self.columns
+        tables = 'products'
+        if any(column in wide_columns for column in columns):
+            tables += ' LEFT JOIN product_text USING ("row")'
+        sql = 'SELECT "row", {} FROM {}{} ORDER BY "row"'.format(
+            ', '.join(f'"{column}"' for column in columns), tables, f' WHERE {where}' if where else '')
+        df = pd.read_sql_query(sql, self.db, params=params, index_col='row')
+        df.index.name = None
+        return self.typed(df)
+
+    # Rows by their labels, in that order (full rows, or just `columns`)
+    def rows_at(self, rows, columns=None):
+        rows = [int(row) for row in rows]
+        pieces = [self.select(columns, f'"row" IN ({", ".join("?" * len(batch))})', batch)
+                  for batch in (rows[start:start + 500] for start in range(0, len(rows), 500))]
+        return pd.concat(pieces).loc[rows] if pieces else self.select(columns, '0')
+
+    # A query result with the dtypes the dataset loader gives its columns
+    def typed(self, df):
+        for column in df:
+            dtype = self.dtypes.get(column)
+            if isinstance(dtype, list):
+                df[column] = pd.Categorical(df[column], categories=dtype)
+            elif dtype is not None:
+                df[column] = df[column].astype(dtype)
+        return df
+
+    def close(self):
+        self.db.close()
+
+# Frames the reports read (see analysis.reports), from the database: given the columns the
+# engine's reports use, the rows each frame keeps are selected by SQL (using the indexes) and
+# handed to the frame's own function, and the per-group summaries are SQL aggregates
+
+def row_frame(name, where):
+    def select(database, columns):
+        df = database.select(columns, where)
+        for frame in row_frame_chains[name]:
+            df = intermediates[frame][1](df)
+        return df
+    return select
+
+# Frames built by the intermediates of analysis.reports from the selected rows, in order
+row_frame_chains = {
+    'dataset': [],
+    'priced': ['priced'],
+    'rated': ['rated'],
+    'widely_rated': ['rated', 'widely_rated'],
+    'reviewed': ['reviewed'],
+}
+
+def seller_counts(database, columns):
+    counts = database.query('SELECT "Seller", COUNT(*) AS count FROM products WHERE "Seller" IS NOT NULL '
+                            'GROUP BY "Seller" ORDER BY "Seller"')
+    return pd.Series(counts['count'].to_numpy(), index=pd.Index(counts['Seller'], name='Seller'))
+
+def status_counts(database, columns):
+    counts = database.query('SELECT "Status", COUNT(*) AS count FROM products WHERE "Status" IS NOT NULL '
+                            'GROUP BY "Status" ORDER BY count DESC, "Status"')
+    return pd.Series(counts['count'].to_numpy(), index=pd.Index(counts['Status'], name='Status'), name='count')
+
+def category_prices(database, columns):
+    category_summary = database.query('SELECT "Category", mean("Sale Price USD") AS "Average Price (USD)" FROM products '
+                                      'WHERE "Category" IS NOT NULL GROUP BY "Category" ORDER BY "Category"')
+    return category_summary.sort_values(by='Average Price (USD)', ascending=True)
+
+def seller_summary(database, columns):
+    return database.query('SELECT "Seller", COUNT("Product") AS Product_Count, mean("Sale Price USD") AS Average_Price, '
+                          'mean("Stars") AS Average_Rating FROM products WHERE "Stars" > 0 AND "Seller" IS NOT NULL '
+                          'GROUP BY "Seller" ORDER BY "Seller"')
+
+query_frames = {
+    'dataset': row_frame('dataset', None),
+    'priced': row_frame('priced', '"Sale Price USD" IS NOT NULL'),
+    'rated': row_frame('rated', '"Stars" > 0'),
+    'widely_rated': row_frame('widely_rated', '"Stars" > 0 AND "Reviews Count" >= 1000'),
+    'reviewed': row_frame('reviewed', '"Stars" IS NOT NULL AND "Reviews Count" > 0'),
+    'seller_counts': seller_counts,
+    'status_counts': status_counts,
+    'category_prices': category_prices,
+    'seller_summary': seller_summary,
+}
+
+# Default database location for a source: next to it, named after it
+def default_database_path(source):
+    return os.path.join(os.path.dirname(os.path.abspath(source)), os.path.basename(os.path.normpath(source)) + '.products.sqlite3')
+
+# Run a SQL query against a dataset's product database, loading the database first if needed
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query a dataset's rows with SQL (tables: products, and product_text "
+                                                 "for the Description and Image URL columns, joined on \"row\").")
+    parser.add_argument('source', help="Dataset CSV (e.g. the scraper's CSV) or Parquet output directory")
+    parser.add_argument('sql', nargs='?', default=None,
+                        help="Query, e.g. 'SELECT AVG(\"Sale Price USD\") FROM products WHERE \"Seller\" = ?'")
+    parser.add_argument('params', nargs='*', help="Values for the query's ? placeholders")
+    parser.add_argument('--database', default=None, help="Database file (default: <source>.products.sqlite3 next to it)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    database = ProductDatabase(args.database or default_database_path(args.source), args.source)
+    rows = database.update()
+    if rows:
+        print(f"Loaded {rows:,} rows into {database.path} in {time.perf_counter() - start:.2f}s")
+    if args.sql:
+        start = time.perf_counter()
+        result = database.query(args.sql, args.params)
+        seconds = time.perf_counter() - start
+        with pd.option_context('display.max_rows', 100, 'display.width', 200):
+            print(result)
+        print(f"\n{len(result):,} rows in {seconds * 1000:.1f} ms")
+    database.close()
@@ -0,0 +1,520 @@
+import matplotlib.pyplot as plt
+import matplotlib.ticker as mticker
+import numpy as np
+import pandas as pd
+from matplotlib.colors import ListedColormap, LogNorm
+import seaborn as sns
+from pandas.plotting import table
+
+from analysis.bitmaps import BitmapIndex, bitmap_columns
+from analysis.pricing import discount_tiers
+from analysis.streaming import BoxplotStats, Histogram, TopK
+from analysis.text import map_unique, short_name
+
+# The analysis reports and the intermediate frames they share. Each report and intermediate
+# names the frames it is built from; analysis.engine loads the dataset once, builds each
+# intermediate a single time for all the reports that use it, and runs the reports.
+
+# Columns each analysis report reads from the dataset. Reports load only these; the large text
+# columns (Product, Description) are left out wherever a report needs them for a few selected
+# rows only, which it fetches with analysis.dataset.load_rows().
+report_columns = {
+    'Best and Worst Rated Products': ['Stars', 'Reviews Count', 'Seller', 'Marca', 'Sale Price USD'],
+    'Cross-Category Comparisons': ['Category', 'Sale Price USD'],
+    'Most and Least Expensive Products': ['Sale Price USD', 'Seller', 'Marca'],
+    'Price Distribution Analysis': ['Sale Price USD'],
+    'Price Sensitivity Analysis': ['Discount', 'Status'],
+    'Product Availability': ['Status'],
+    'Seller Analysis': ['Seller', 'Product', 'Sale Price USD', 'Stars'],
+    'Seller Distribution': ['Seller'],
+    'Availability by Shipping Option': ['Status', 'Shipping'],
+    'Customer Sentiment vs. Popularity': ['Stars', 'Reviews Count'],
+}
+
+# name -> (names of the frames it is built from, function building it from them). The
+# 'dataset' frame, every column the selected reports use, is the root and is loaded by the engine.
+intermediates = {}
+
+# report name -> (names of the frames it reads, function writing its CSVs and charts)
+reports = {}
+
+# Streamed versions of reports that only need bounded summaries of their rows (top-k rows,
+# histograms, quantiles), for datasets larger than memory: report name -> (name of the frame
+# whose rows are summarized, function making the summaries (analysis.streaming) for an engine,
+# function writing the report's CSVs and charts from them)
+streaming_reports = {}
+
+# Register a function as an intermediate frame built from the frames named in `inputs`
+def intermediate(*inputs):
+    def register(build):
+        intermediates[build.__name__] = (inputs, build)
+        return build
+    return register
+
+# Register a function as the report `name`; it is called with the engine (for saving CSVs and
+# charts and fetching rows) followed by the frames named in `inputs`. Reports pass each chart's
+# data, already aggregated, to a draw_* function through engine.chart(), so the engine can
+# render charts in other processes.
+def report(name, *inputs):
+    def register(run):
+        reports[name] = (inputs, run)
+        return run
+    return register
+
+# Register a function as the streamed version of the report `name`. The engine reads the dataset
+# in chunks and folds each chunk's `input` frame into the summaries `summaries(engine)` returns
+# (a dict); the function is then called with the engine and the summaries as keyword arguments.
+# `input` must be the dataset or an intermediate that only selects or adds to rows, so it can be
+# built one chunk at a time.
+def streaming_report(name, input, summaries):
+    def register(run):
+        streaming_reports[name] = (input, summaries, run)
+        return run
+    return register
+
+# Full rows for several selections of row labels, fetched in one go (a single scan of the dataset
+# when the engine streams it); returns one frame per selection
+def selected_rows(engine, *selections):
+    rows = engine.rows([row for selection in selections for row in selection])
+    ends = np.cumsum([len(selection) for selection in selections])
+    return [rows.iloc[end - len(selection):end].copy() for selection, end in zip(selections, ends)]
+
+# Full rows as they are exported: with the Category text as scraped, not the normalized label
+# the reports group by
+def exported_rows(frame):
+    if 'Scraped Category' in frame:
+        frame = frame.assign(Category=frame['Scraped Category']).drop(columns='Scraped Category')
+    return frame
+
+# Products with a sale price
+@intermediate('dataset')
+def priced(dataset):
+    return dataset.dropna(subset=['Sale Price USD'])
+
+# Products with a star rating above 0 (unrated products have NaN or 0 stars)
+@intermediate('dataset')
+def rated(dataset):
+    return dataset[dataset['Stars'] > 0]
+
+# Rated products with at least 1000 reviews
+@intermediate('rated')
+def widely_rated(rated):
+    return rated[rated['Reviews Count'] >= 1000]
+
+# Products with a star rating and at least one review
+@intermediate('dataset')
+def reviewed(dataset):
+    df = dataset[dataset['Stars'].notna() & dataset['Reviews Count'].notna()]
+    return df[df['Reviews Count'] > 0]
+
+# Bitmap index over the low-cardinality columns (analysis.bitmaps), for filtered counts and
+# cross-tabs: built once, then each one is a few bitwise operations instead of a scan of the rows
+@intermediate('dataset')
+def bitmaps(dataset):
+    if 'Discount' in dataset:
+        dataset = dataset.assign(**{'Discount Tier': discount_tiers(dataset['Discount'])})
+    return BitmapIndex(dataset, bitmap_columns)
+
+# Number of products listed by each seller
+@intermediate('dataset')
+def seller_counts(dataset):
+    return dataset.groupby('Seller', observed=True).size()
+
+# Number of products per availability status, most common first
+@intermediate('dataset')
+def status_counts(dataset):
+    return dataset['Status'].value_counts()
+
+# Average sale price per category, cheapest first (Category is normalized by the loader)
+@intermediate('dataset')
+def category_prices(dataset):
+    category_summary = dataset.groupby('Category', observed=True).agg({
+        'Sale Price USD': 'mean'
+    }).rename(columns={
+        'Sale Price USD': 'Average Price (USD)'
+    }).reset_index()
+    return category_summary.sort_values(by='Average Price (USD)', ascending=True)
+
+# Product count, average price and average rating per seller, over rated products
+@intermediate('rated')
+def seller_summary(rated):
+    return rated.groupby('Seller', observed=True).agg(
+        Product_Count=('Product', 'count'),
+        Average_Price=('Sale Price USD', 'mean'),
+        Average_Rating=('Stars', 'mean')
+    ).reset_index()
+
+# Share of each availability status within each discount tier (rows without a discount have no tier)
+@intermediate('bitmaps')
+def availability_by_discount(bitmaps):
+    counts = bitmaps.crosstab('Discount Tier', 'Status')
+    return counts.div(counts.sum(axis=1), axis=0)
+
+# Star rating cells for the density charts: one per 0.1 star (ratings have one decimal)
+star_edges = np.linspace(-0.05, 5.05, 52)
+
+# Review counts (log10 of them with `log_reviews`, leaving out counts of 0) and star ratings as
+# the coordinates of the density charts' cells
+def rating_cells(reviews, stars, log_reviews=False):
+    reviews = np.asarray(reviews, dtype=float)
+    stars = np.asarray(stars, dtype=float)
+    if log_reviews:
+        positive = reviews > 0
+        return np.log10(reviews[positive]), stars[positive]
+    return reviews, stars
+
+# Star ratings against review counts as a 2-D histogram: the number of products in each
+# (reviews, stars) cell. Review counts are split into `review_bins` cells, on a log scale with
+# `log_reviews` (counts of 0 are then left out). Returns the counts and the cell edges along
+# both axes.
+def ratings_density(reviews, stars, log_reviews=False, review_bins=60):
+    counts, x_edges, y_edges = np.histogram2d(*rating_cells(reviews, stars, log_reviews), bins=(review_bins, star_edges))
+    return counts, 10 ** x_edges if log_reviews else x_edges, y_edges
+
+# The same 2-D histogram as ratings_density(), folded in a chunk of products at a time
+def ratings_histogram(log_reviews=False, review_bins=60):
+    return Histogram(lambda df: rating_cells(df['Reviews Count'], df['Stars'], log_reviews), [review_bins, star_edges])
+
+# Counts and cell edges of a ratings_histogram(), as ratings_density() returns them
+def histogram_density(histogram, log_reviews=False):
+    x_edges, y_edges = histogram.edges
+    return histogram.counts, 10 ** x_edges if log_reviews else x_edges, y_edges
+
+# Chart functions. Each one draws a single figure from the (small, aggregated) data it is
+# given; the engine saves it.
+
+# Horizontal bar chart, e.g. the top 10 products or sellers by some value
+def draw_barh(labels, values, title, xlabel, ylabel, color, figsize=(10, 6), alpha=None, invert_y=False):
+    plt.figure(figsize=figsize)
+    plt.barh(labels, values, color=color, alpha=alpha)
+    if invert_y:
+        plt.gca().invert_yaxis()  # First label on top
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.tight_layout()
+
+# Scatter of star ratings against review counts, one point per product
+def draw_ratings_scatter(reviews, stars, title, xlabel, ylabel, color, log_reviews=False, tight_layout=True):
+    plt.figure(figsize=(10, 6))
+    plt.scatter(reviews, stars, alpha=0.5, color=color)
+    if log_reviews:
+        plt.xscale('log')
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    if tight_layout:
+        plt.tight_layout()
+
+# Share of the colormap below the lightest color used, so cells holding a single product are
+# tinted, not near-white like the blank empty cells
+density_cmap_start = 0.25
+
+# Star ratings against review counts from ratings_density(): each cell is colored by the number
+# of products in it on a log scale (empty cells are left blank)
+def draw_ratings_density(counts, x_edges, y_edges, title, xlabel, ylabel, cmap, log_reviews=False, tight_layout=True):
+    plt.figure(figsize=(10, 6))
+    colors = ListedColormap(plt.get_cmap(cmap)(np.linspace(density_cmap_start, 1, 256)))
+    mesh = plt.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap=colors,
+                          norm=LogNorm(vmin=1, vmax=max(counts.max(), 2)) if counts.any() else None)
+    plt.colorbar(mesh, label='Products', format=mticker.FormatStrFormatter('%d'))
+    if log_reviews:
+        plt.xscale('log')
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    if tight_layout:
+        plt.tight_layout()
+
+# Ratings vs. reviews chart for `df`, drawn the way the engine is set to: a density chart, or one
+# point per product (engine.scatter == 'points', for small samples). Streamed reports pass the
+# density already binned, as (counts, x_edges, y_edges), and always get a density chart.
+def ratings_chart(engine, filename, df, title, xlabel, ylabel, color, cmap, tight_layout=True):
+    if isinstance(df, tuple):
+        counts, x_edges, y_edges = df
+    elif engine.scatter == 'points':
+        return engine.chart(filename, draw_ratings_scatter, df['Reviews Count'].to_numpy(), df['Stars'].to_numpy(),
+                            title, xlabel, ylabel, color, log_reviews=engine.log_reviews, tight_layout=tight_layout)
+    else:
+        counts, x_edges, y_edges = ratings_density(df['Reviews Count'], df['Stars'], engine.log_reviews)
+    return engine.chart(filename, draw_ratings_density, counts, x_edges, y_edges,
+                        title, xlabel, ylabel, cmap, log_reviews=engine.log_reviews, tight_layout=tight_layout)
+
+# Table of the most-reviewed products, drawn as an image
+def draw_most_reviewed_table(most_reviewed):
+    plt.figure(figsize=(12, 6))
+    ax = plt.subplot(111, frame_on=False)  # No axes
+    ax.xaxis.set_visible(False)  # Hide x axis
+    ax.yaxis.set_visible(False)  # Hide y axis
+    tbl = table(ax, most_reviewed, loc='center', colWidths=[0.2] * 5)
+    tbl.auto_set_font_size(False)
+    tbl.set_fontsize(10)
+    tbl.scale(1.2, 1.2)
+    for key, cell in tbl.get_celld().items():
+        cell.set_text_props(ha='center', va='center')  # Center-align text
+
+def draw_price_histogram(prices):
+    plt.figure(figsize=(10, 6))
+    sns.histplot(prices, bins=30, kde=True)
+    plt.title("Sale Price Distribution of *Ofertas* Products")
+    plt.xlabel("Sale Price")
+    plt.ylabel("Frequency")
+
+def draw_price_boxplot(prices):
+    plt.figure(figsize=(8, 4))
+    sns.boxplot(x=prices)
+    plt.title("Sale Price Range and Outliers")
+    plt.xlabel("Sale Price")
+
+# The histogram above from binned prices (a streamed report's Histogram): the same bars, with the
+# density curve estimated from the bins
+def draw_binned_price_histogram(counts, edges):
+    plt.figure(figsize=(10, 6))
+    sns.histplot(x=(edges[:-1] + edges[1:]) / 2, weights=counts, bins=list(edges), kde=True)
+    plt.title("Sale Price Distribution of *Ofertas* Products")
+    plt.xlabel("Sale Price")
+    plt.ylabel("Frequency")
+
+# The box plot above from a streamed report's BoxplotStats (quartiles, whiskers and the most
+# extreme outliers)
+def draw_price_boxplot_stats(stats):
+    plt.figure(figsize=(8, 4))
+    plt.gca().bxp([stats], orientation='horizontal', widths=0.8, patch_artist=True,
+                  boxprops={'facecolor': sns.color_palette()[0]}, medianprops={'color': 'black'})
+    plt.gca().set_yticks([])
+    plt.title("Sale Price Range and Outliers")
+    plt.xlabel("Sale Price")
+
+# Stacked bars of the share of each availability status per discount tier
+def draw_availability_by_discount(availability_by_discount):
+    # Custom color palette with 9 colors
+    colors = [
+        '#FF9999', '#66B2FF', '#99FF99', '#FFCC99',
+        '#FF6666', '#66FFB2', '#B266FF', '#FFB266',
+        '#9999FF'
+    ]
+    availability_by_discount.plot(kind='bar', stacked=True, figsize=(10, 6), color=colors[:len(availability_by_discount.columns)])
+    plt.xlabel('Discount Tiers')
+    plt.ylabel('Proportion of Availability')
+    plt.title('Availability Status by Discount Tiers')
+    plt.xticks(rotation=45)
+    plt.legend(title='Availability Status', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+
+def draw_availability(statuses, counts):
+    plt.figure(figsize=(10, 6))
+    plt.bar(statuses, counts, color=['green', 'orange', 'red'])
+    plt.xlabel("Availability Status")
+    plt.ylabel("Count of Products")
+    plt.title("Product Availability Distribution")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+# Number of sellers per number of products listed, on a standard or logarithmic y axis
+def draw_seller_distribution(products, sellers, log_scale):
+    plt.figure(figsize=(12, 8))
+    if log_scale:
+        plt.bar(products, sellers, color='orange')
+        plt.title("Distribution of Sellers by Number of Products Listed (Logarithmic Scale)")
+    else:
+        plt.bar(products, sellers, color='skyblue')
+        plt.title("Distribution of Sellers by Number of Products Listed (Standard Y-Axis)")
+    plt.xlabel("Number of Products")
+    plt.ylabel("Number of Sellers")
+    if log_scale:
+        plt.yscale('log')  # Logarithmic scale
+        plt.gca().yaxis.set_major_formatter(mticker.LogFormatterSciNotation())  # Scientific notation
+    else:
+        plt.gca().yaxis.set_major_formatter(mticker.StrMethodFormatter("{x:,.0f}"))  # Standard number format
+    plt.tight_layout()
+
+def draw_availability_by_shipping(availability_shipping):
+    availability_shipping.plot(kind='bar', stacked=True, figsize=(10, 6))
+    plt.xlabel("Availability Status")
+    plt.ylabel("Product Count")
+    plt.title("Availability by Shipping Option (Free vs. Paid)")
+    plt.legend(title="Shipping Type", loc='upper right')
+    plt.grid(axis='y')
+
+# CSV, printout and charts of the best-rated, worst-rated and most-reviewed products (full rows,
+# as the engine's rows() returns them) and the ratings vs. reviews chart of `ratings` (see
+# ratings_chart())
+def save_rated_products(engine, best_rated, worst_rated, most_reviewed, ratings):
+    # Simplify product names for cleaner charts
+    best_rated['Short Name'] = map_unique(best_rated['Product'], short_name)
+    worst_rated['Short Name'] = map_unique(worst_rated['Product'], short_name)
+    most_reviewed['Short Name'] = map_unique(most_reviewed['Product'], short_name)
+
+    # Combine results for export
+    engine.save_csv(exported_rows(pd.concat([best_rated, worst_rated, most_reviewed])), 'filtered_rating_summary.csv')
+
+    print("Best Rated Products:")
+    print(best_rated[['Short Name', 'Stars', 'Reviews Count', 'Seller', 'Marca']])
+    print("\nWorst Rated Products:")
+    print(worst_rated[['Short Name', 'Stars', 'Reviews Count', 'Seller', 'Marca']])
+    print("\nMost Reviewed Products:")
+    print(most_reviewed[['Short Name', 'Stars', 'Reviews Count', 'Seller', 'Marca', 'Sale Price USD']])
+
+    engine.chart('best_rated_chart_filtered.png', draw_barh, best_rated['Short Name'].tolist(), best_rated['Stars'].to_numpy(),
+                 'Top 10 Best Rated Products (1000+ Reviews)', 'Stars', 'Product', 'green', alpha=0.7)
+    engine.chart('worst_rated_chart_filtered.png', draw_barh, worst_rated['Short Name'].tolist(), worst_rated['Stars'].to_numpy(),
+                 'Top 10 Worst Rated Products (1000+ Reviews)', 'Stars', 'Product', 'red', alpha=0.7)
+    ratings_chart(engine, 'ratings_vs_reviews_filtered.png', ratings, 'Product Ratings vs. Number of Reviews (Filtered)',
+                  'Reviews Count', 'Stars', 'purple', 'Purples', tight_layout=False)
+    engine.chart('most_reviewed_table.png', draw_most_reviewed_table,
+                 most_reviewed[['Short Name', 'Stars', 'Reviews Count', 'Sale Price USD', 'Marca']].reset_index(drop=True))
+
+@report('Best and Worst Rated Products', 'widely_rated')
+def best_and_worst_rated_products(engine, df):
+    # Find the top 10 best-rated, worst-rated and most-reviewed products
+    best_rated = df.nlargest(10, 'Stars').sort_values(by=['Stars', 'Reviews Count'], ascending=[False, False])
+    worst_rated = df.nsmallest(10, 'Stars').sort_values(by=['Stars', 'Reviews Count'], ascending=[True, False])
+    most_reviewed = df.nlargest(10, 'Reviews Count').sort_values(by='Reviews Count', ascending=False)
+
+    # Fetch the full rows, with the Product and Description text, for the selected products only
+    save_rated_products(engine, engine.rows(best_rated.index), engine.rows(worst_rated.index),
+                        engine.rows(most_reviewed.index), df)
+
+def rated_product_summaries(engine):
+    return {
+        'best_rated': TopK('Stars', 10),
+        'worst_rated': TopK('Stars', 10, largest=False),
+        'most_reviewed': TopK('Reviews Count', 10),
+        'ratings': ratings_histogram(engine.log_reviews),
+    }
+
+@streaming_report('Best and Worst Rated Products', 'widely_rated', rated_product_summaries)
+def best_and_worst_rated_products_streamed(engine, best_rated, worst_rated, most_reviewed, ratings):
+    # The same selections as above, sorted once their full rows are fetched
+    best_rated, worst_rated, most_reviewed = selected_rows(engine, best_rated.rows(), worst_rated.rows(), most_reviewed.rows())
+    best_rated = best_rated.sort_values(by=['Stars', 'Reviews Count'], ascending=[False, False])
+    worst_rated = worst_rated.sort_values(by=['Stars', 'Reviews Count'], ascending=[True, False])
+    most_reviewed = most_reviewed.sort_values(by='Reviews Count', ascending=False)
+    save_rated_products(engine, best_rated, worst_rated, most_reviewed, histogram_density(ratings, engine.log_reviews))
+
+@report('Cross-Category Comparisons', 'category_prices')
+def cross_category_comparisons(engine, category_summary):
+    engine.save_csv(category_summary, 'category_summary.csv')
+
+    engine.chart('average_price_by_category.png', draw_barh, category_summary['Category'].tolist(), category_summary['Average Price (USD)'].to_numpy(),
+                 "Average Price by Category", "Average Price (USD)", "Category", 'skyblue', figsize=(10, 8))
+
+# CSV, printout and charts of the most and least expensive products, given their row labels
+def save_expensive_products(engine, most_expensive, least_expensive):
+    # Full rows of the selected products
+    most_expensive, least_expensive = selected_rows(engine, most_expensive, least_expensive)
+
+    # Simplify product names for cleaner charts
+    most_expensive['Short Name'] = map_unique(most_expensive['Product'], short_name)
+    least_expensive['Short Name'] = map_unique(least_expensive['Product'], short_name)
+
+    engine.save_csv(exported_rows(pd.concat([most_expensive, least_expensive])), 'expensive_summary.csv')
+
+    print("Most Expensive Products:")
+    print(most_expensive[['Short Name', 'Sale Price USD', 'Seller', 'Marca']])
+    print("\nLeast Expensive Products:")
+    print(least_expensive[['Short Name', 'Sale Price USD', 'Seller', 'Marca']])
+
+    # Highest and lowest price on top
+    engine.chart('most_expensive_chart.png', draw_barh, most_expensive['Short Name'].tolist(), most_expensive['Sale Price USD'].to_numpy(),
+                 'Top 10 Most Expensive Products', 'Sale Price USD', 'Product', 'green', invert_y=True)
+    engine.chart('least_expensive_chart.png', draw_barh, least_expensive['Short Name'].tolist(), least_expensive['Sale Price USD'].to_numpy(),
+                 'Top 10 Least Expensive Products', 'Sale Price USD', 'Product', 'blue', invert_y=True)
+
+@report('Most and Least Expensive Products', 'priced')
+def most_and_least_expensive_products(engine, df):
+    # Top 10 most and least expensive products
+    save_expensive_products(engine, df.nlargest(10, 'Sale Price USD').index, df.nsmallest(10, 'Sale Price USD').index)
+
+def expensive_product_summaries(engine):
+    return {
+        'most_expensive': TopK('Sale Price USD', 10),
+        'least_expensive': TopK('Sale Price USD', 10, largest=False),
+    }
+
+@streaming_report('Most and Least Expensive Products', 'priced', expensive_product_summaries)
+def most_and_least_expensive_products_streamed(engine, most_expensive, least_expensive):
+    save_expensive_products(engine, most_expensive.rows(), least_expensive.rows())
+
+@report('Price Distribution Analysis', 'priced')
+def price_distribution_analysis(engine, df):
+    # Histogram (with density curve) and box plot of the sale prices
+    prices = df['Sale Price USD']
+    engine.chart('price_distribution_histogram.png', draw_price_histogram, prices)
+    engine.chart('price_distribution_boxplot.png', draw_price_boxplot, prices)
+
+def price_distribution_summaries(engine):
+    return {
+        'histogram': Histogram(lambda df: [df['Sale Price USD']], [30]),
+        'boxplot': BoxplotStats('Sale Price USD'),
+    }
+
+@streaming_report('Price Distribution Analysis', 'priced', price_distribution_summaries)
+def price_distribution_analysis_streamed(engine, histogram, boxplot):
+    # The same 30 bins as the histogram above; quartiles from a quantile sketch
+    engine.chart('price_distribution_histogram.png', draw_binned_price_histogram, histogram.counts, histogram.edges[0])
+    engine.chart('price_distribution_boxplot.png', draw_price_boxplot_stats, boxplot.stats)
+
+@report('Price Sensitivity Analysis', 'availability_by_discount')
+def price_sensitivity_analysis(engine, availability_by_discount):
+    engine.chart('discount_vs_availability.png', draw_availability_by_discount, availability_by_discount)
+
+@report('Product Availability', 'status_counts')
+def product_availability(engine, status_counts):
+    # Count and share of products per availability status
+    availability_summary = status_counts.reset_index()
+    availability_summary.columns = ['Availability Status', 'Count']
+    total_products = availability_summary['Count'].sum()
+    availability_summary['Percentage'] = (availability_summary['Count'] / total_products) * 100
+    engine.save_csv(availability_summary, 'product_availability_summary.csv')
+
+    engine.chart('product_availability_chart.png', draw_availability,
+                 availability_summary['Availability Status'].tolist(), availability_summary['Count'].to_numpy())
+
+@report('Seller Analysis', 'seller_summary')
+def seller_analysis(engine, seller_summary):
+    engine.save_csv(seller_summary, 'seller_analysis.csv')
+
+    # Top 20 sellers by product count, and the highest and lowest rated of the top 50
+    top_50_sellers = seller_summary.nlargest(50, 'Product_Count')
+    top_20_sellers = top_50_sellers.nlargest(20, 'Product_Count')
+    top_10_highest_rated = top_50_sellers.nlargest(10, 'Average_Rating')
+    top_10_lowest_rated = top_50_sellers.nsmallest(10, 'Average_Rating')
+
+    engine.chart('top_20_sellers_by_product_count.png', draw_barh, top_20_sellers['Seller'].tolist(), top_20_sellers['Product_Count'].to_numpy(),
+                 "Top 20 Sellers by Number of Products", "Number of Products", "Seller", 'skyblue', figsize=(12, 8), invert_y=True)
+    engine.chart('top_10_highest_rated_sellers_top_50.png', draw_barh, top_10_highest_rated['Seller'].tolist(), top_10_highest_rated['Average_Rating'].to_numpy(),
+                 "Top 10 Highest Rated Sellers (Top 50 by Product Count)", "Average Rating", "Seller", 'green', figsize=(12, 8), invert_y=True)
+    engine.chart('top_10_lowest_rated_sellers_top_50.png', draw_barh, top_10_lowest_rated['Seller'].tolist(), top_10_lowest_rated['Average_Rating'].to_numpy(),
+                 "Top 10 Lowest Rated Sellers (Top 50 by Product Count)", "Average Rating", "Seller", 'red', figsize=(12, 8), invert_y=True)
+
+@report('Seller Distribution', 'seller_counts')
+def seller_distribution(engine, seller_counts):
+    # How many sellers list each number of products
+    distribution = seller_counts.value_counts().sort_index()
+    distribution_df = pd.DataFrame({
+        'Number of Products': distribution.index,
+        'Number of Sellers': distribution.values
+    })
+    engine.save_csv(distribution_df, 'seller_product_distribution.csv')
+
+    engine.chart('seller_product_distribution_standard.png', draw_seller_distribution, distribution.index.to_numpy(), distribution.to_numpy(), False)
+    engine.chart('seller_product_distribution_log.png', draw_seller_distribution, distribution.index.to_numpy(), distribution.to_numpy(), True)
+
+@report('Availability by Shipping Option', 'bitmaps')
+def availability_by_shipping_option(engine, bitmaps):
+    # Product counts for each availability status and shipping type
+    availability_shipping = bitmaps.crosstab('Status', 'Shipping',
+                                             where={'Status': ['Available', 'Out of Stock', 'Limited Availability']})
+    engine.chart('availability_by_shipping_option.png', draw_availability_by_shipping, availability_shipping)
+
+@report('Customer Sentiment vs. Popularity', 'reviewed')
+def customer_sentiment_vs_popularity(engine, df):
+    # Counts for high ratings and low reviews
+    high_rating_count = df[df['Stars'] >= 4.5].shape[0]
+    low_review_count = df[df['Reviews Count'] < 10].shape[0]
+    print(f"Products with high ratings (>=4.5): {high_rating_count}")
+    print(f"Products with low review counts (<10): {low_review_count}")
+
+    ratings_chart(engine, 'customer_sentiment_vs_popularity.png', df, "Customer Sentiment vs. Popularity (All Ratings)",
+                  "Number of Reviews", "Star Rating", 'teal', 'GnBu')
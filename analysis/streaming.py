@@ -0,0 +1,178 @@
+import heapq
+
+import numpy as np
+
+# Bounded summaries of a column (or columns) that are fed a dataset one chunk of rows at a time,
+# so reports over files larger than memory keep only the summary. Each one has:
+#   update(frame)  fold in a chunk of rows (labelled with their positions in the dataset)
+#   end_pass()     called after every pass over the dataset; True when it needs another pass
+# analysis.engine feeds them the chunks of a streamed report (see analysis.reports).
+
+# Items kept per level of a QuantileSketch. The rank error of its quantiles is about 1/sketch_size
+# of the number of values, whatever that number is.
+sketch_size = 2048
+
+# Box plots draw at most this many outliers on each side of the box (the most extreme ones)
+max_fliers = 500
+
+# The `k` rows with the largest (or, with largest=False, smallest) values of `column`, kept in a
+# bounded heap. Ties go to the earlier row, as with DataFrame.nlargest() and nsmallest(); missing
+# values are skipped.
+class TopK:
+    def __init__(self, column, k=10, largest=True):
+        self.column = column
+        self.k = k
+        self.largest = largest
+        self.heap = []  # (key, row), the kept row that would be dropped first on top
+
+    def update(self, frame):
+        values = frame[self.column]
+        # At most k rows of a chunk can make it, so only those go through the heap
+        candidates = values.nlargest(self.k) if self.largest else values.nsmallest(self.k)
+        for row, value in candidates.items():
+            key = (value, -row) if self.largest else (-value, -row)
+            if len(self.heap) < self.k:
+                heapq.heappush(self.heap, (key, row))
+            elif key > self.heap[0][0]:
+                heapq.heapreplace(self.heap, (key, row))
+
+    def end_pass(self):
+        return False
+
+    # Labels of the kept rows, largest (or smallest) value first
+    def rows(self):
+        return [row for key, row in sorted(self.heap, reverse=True)]
+
+# Fixed-bin histogram of one or more columns (a 2-D histogram for two). `values(frame)` returns
+# the values along each axis for a chunk, and `bins` gives each axis either the edges of its bins
+# or a number of equal bins between the smallest and largest value. The bins are the ones
+# numpy.histogramdd() would use on all the values at once, so the counts are the same; when any
+# axis needs its range, the first pass only finds it and the counting takes a second pass.
+class Histogram:
+    def __init__(self, values, bins):
+        self.values = values
+        self.bins = bins
+        self.edges = None
+        self.counts = None
+        self.low = [np.inf] * len(bins)
+        self.high = [-np.inf] * len(bins)
+        if not any(isinstance(axis, int) for axis in bins):
+            self._start_counting()
+
+    def _start_counting(self):
+        self.edges = []
+        for axis, bins in enumerate(self.bins):
+            if isinstance(bins, int):
+                seen = [self.low[axis], self.high[axis]] if self.low[axis] <= self.high[axis] else []
+                bins = np.histogram_bin_edges(np.array(seen, dtype=float), bins)
+            self.edges.append(np.asarray(bins, dtype=float))
+        self.counts = np.zeros([len(edges) - 1 for edges in self.edges])
+
+    def update(self, frame):
+        values = [np.asarray(axis, dtype=float) for axis in self.values(frame)]
+        finite = np.logical_and.reduce([np.isfinite(axis) for axis in values])
+        values = [axis[finite] for axis in values]
+        if self.counts is None:
+            for axis, axis_values in enumerate(values):
+                if len(axis_values):
+                    self.low[axis] = min(self.low[axis], axis_values.min())
+                    self.high[axis] = max(self.high[axis], axis_values.max())
+        else:
+            self.counts += np.histogramdd(np.column_stack(values), bins=self.edges)[0]
+
+    def end_pass(self):
+        if self.counts is None:
+            self._start_counting()
+            return True
+        return False
+
+# Approximate quantiles of `column` in bounded memory (a KLL-style sketch). Values are kept in
+# levels where each item stands for 2**level values; when a level holds more than `size` items,
+# it is sorted and every other item moves up a level. Missing values are skipped; the count,
+# smallest and largest value are exact.
+class QuantileSketch:
+    def __init__(self, column, size=sketch_size):
+        self.column = column
+        self.size = size
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.random = np.random.default_rng(0)  # Which half moves up; seeded for repeatable charts
+
+    def update(self, frame):
+        values = frame[self.column].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.size:
+                items = np.sort(items)
+                # An odd item out stays on this level, so no value's weight is lost
+                stay, items = items[:len(items) % 2], items[len(items) % 2:]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level] = stay
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self.random.integers(2)::2]])
+            level += 1
+
+    def end_pass(self):
+        return False
+
+    # Quantiles `q` (0 to 1), interpolated between ranks like numpy.quantile(); exact while every
+    # value still fits in the first level
+    def quantiles(self, q):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+        ranks = np.cumsum(weights) - (weights + 1) / 2  # Middle rank each item stands for
+        return np.interp(np.asarray(q) * (self.count - 1), ranks, values)
+
+# Box plot numbers of `column` for matplotlib's Axes.bxp(), like matplotlib.cbook.boxplot_stats():
+# the quartiles come from a QuantileSketch in the first pass; the second pass finds the whiskers
+# (the most extreme values within 1.5 IQR of the box) and the most extreme outliers beyond them.
+class BoxplotStats:
+    def __init__(self, column, whis=1.5):
+        self.column = column
+        self.whis = whis
+        self.sketch = QuantileSketch(column)
+        self.stats = None
+        self.low_fliers = np.empty(0)
+        self.high_fliers = np.empty(0)
+
+    def update(self, frame):
+        if self.stats is None:
+            self.sketch.update(frame)
+            return
+        values = frame[self.column].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        inside = values[(values >= self.low_fence) & (values <= self.high_fence)]
+        if len(inside):
+            self.stats['whislo'] = min(self.stats['whislo'], inside.min())
+            self.stats['whishi'] = max(self.stats['whishi'], inside.max())
+        self.low_fliers = np.sort(np.concatenate([self.low_fliers, values[values < self.low_fence]]))[:max_fliers]
+        self.high_fliers = np.sort(np.concatenate([self.high_fliers, values[values > self.high_fence]]))[-max_fliers:]
+
+    def end_pass(self):
+        if self.stats is not None:
+            self.stats['fliers'] = np.concatenate([self.low_fliers, self.high_fliers])
+            return False
+        if not self.sketch.count:
+            self.stats = {'med': np.nan, 'q1': np.nan, 'q3': np.nan, 'whislo': np.nan, 'whishi': np.nan,
+                          'fliers': np.empty(0), 'label': ''}
+            return False
+        q1, median, q3 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        self.low_fence = q1 - self.whis * (q3 - q1)
+        self.high_fence = q3 + self.whis * (q3 - q1)
+        self.stats = {'med': median, 'q1': q1, 'q3': q3, 'whislo': np.inf, 'whishi': -np.inf, 'label': ''}
+        return True
@@ -0,0 +1,190 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.pricing import mxn_per_usd
+from scraper.vocabulary import categories, description_words, name_syllables, statuses, title_attributes, title_words
+
+# Synthetic datasets with the scraped dataset's columns and realistic values and cardinalities,
+# for benchmarking the reports at sizes the crawl hasn't reached yet. The proportions below are
+# taken from the report outputs of the real dataset (Visualizations/*/*.csv).
+
+# Columns of the scraped dataset, in CSV order
+columns = ['Product', 'Product URL', 'Image URL', 'MXN', 'MXN to USD Rate', 'USD', 'Stars', 'Status', 'Seller', 'Marca',
+           'Brand Extraction Method', 'Description', 'Shipping', 'Discount', 'Reviews Count', 'Category', 'Sale Price USD']
+
+# Rows of the real dataset (about 67 MB of CSV), the 1x scale
+base_rows = 5859
+
+# Average length of a product description in the real dataset; descriptions are most of its size
+description_chars = 10500
+
+# Brand Extraction Method -> share of the products (the last two leave the brand as 'N/A')
+brand_methods = {
+    'Strategy 1: Brand link or title': 0.80, 'Strategy 2: JSON-LD script': 0.10, 'Strategy 3: brandId pattern': 0.02,
+    'Strategy 4: JSON attributes': 0.01, 'None': 0.05, 'Strategy 1: Brand link or title (Filtered Out)': 0.02,
+}
+
+# Shares of products with free shipping, a discount, and no rating (0.0 stars and no reviews)
+free_shipping_share = 0.85
+discount_share = 0.95
+unrated_share = 0.25
+
+# Seller and brand popularity: each one lists a Zipf(seller_exponent)-distributed number of products,
+# capped at one per max_share_divisor rows (the real dataset has 2,337 sellers, 1,600 of them with
+# a single product and the largest with 73)
+seller_exponent = 2.2
+max_share_divisor = 75
+
+image_url = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+
+# Distinct names made of 2-4 random syllables (and a number, once the combinations run out)
+def random_names(rng, count):
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = ''.join(rng.choice(name_syllables, rng.integers(2, 5))).title()
+        if name in seen:
+            name = f'{name} {len(names)}'
+        seen.add(name)
+        names.append(name)
+    return np.array(names, dtype=object)
+
+# Owner of each of `rows` products: an index into a pool of owners whose product counts follow a
+# capped Zipf distribution, shuffled. Returns (owner per row, number of owners).
+def popularity_draws(rng, rows, exponent=seller_exponent):
+    cap = max(1, rows // max_share_divisor)
+    sizes = []
+    total = 0
+    while total < rows:
+        draw = rng.zipf(exponent, 4096)
+        draw = draw[draw <= cap]
+        sizes.append(draw)
+        total += draw.sum()
+    sizes = np.concatenate(sizes)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), rows) + 1]
+    owners = np.repeat(np.arange(len(sizes)), sizes)[:rows]
+    rng.shuffle(owners)
+    return owners, len(sizes)
+
+# Pools of description paragraphs of varied length (averaging `chars` characters), shared by the
+# products the way listing variants share descriptions
+def description_pool(rng, chars, size=2000):
+    lengths = np.maximum(0, rng.lognormal(np.log(max(chars, 1)) - 0.5, 1.0, size)).astype(int) if chars else np.zeros(size, int)
+    pool = []
+    for length in lengths:
+        words = rng.choice(description_words, length // 6 + 1)
+        pool.append(' '.join(words)[:length].capitalize() + ('.' if length else ''))
+    return np.array(pool, dtype=object)
+
+# Everything about a synthetic dataset that is drawn once for all of its rows: the seller and
+# brand of every row and their names, and the description paragraphs
+class SyntheticDataset:
+    def __init__(self, rows, seed=0, description_chars=description_chars):
+        self.rows = rows
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.sellers, seller_count = popularity_draws(rng, rows)
+        self.seller_names = random_names(rng, seller_count)
+        self.brands, brand_count = popularity_draws(rng, rows)
+        self.brand_names = random_names(rng, brand_count)
+        self.descriptions = description_pool(rng, description_chars)
+
+    # Rows [start, start + count) as a frame with the scraped dataset's columns
+    def chunk(self, start, count):
+        rng = np.random.default_rng([self.seed, start])
+        rows = np.arange(start, start + count)
+
+        category_names = np.array(list(categories), dtype=object)
+        shares = np.array([share for share, _ in categories.values()])
+        category = rng.choice(len(categories), count, p=shares / shares.sum())
+        average_usd = np.array([price for _, price in categories.values()])[category]
+        # Lognormal prices with the category's average (mean = median * e^(sigma^2 / 2))
+        usd_price = rng.lognormal(np.log(average_usd) - 0.5, 1.0)
+        mxn = np.maximum(1, np.round(usd_price * 20)).astype(np.int64)
+        usd = mxn / mxn_per_usd
+
+        discounted = rng.random(count) < discount_share
+        discount_percent = np.clip(np.round(rng.gamma(2.0, 9.0, count)), 5, 80).astype(int)
+        discount = np.where(discounted, pd.Series(discount_percent).astype(str).to_numpy(object) + '% OFF', 'No Discount')
+        sale_price = np.round(usd * (1 - np.where(discounted, discount_percent, 0) / 100), 2)
+
+        unrated = rng.random(count) < unrated_share
+        stars = np.where(unrated, 0.0, np.round(np.clip(5 - rng.gamma(1.2, 0.25, count), 1, 5), 1))
+        reviews = np.where(unrated, 0, np.round(rng.lognormal(3.5, 1.8, count))).astype(np.int64)
+
+        method_names = np.array(list(brand_methods), dtype=object)
+        method_shares = np.array(list(brand_methods.values()))
+        method = method_names[rng.choice(len(method_names), count, p=method_shares / method_shares.sum())]
+        brand = np.where(np.isin(method, ['None', 'Strategy 1: Brand link or title (Filtered Out)']), 'N/A',
+                         self.brand_names[self.brands[start:start + count]])
+
+        words = rng.choice(title_words, (count, 4))
+        attributes = rng.choice(title_attributes, (count, 2))
+        model = rng.integers(100, 10000, count).astype(str)
+        product = [f'{a} {b} {brand_name if brand_name != "N/A" else c} {d} {e} {m} {f}'
+                   for (a, b, c, d), (e, f), brand_name, m in zip(words, attributes, brand, model)]
+        item_ids = 1000000000 + rows * 7919 % 3000000000
+        deal_ids = rng.integers(0, 2**63, count)
+        product_url = [f'https://articulo.mercadolibre.com.mx/MLM-{item_id}-{title.lower().replace(" ", "-")}-_JM'
+                       f'#polycard_client=offers&deal_print_id={deal_id:016x}'
+                       for item_id, title, deal_id in zip(item_ids, product, deal_ids)]
+
+        status_names = np.array(list(statuses), dtype=object)
+        status_shares = np.array(list(statuses.values()))
+
+        df = pd.DataFrame({
+            'Product': product,
+            'Product URL': product_url,
+            'Image URL': image_url,
+            'MXN': mxn,
+            'MXN to USD Rate': np.nan,
+            'USD': usd,
+            'Stars': stars,
+            'Status': status_names[rng.choice(len(status_names), count, p=status_shares / status_shares.sum())],
+            'Seller': self.seller_names[self.sellers[start:start + count]],
+            'Marca': brand,
+            'Brand Extraction Method': method,
+            'Description': self.descriptions[rng.integers(0, len(self.descriptions), count)],
+            'Shipping': np.where(rng.random(count) < free_shipping_share, 'Free Shipping', 'Paid Shipping'),
+            'Discount': discount,
+            'Reviews Count': reviews,
+            'Category': category_names[category],
+            'Sale Price USD': sale_price,
+        }, index=rows)
+        return df[columns]
+
+    # Write the dataset as a CSV, `chunksize` rows at a time. Returns the file's size in bytes.
+    def write_csv(self, path, chunksize=50000):
+        with open(path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+            for start in range(0, self.rows, chunksize):
+                self.chunk(start, min(chunksize, self.rows - start)).to_csv(f, index=False, header=start == 0)
+        os.replace(path + '.tmp', path)
+        return os.path.getsize(path)
+
+# Synthetic dataset of `scale` times the real dataset's rows in `directory`, named after its
+# settings; it is only written if it isn't there yet. Returns its path.
+def synthetic_dataset(directory, scale=1, seed=0, description_chars=description_chars):
+    path = os.path.join(directory, f'synthetic_x{scale:g}_seed{seed}_desc{description_chars}.csv')
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        SyntheticDataset(int(base_rows * scale), seed, description_chars).write_csv(path)
+    return path
+
+# Write a synthetic dataset (python -m analysis.synthetic OUTPUT --scale 10)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic dataset with the scraped dataset's columns.")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--scale', type=float, default=1, help=f"Size in multiples of the real dataset ({base_rows:,} rows)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (the same seed and scale give the same file)")
+    parser.add_argument('--description-chars', type=int, default=description_chars,
+                        help="Average description length; lower it for smaller files with the same rows")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = SyntheticDataset(int(base_rows * args.scale), args.seed, args.description_chars)
+    size = dataset.write_csv(args.output)
+    print(f"Wrote {dataset.rows:,} rows ({size / 1e6:.0f} MB) to {args.output} in {time.perf_counter() - start:.1f}s")
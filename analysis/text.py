@@ -0,0 +1,26 @@
+import unicodedata
+
+import pandas as pd
+
+# Text transforms for dataset columns. Categories and product titles repeat heavily, so
+# transforms run once per distinct value (see map_unique()) rather than once per row.
+
+# Strip accents ("Computación" -> "Computacion"); non-strings are returned as-is
+def normalize(text):
+    if isinstance(text, str):  # Only process strings
+        return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+    return text
+
+# First three words of a product title, for chart labels
+def short_name(product):
+    return ' '.join(str(product).split()[:3]) + '...'
+
+# `transform` applied to every value of `series`, calling it once per distinct value (missing
+# values included) and mapping the results back to the rows. Returns a categorical Series with
+# the series' index, its categories sorted; values the transform turns into NaN are missing.
+def map_unique(series, transform):
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    # Distinct values may transform to the same result, so the results are factorized again
+    result_codes, categories = pd.factorize(pd.Series([transform(value) for value in uniques], dtype=object), sort=True)
+    codes = result_codes[codes] if len(codes) else codes
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
@@ -0,0 +1 @@
+# Helpers shared by the MercadoLibre scraper (Mercado Libre Scraper.py)
@@ -0,0 +1,158 @@
+import csv
+import functools
+import gzip
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scraper.extract import extract_product_details
+
+# zstandard is optional: it compresses faster and smaller than gzip, which is used otherwise
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Archive layout: rolling segment files of independently compressed pages, plus an
+# append-only index with one tab-separated line per page:
+#   segment file, byte offset, compressed length, fetch time, product URL
+index_name = 'index.tsv'
+segment_extensions = {'zstd': '.zst', 'gzip': '.gz'}
+
+def compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=5)
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def codec_of(segment_name):
+    return 'zstd' if segment_name.endswith('.zst') else 'gzip'
+
+# Compressed store of every fetched product page, so extraction can be re-run offline.
+# Each page is written to the current segment, and the index line only after the page, so a crash
+# can leave at most some unindexed bytes at the end of a segment, which are never read.
+class HtmlArchive:
+    def __init__(self, directory, segment_size=256 * 1024 * 1024, codec=None):
+        if codec is None:
+            codec = 'zstd' if zstandard is not None else 'gzip'
+        if codec == 'zstd' and zstandard is None:
+            raise ImportError("The 'zstd' archive codec requires the zstandard package")
+        self.directory = directory
+        self.segment_size = segment_size
+        self.codec = codec
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Continue after the highest existing segment
+        segments = sorted(name for name in os.listdir(directory) if name.startswith('segment-'))
+        self.segment_number = int(segments[-1].split('-')[1].split('.')[0]) + 1 if segments else 1
+        self.segment = None
+        self.segment_name = None
+        self.index = open(os.path.join(directory, index_name), 'a', encoding='utf-8')
+
+    def _open_segment(self):
+        if self.segment is not None:
+            self.segment.close()
+        self.segment_name = f'segment-{self.segment_number:05d}{segment_extensions[self.codec]}'
+        self.segment_number += 1
+        self.segment = open(os.path.join(self.directory, self.segment_name), 'ab')
+
+    # Store a fetched page; compression happens outside the lock so fetch threads don't queue on it
+    def add(self, product_url, page_source, fetched_at=None):
+        data = compress(page_source.encode('utf-8'), self.codec)
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        with self.lock:
+            if self.segment is None or self.segment.tell() >= self.segment_size:
+                self._open_segment()
+            offset = self.segment.tell()
+            self.segment.write(data)
+            self.segment.flush()
+            self.index.write(f'{self.segment_name}\t{offset}\t{len(data)}\t{fetched_at:.0f}\t{product_url}\n')
+            self.index.flush()
+
+    def close(self):
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+            self.index.close()
+
+# Index entries of an archive directory as (segment path, offset, length, fetched_at, url)
+def read_index(directory):
+    with open(os.path.join(directory, index_name), encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != 5:
+                continue  # Line cut short by a crash
+            segment_name, offset, length, fetched_at, product_url = fields
+            yield os.path.join(directory, segment_name), int(offset), int(length), float(fetched_at), product_url
+
+# HTML of one archived page
+def read_page(segment_path, offset, length):
+    with open(segment_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    return decompress(data, codec_of(segment_path)).decode('utf-8')
+
+# Worker for re_extract(): read, decompress and parse one archived page
+def _extract_entry(entry, backend):
+    segment_path, offset, length, _, product_url = entry
+    try:
+        return extract_product_details(read_page(segment_path, offset, length), product_url, backend=backend)
+    except Exception as e:
+        print(f"Re-extraction failed for {product_url} - {e}")
+        return None
+
+# Latest archived entry per product URL, in archive order. A page fetched again (e.g. a crash
+# dropped its row before the checkpoint and the resumed run fetched it again) keeps only its
+# newest copy, so every product gets one row.
+def latest_entries(directory):
+    latest = {}
+    for position, entry in enumerate(read_index(directory)):
+        product_url = entry[4]
+        if product_url not in latest or entry[3] >= latest[product_url][1][3]:
+            latest[product_url] = (position, entry)
+    return [entry for _, entry in sorted(latest.values())]
+
+# Product URLs in an existing products CSV
+def csv_urls(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['Product URL'] for row in csv.DictReader(f) if row.get('Product URL')}
+
+# Rebuild the products CSV from the archive with no network access: the newest archived page of
+# each product is parsed again by a pool of `workers` processes, and rows are written in archive
+# order. The new CSV is written next to the output and only replaces it once complete.
+# Products in the current CSV with no archived page (e.g. scraped before archiving was turned on)
+# would be lost, so the rebuild is refused (ValueError) unless `allow_missing` is set.
+def re_extract(directory, output_csv, fieldnames, backend='bs4', workers=None, chunksize=64, allow_missing=False):
+    if not os.path.exists(os.path.join(directory, index_name)):
+        raise FileNotFoundError(f"No archive index found in {directory}")
+    entries = latest_entries(directory)
+    missing = csv_urls(output_csv) - {entry[4] for entry in entries}
+    if missing and not allow_missing:
+        raise ValueError(f"{len(missing)} products in {output_csv} have no archived page and would be lost "
+                         f"(e.g. {sorted(missing)[0]})")
+
+    temp_csv = output_csv + '.tmp'
+    rows = 0
+    try:
+        with open(temp_csv, 'w', newline='', encoding='utf-8') as csvfile, \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            worker = functools.partial(_extract_entry, backend=backend)
+            for record in executor.map(worker, entries, chunksize=chunksize):
+                if record:
+                    writer.writerow(record.to_row())
+                    rows += 1
+        os.replace(temp_csv, output_csv)
+    finally:
+        if os.path.exists(temp_csv):
+            os.remove(temp_csv)
+    return rows
@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import time
+
+# Durable, product-level progress for the scraper, kept in SQLite.
+#   products: every product URL handled, with its listing page and whether it was scraped
+#             ('done') or gave up after retries ('failed', queued again by the next run, see failed())
+#   pages:    listing pages queued, and whether all of their products were handled
+#   meta:     the output positions (CSV size, last Parquet part) that match the recorded products
+# Rows are flushed to the outputs first and the checkpoint is committed afterwards. If the
+# process dies in between, the writers drop everything past the committed positions on the next
+# start, so the outputs and the checkpoint always agree and resuming never duplicates rows.
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=FULL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS products (
+                url TEXT PRIMARY KEY,
+                page INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                page INTEGER PRIMARY KEY,
+                product_count INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+
+    def _meta(self, key):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    # Committed position of an output writer (see scraper/writers.py), or None if never recorded
+    def output_position(self, key):
+        with self.lock:
+            value = self._meta(key)
+            return int(value) if value is not None else None
+
+    # Accept an output's current position, e.g. for a CSV that existed before the checkpoint or
+    # that was rewritten outside the scraper (re-extraction)
+    def set_output_position(self, key, position):
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(position)))
+
+    # First listing page to scrape: the lowest page that was queued but not finished,
+    # otherwise the page after the last finished one
+    def resume_page(self, default=1):
+        with self.lock:
+            row = self.db.execute('SELECT MIN(page) FROM pages WHERE completed = 0').fetchone()
+            if row[0] is not None:
+                return row[0]
+            row = self.db.execute('SELECT MAX(page) FROM pages').fetchone()
+            return row[0] + 1 if row[0] is not None else default
+
+    # Drop the URLs that were already scraped in this or an earlier run
+    # (only counting those scraped after `finished_after`, a Unix time, when it is given)
+    def pending(self, urls, finished_after=None):
+        with self.lock:
+            done = set()
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                done.update(url for (url,) in self.db.execute(
+                    f"SELECT url FROM products WHERE status = 'done' AND finished_at > ? AND url IN ({placeholders})",
+                    [finished_after or 0] + chunk))
+        return [url for url in urls if url not in done]
+
+    # Products that gave up after retries on listing pages before `before_page`, as (page, url)
+    # tuples: the crawl resumes after those pages, so the scraper queues them again at startup
+    def failed(self, before_page):
+        with self.lock:
+            return self.db.execute("SELECT page, url FROM products WHERE status = 'failed' AND page < ? "
+                                   "ORDER BY page, finished_at", (before_page,)).fetchall()
+
+    def start_page(self, page, product_count):
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO pages (page, product_count, completed) VALUES (?, ?, 0)',
+                            (page, product_count))
+
+    # Record a batch of handled products, (page, url, scraped) tuples, together with the positions
+    # the output writers reached after flushing their rows ({key: position}), in one transaction
+    def record(self, products, positions):
+        now = time.time()
+        with self.lock:
+            self.db.execute('BEGIN')
+            self.db.executemany(
+                'INSERT OR REPLACE INTO products (url, page, status, finished_at) VALUES (?, ?, ?, ?)',
+                [(url, page, 'done' if scraped else 'failed', now) for page, url, scraped in products])
+            self.db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                [(key, str(position)) for key, position in positions.items()])
+            self.db.execute('COMMIT')
+
+    def complete_page(self, page):
+        with self.lock:
+            self.db.execute('UPDATE pages SET completed = 1 WHERE page = ?', (page,))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,289 @@
+import json
+import re
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from scraper.records import ProductRecord
+
+# lxml is optional: only needed for the fast 'lxml' backend
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    etree = lxml_html = None
+
+# Patterns used by the brand strategies, compiled once instead of on every product
+brand_prefix_pattern = re.compile(r'^(Visita la Tienda oficial de\s+|Ver más productos marca\s+)', re.I)
+brand_id_pattern = re.compile(r'"brandId":"([^"]+)"')
+brand_attributes_pattern = re.compile(r'"attributes":\[\{"id":"Marca","name":"Marca","value_name":"([^"]+)"')
+
+# Seconds the current thread spent in resolve_brand() since extract_product_details_timed() reset it
+_brand_timing = threading.local()
+
+# Strategy 2: Extract brand from the text of the page's JSON-LD scripts
+def brand_from_json_ld(script_texts):
+    for script_text in script_texts:
+        try:
+            data = json.loads(script_text)
+            if 'brand' in data:
+                if isinstance(data['brand'], dict):
+                    brand = data['brand'].get('name', 'N/A')
+                else:
+                    brand = data['brand']
+                return brand.strip()
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return None
+
+# Strategies 2-4 and the final filter, shared by every backend.
+# `brand` is the Strategy 1 result (or None) and `script_texts` yields the JSON-LD script contents.
+def resolve_brand(brand, script_texts, page_source):
+    start = time.perf_counter()
+    brand_extraction_method = 'None'
+    if brand is not None:
+        brand_extraction_method = 'Strategy 1: Brand link or title'
+    else:
+        brand = 'N/A'
+
+    # Strategy 2: Extract brand from JSON-LD scripts
+    if brand == 'N/A':
+        json_ld_brand = brand_from_json_ld(script_texts)
+        if json_ld_brand is not None:
+            brand = json_ld_brand
+            brand_extraction_method = 'Strategy 2: JSON-LD script'
+
+    # Strategy 3: Extract brand from 'brandId' pattern in page source
+    if brand == 'N/A':
+        match = brand_id_pattern.search(page_source)
+        if match:
+            brand = match.group(1).strip()
+            brand_extraction_method = 'Strategy 3: brandId pattern'
+
+    # Strategy 4: Extract brand from attributes in JSON-like structures
+    if brand == 'N/A':
+        match = brand_attributes_pattern.search(page_source)
+        if match:
+            brand = match.group(1).strip()
+            brand_extraction_method = 'Strategy 4: JSON attributes'
+
+    # Exclude incorrect values
+    if brand.lower() in ['iva incluido'] or brand.lower().startswith('en '):
+        brand_extraction_method += ' (Filtered Out)'
+        brand = 'N/A'
+
+    _brand_timing.seconds = getattr(_brand_timing, 'seconds', 0.0) + time.perf_counter() - start
+    return brand, brand_extraction_method
+
+# Reference backend: a full BeautifulSoup tree searched once per field
+def extract_with_bs4(page_source, product_url):
+    soup = BeautifulSoup(page_source, 'html.parser')
+
+    # Extract product title
+    title_tag = soup.find('h1', class_='ui-pdp-title')
+    title = title_tag.text.strip() if title_tag else 'N/A'
+
+    # Extract price
+    price_tag = soup.find('span', class_='andes-money-amount__fraction')
+    price = price_tag.text.strip() if price_tag else 'N/A'
+
+    # Extract rating (stars)
+    rating_tag = soup.find('span', class_='ui-pdp-review__rating')
+    rating = rating_tag.text.strip() if rating_tag else 'N/A'
+    if not rating_tag:
+        print(f"Star rating not available for: {product_url}")
+
+    # Extract availability status
+    status_tag = soup.find('span', class_='ui-pdp-buybox__quantity__available')
+    status = status_tag.text.strip() if status_tag else 'Available'
+
+    # Extract seller name using two strategies
+    seller = 'N/A'
+    # Primary strategy: Extract from 'ui-pdp-seller__label-text-with-icon'
+    seller_tag = soup.find('span', class_='ui-pdp-seller__label-text-with-icon')
+    if seller_tag:
+        seller = seller_tag.get_text(strip=True)
+    else:
+        # Secondary strategy: Extract from 'ui-pdp-seller__label-sold' and its sibling
+        vendido_por_span = soup.find('span', class_='ui-pdp-seller__label-sold')
+        if vendido_por_span:
+            seller_span = vendido_por_span.find_next_sibling('span', class_='')
+            if seller_span:
+                seller = seller_span.get_text(strip=True)
+
+    # Extract brand (Marca). Strategy 1: Remove prefixes from 'ui-pdp-brand__link' or
+    # 'ui-pdp-color--BLUE' elements; the other strategies are shared with the other backends
+    brand = None
+    brand_tag = soup.find('a', class_='ui-pdp-brand__link') or soup.find('p', class_='ui-pdp-color--BLUE')
+    if brand_tag:
+        brand = brand_prefix_pattern.sub('', brand_tag.get_text(strip=True))
+    scripts = (script.string for script in soup.find_all('script', type='application/ld+json'))
+    brand, brand_extraction_method = resolve_brand(brand, scripts, page_source)
+
+    # Extract description
+    description_tag = soup.find('p', class_='ui-pdp-description__content')
+    description = description_tag.text.strip() if description_tag else 'N/A'
+
+    # Extract shipping info
+    shipping = 'Paid Shipping'
+    shipping_tag = soup.find('span', class_='ui-pdp-color--GREEN ui-pdp-family--SEMIBOLD')
+    if shipping_tag and 'Envío gratis' in shipping_tag.text:
+        shipping = 'Free Shipping'
+
+    # Extract discount information
+    discount = 'No Discount'
+    discount_tag = soup.find('span', class_='ui-pdp-price__second-line__label')
+    if discount_tag:
+        discount = discount_tag.text.strip()
+
+    # Extract reviews count
+    reviews_count = 'No Reviews'
+    reviews_tag = soup.find('span', class_='ui-pdp-review__amount')
+    if reviews_tag:
+        reviews_count = reviews_tag.text.strip()
+
+    # Extract category
+    category = 'N/A'
+    category_tag = soup.find('a', class_='andes-breadcrumb__link')
+    if category_tag:
+        category = category_tag.text.strip()
+
+    return {
+        'Product': title,
+        'Product URL': product_url,
+        'Price': price,
+        'Stars': rating,
+        'Status': status,
+        'Seller': seller,
+        'Marca': brand,
+        'Brand Extraction Method': brand_extraction_method,
+        'Description': description,
+        'Shipping': shipping,
+        'Discount': discount,
+        'Reviews Count': reviews_count,
+        'Category': category
+    }
+
+# Elements the lxml backend looks for: (tag, class token) -> field
+lxml_targets = {
+    ('h1', 'ui-pdp-title'): 'title',
+    ('span', 'andes-money-amount__fraction'): 'price',
+    ('span', 'ui-pdp-review__rating'): 'rating',
+    ('span', 'ui-pdp-buybox__quantity__available'): 'status',
+    ('span', 'ui-pdp-seller__label-text-with-icon'): 'seller',
+    ('span', 'ui-pdp-seller__label-sold'): 'seller_label',
+    ('a', 'ui-pdp-brand__link'): 'brand_link',
+    ('p', 'ui-pdp-color--BLUE'): 'brand_title',
+    ('p', 'ui-pdp-description__content'): 'description',
+    ('span', 'ui-pdp-price__second-line__label'): 'discount',
+    ('span', 'ui-pdp-review__amount'): 'reviews',
+    ('a', 'andes-breadcrumb__link'): 'category',
+}
+# The shipping label is matched on its whole class attribute, like bs4 does for a class with spaces
+lxml_shipping_class = 'ui-pdp-color--GREEN ui-pdp-family--SEMIBOLD'
+
+if etree is not None:
+    # One XPath union finds every candidate element in a single pass over the tree
+    lxml_query = etree.XPath(' | '.join(
+        [f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {token} ')]" for tag, token in lxml_targets]
+        + [f"//span[normalize-space(@class)='{lxml_shipping_class}']",
+           "//script[@type='application/ld+json']"]
+    ))
+    lxml_strings = etree.XPath('.//text()')
+
+# Equivalent of bs4's get_text(strip=True): every text node stripped and joined
+def _lxml_stripped_text(element):
+    return ''.join(text.strip() for text in lxml_strings(element))
+
+# Fast backend: lxml parse plus one XPath query, returning the same dict as extract_with_bs4
+def extract_with_lxml(page_source, product_url):
+    if etree is None:
+        raise ImportError("The 'lxml' extractor backend requires the lxml package")
+
+    root = lxml_html.fromstring(page_source or '<html></html>')  # lxml refuses an empty document
+    found = {}
+    scripts = []
+    shipping_tag = None
+    for element in lxml_query(root):
+        tag = element.tag
+        if tag == 'script':
+            scripts.append(element.text)
+            continue
+        classes = element.get('class', '').split()
+        if shipping_tag is None and tag == 'span' and ' '.join(classes) == lxml_shipping_class:
+            shipping_tag = element
+        for token in classes:
+            field = lxml_targets.get((tag, token))
+            # Keep the first match in document order, like soup.find
+            if field is not None and field not in found:
+                found[field] = element
+
+    def text_of(field, default):
+        element = found.get(field)
+        return element.text_content().strip() if element is not None else default
+
+    rating = text_of('rating', 'N/A')
+    if 'rating' not in found:
+        print(f"Star rating not available for: {product_url}")
+
+    seller = 'N/A'
+    if 'seller' in found:
+        seller = _lxml_stripped_text(found['seller'])
+    elif 'seller_label' in found:
+        # First following sibling span with an empty class attribute, like find_next_sibling('span', class_='')
+        for sibling in found['seller_label'].itersiblings('span'):
+            sibling_class = sibling.get('class')
+            if sibling_class is not None and not sibling_class.split():
+                seller = _lxml_stripped_text(sibling)
+                break
+
+    brand = None
+    brand_tag = found.get('brand_link')
+    if brand_tag is None:
+        brand_tag = found.get('brand_title')
+    if brand_tag is not None:
+        brand = brand_prefix_pattern.sub('', _lxml_stripped_text(brand_tag))
+    brand, brand_extraction_method = resolve_brand(brand, scripts, page_source)
+
+    shipping = 'Paid Shipping'
+    if shipping_tag is not None and 'Envío gratis' in shipping_tag.text_content():
+        shipping = 'Free Shipping'
+
+    return {
+        'Product': text_of('title', 'N/A'),
+        'Product URL': product_url,
+        'Price': text_of('price', 'N/A'),
+        'Stars': rating,
+        'Status': text_of('status', 'Available'),
+        'Seller': seller,
+        'Marca': brand,
+        'Brand Extraction Method': brand_extraction_method,
+        'Description': text_of('description', 'N/A'),
+        'Shipping': shipping,
+        'Discount': text_of('discount', 'No Discount'),
+        'Reviews Count': text_of('reviews', 'No Reviews'),
+        'Category': text_of('category', 'N/A')
+    }
+
+# Available extractor backends; 'bs4' is the reference the others must match
+extractors = {
+    'bs4': extract_with_bs4,
+    'lxml': extract_with_lxml,
+}
+
+# Extract every product field from a product page's HTML into a ProductRecord
+def extract_product_details(page_source, product_url, backend='bs4'):
+    try:
+        extractor = extractors[backend]
+    except KeyError:
+        raise ValueError(f"Unknown extractor backend '{backend}', expected one of: {', '.join(extractors)}")
+    return ProductRecord.from_details(extractor(page_source, product_url))
+
+# extract_product_details() for the scraper's metrics: returns the record and the seconds spent on
+# the whole extraction and on the brand fallbacks, (record, {'parse': s, 'brand': s}). The timings
+# travel with the record, so they reach the scraper from a parse worker process too.
+def extract_product_details_timed(page_source, product_url, backend='bs4'):
+    _brand_timing.seconds = 0.0
+    start = time.perf_counter()
+    record = extract_product_details(page_source, product_url, backend)
+    return record, {'parse': time.perf_counter() - start, 'brand': _brand_timing.seconds}
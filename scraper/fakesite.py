@@ -0,0 +1,320 @@
+import collections
+import glob
+import hashlib
+import html
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scraper.vocabulary import categories, description_words, name_syllables, statuses, title_attributes, title_words
+
+# Local stand-in for the MercadoLibre site, used to exercise the scraper's throttling and retry
+# logic and to benchmark it without touching mercadolibre.com.mx. It serves /ofertas?page=N
+# listing pages (poly-component__title links) and product pages: templated ones with the ui-pdp
+# markup the extractors read, filled in from the item ID, or recorded pages (`pages`, see
+# load_pages()) served in turn. Listing pages are always templated, since recorded ones link to
+# the real site. It can also behave like a loaded server:
+#   - inject(status, count, retry_after) queues faults served before normal responses
+#   - break_path(path, status) answers every request for that path with the status until repair_path(path)
+#   - throttle_rate answers 429 whenever the last second saw more requests than allowed
+#   - error_rate answers that fraction of the requests with a 500 or 503
+#   - latency (plus up to latency_jitter more) seconds pass before each answer
+#   - page_kb pads every page with markup and script state to about that size, as real pages are
+class FakeSite:
+    def __init__(self, max_pages=3, products_per_page=5, throttle_rate=None, retry_after=None,
+                 host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0, error_rate=0.0, page_kb=0, pages=None,
+                 seed=0):
+        self.max_pages = max_pages
+        self.products_per_page = products_per_page
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.padding = _padding(page_kb * 1024)
+        self.pages = pages
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.faults = collections.deque()
+        self.broken = {}  # Path -> status it is answered with
+        self.recent = collections.deque()
+        self.status_counts = collections.Counter()
+        self.request_times = []
+        self.server = ThreadingHTTPServer((host, port), _FakeSiteHandler)
+        self.server.daemon_threads = True
+        self.server.site = self
+        self.thread = None
+
+    @property
+    def origin(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    # Listing URL prefix, used in place of the scraper's base_url
+    @property
+    def base_url(self):
+        return self.origin + '/ofertas?page='
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Answer the next `count` requests with `status` (and an optional Retry-After header)
+    def inject(self, status, count=1, retry_after=None):
+        with self.lock:
+            for _ in range(count):
+                self.faults.append((status, retry_after))
+
+    # Answer every request for `path` (e.g. a product URL's path) with `status`, as a product
+    # whose page keeps failing, until repair_path(path)
+    def break_path(self, path, status=503):
+        with self.lock:
+            self.broken[path] = status
+
+    def repair_path(self, path):
+        with self.lock:
+            self.broken.pop(path, None)
+
+    # Seconds to wait before answering a request
+    def delay(self):
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.latency_jitter)
+
+    # Decide how to answer a request for `path`: a queued fault, a broken path's status, a rate-limit
+    # 429, a random server error, or None for a normal page
+    def next_fault(self, path=None):
+        now = time.monotonic()
+        with self.lock:
+            self.request_times.append(now)
+            if path in self.broken:
+                return self.broken[path], None
+            if self.faults:
+                return self.faults.popleft()
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.random.choice([500, 503]), None
+            if self.throttle_rate:
+                while self.recent and now - self.recent[0] > 1.0:
+                    self.recent.popleft()
+                if len(self.recent) >= self.throttle_rate:
+                    return 429, self.retry_after
+                self.recent.append(now)
+        return None
+
+    def product_url(self, page, index):
+        item_id = page * 1000 + index
+        return f'{self.origin}/MLM-{item_id}-producto-de-prueba-_JM'
+
+    def listing_page(self, page):
+        if page > self.max_pages:
+            return '<html><body><p>No hay publicaciones</p></body></html>'
+        links = ''.join(
+            f'<a class="poly-component__title" href="{self.product_url(page, i)}">Producto {page}-{i}</a>'
+            for i in range(self.products_per_page)
+        )
+        return f'<html><body>{links}{self.padding}</body></html>'
+
+    def product_page(self, path):
+        item = path.strip('/')
+        if self.pages:
+            return self.pages[_item_number(item) % len(self.pages)]
+        return templated_product_page(item, self.seed) + self.padding
+
+# Recorded product pages (every .html file in `directory`), for FakeSite(pages=...)
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages
+
+def _item_number(item):
+    digits = ''.join(c for c in item.split('-')[1] if c.isdigit()) if item.count('-') >= 2 else ''
+    return int(digits) if digits else sum(item.encode())
+
+# Product page with the markup of a real one (breadcrumb, brand link, title, rating and reviews,
+# price and discount, shipping, stock, seller, description and a JSON-LD script), its fields drawn
+# from the item ID so the same item always gets the same page. Some pages leave out the rating,
+# the discount or the brand link, to exercise the extractors' fallbacks.
+def templated_product_page(item, seed=0):
+    rng = random.Random(f'{seed}-{item}')
+    category = rng.choices([name for name in categories if name], [share for name, (share, _) in categories.items() if name])[0]
+    brand = ''.join(rng.choices(name_syllables, k=rng.randint(2, 3))).title()
+    seller = ''.join(rng.choices(name_syllables, k=rng.randint(2, 4))).upper()
+    title = ' '.join(rng.choices(title_words, k=4) + [brand] + rng.choices(title_attributes, k=2))
+    price = max(1, round(rng.lognormvariate(7, 1)))
+    discount = rng.choice([5, 10, 15, 20, 25, 30, 35, 40, 50]) if rng.random() < 0.9 else None
+    rating = f'<span class="ui-pdp-review__rating">{rng.uniform(3.5, 5):.1f}</span> ' \
+             f'<span class="ui-pdp-review__amount">({rng.randint(1, 20000):,})</span>' if rng.random() < 0.75 else ''
+    brand_link = f'<a class="ui-pdp-brand__link" href="/tienda/{brand.lower()}">Visita la Tienda oficial de {brand}</a>' \
+        if rng.random() < 0.8 else ''
+    status = rng.choices(list(statuses), list(statuses.values()))[0]
+    shipping = 'Envío gratis' if rng.random() < 0.85 else 'Envío a todo el país'
+    description = ' '.join(rng.choices(description_words, k=rng.randint(20, 300))).capitalize() + '.'
+    json_ld = json.dumps({'@context': 'https://schema.org', '@type': 'Product', 'name': title, 'brand': brand},
+                         ensure_ascii=False)
+    original = f'<s><span class="andes-money-amount__fraction">{round(price / (1 - discount / 100)):,}</span></s>' if discount else ''
+    discount_label = f'<span class="ui-pdp-price__second-line__label andes-money-amount__discount">{discount}% OFF</span>' \
+        if discount else ''
+    return (
+        '<!DOCTYPE html><html lang="es-MX"><head><meta charset="utf-8">'
+        f'<title>{html.escape(title)} | MercadoLibre</title>'
+        f'<script type="application/ld+json">{json_ld}</script></head><body>'
+        f'<nav><ol><li><a class="andes-breadcrumb__link" href="/categoria">{html.escape(category)}</a></li></ol></nav>'
+        f'<div class="ui-pdp-header">{brand_link}<h1 class="ui-pdp-title">{html.escape(title)}</h1>'
+        f'<a class="ui-pdp-review__link">{rating}</a></div>'
+        f'<div class="ui-pdp-price">{original}<span class="andes-money-amount">'
+        f'<span class="andes-money-amount__fraction">{price:,}</span></span>{discount_label}</div>'
+        f'<p class="ui-pdp-media__title"><span class="ui-pdp-color--GREEN ui-pdp-family--SEMIBOLD">{shipping}</span></p>'
+        f'<span class="ui-pdp-buybox__quantity__available">{status}</span>'
+        '<div class="ui-pdp-seller"><span class="ui-pdp-seller__label-sold">Vendido por</span>'
+        f'<span class="ui-pdp-seller__label-text-with-icon">{seller}</span></div>'
+        f'<div class="ui-pdp-description"><p class="ui-pdp-description__content">{description}</p></div>'
+        '</body></html>'
+    )
+
+# About `size` bytes of markup and script state, like the widgets and preloaded state that make up
+# most of a real page, none of it matching what the extractors look for
+def _padding(size):
+    if size <= 0:
+        return ''
+    block = ('<div class="ui-vpp-highlighted-specs__features"><ul>'
+             + ''.join(f'<li class="ui-vpp-highlighted-specs__features-list-item">Característica {i}: valor</li>'
+                       for i in range(8))
+             + '</ul></div>')
+    state = json.dumps({'component': 'ui-recommendations', 'items': [{'id': i, 'label': 'Recomendado'} for i in range(20)]})
+    markup = block * max(1, size // 2 // len(block))
+    script = f'<script>window.__PRELOADED_STATE__ = {state * max(1, size // 2 // len(state))};</script>'
+    return markup + script
+
+class _FakeSiteHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real site, so connection pooling can be observed
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        site = self.server.site
+        delay = site.delay()
+        if delay > 0:
+            time.sleep(delay)
+        fault = site.next_fault(urlparse(self.path).path)
+        if fault:
+            status, retry_after = fault
+            self.send_response(status)
+            if retry_after is not None:
+                self.send_header('Retry-After', str(retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            with site.lock:
+                site.status_counts[status] += 1
+            return
+
+        parsed = urlparse(self.path)
+        if parsed.path == '/ofertas':
+            page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+            body = site.listing_page(page)
+        else:
+            body = site.product_page(parsed.path)
+        payload = body.encode('utf-8')
+
+        # Validator for conditional requests: unchanged pages are answered with 304
+        etag = '"%s"' % hashlib.md5(payload).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            with site.lock:
+                site.status_counts[304] += 1
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(payload)
+        with site.lock:
+            site.status_counts[200] += 1
+
+    # Keep the console quiet; the scraper prints its own progress
+    def log_message(self, format, *args):
+        pass
+
+# Check of the rate limiter and retries against the site (python -m scraper.fakesite), exiting
+# non-zero if any check fails. The site accepts 5 requests per second; the limiter starts at 4.
+#   1. an injected 429 with Retry-After: 2: the retry waits those 2 seconds, not the 0.5 seconds
+#      the halved rate alone would
+#   2. two injected 503s: each one halves the rate, and the product is still fetched on retry
+#   3. 100 more products: every one is fetched, and the rate climbs back and settles near 5/s
+if __name__ == '__main__':
+    import sys
+    import requests
+    from scraper.rate_limit import AdaptiveRateLimiter, fetch_with_retries
+
+    failures = []
+
+    def check(passed, description):
+        print(f"{'ok  ' if passed else 'FAIL'} {description}")
+        if not passed:
+            failures.append(description)
+
+    with FakeSite(throttle_rate=5) as site:
+        limiter = AdaptiveRateLimiter(rate=4, max_rate=20, increase_step=1, healthy_streak=3, base_delay=0.2)
+        url = site.product_url(1, 0)
+        requests_made = []  # (monotonic time, status code, limiter rate when sent)
+
+        def get(url, **kwargs):
+            rate = limiter.current_rate(url)
+            response = requests.get(url, **kwargs)
+            requests_made.append((time.monotonic(), response.status_code, rate))
+            return response
+
+        def fetch():
+            try:
+                return fetch_with_retries(get, url, limiter, timeout=5).status_code == 200
+            except requests.RequestException:
+                return False
+
+        site.inject(429, retry_after=2)
+        fetched = fetch()
+        gap = requests_made[1][0] - requests_made[0][0] if len(requests_made) > 1 else 0.0
+        check(fetched and requests_made[0][1] == 429, "the product is fetched after a 429")
+        check(gap >= 1.95, f"Retry-After: 2 is honored ({gap:.2f}s until the retry)")
+
+        requests_made.clear()
+        site.inject(503, count=2)
+        fetched = fetch()
+        statuses_seen = [status for _, status, _ in requests_made]
+        rates = [rate for _, _, rate in requests_made]
+        check(fetched and statuses_seen == [503, 503, 200], f"the product is fetched after two 503s ({statuses_seen})")
+        check(len(rates) == 3 and rates[1] < rates[0] and rates[2] < rates[1],
+              f"the rate drops after each 503 ({' -> '.join(f'{rate:.2f}' for rate in rates)}/s)")
+
+        requests_made.clear()
+        start = time.monotonic()
+        fetched = sum(fetch() for _ in range(100))
+        check(fetched == 100, f"100 of 100 products fetched despite the throttling ({fetched})")
+        check(max(rate for _, _, rate in requests_made) >= 4, "the rate recovers to the allowed 5/s")
+        # Throughput over the last 50 requests, once the limiter has found the site's limit
+        recent = [moment for moment, status, _ in requests_made[-50:] if status == 200]
+        throughput = (len(recent) - 1) / (recent[-1] - recent[0]) if len(recent) > 1 else 0.0
+        check(2.5 <= throughput <= 5.5, f"it settles near 5/s ({throughput:.2f}/s over the last 50 requests)")
+        print(f"{len(requests_made)} requests in {time.monotonic() - start:.1f}s, "
+              f"final rate {limiter.current_rate(url):.2f}/s, responses served: {dict(site.status_counts)}")
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,258 @@
+import collections
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraper.records import raw_fields
+
+# Upper bounds (seconds) of the timing histogram buckets, from the ~10 µs brand fallbacks and
+# writes and sub-millisecond lxml parses to slow fetches that went through several retries
+duration_buckets = [0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0]
+
+# Seconds of recent products the live products-per-minute rate is computed over
+rate_window = 60.0
+
+# Stages a scrape is timed in, in pipeline order, with what each one covers
+stages = {
+    'listing': "download and parse of a listing page",
+    'fetch': "download of a product page, retries and rate limiting included",
+    'http_request': "one HTTP request (network time only)",
+    'rate_limit_wait': "sleeping in the rate limiter before a request",
+    'parse': "extraction of a product page, brand fallbacks included",
+    'brand': "brand extraction fallbacks (JSON-LD, brandId and attributes patterns)",
+    'write': "buffering rows in the output writers",
+    'flush': "flushing the outputs to disk and committing the checkpoint",
+}
+
+# Timing histogram with fixed buckets: counts per bucket, plus the count and sum of all observations
+class Histogram:
+    def __init__(self, buckets=duration_buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one counts observations above every bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        position = 0
+        while position < len(self.buckets) and value > self.buckets[position]:
+            position += 1
+        self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+
+    # Estimate of the q-quantile (0-1) from the bucket counts, interpolating linearly within the
+    # bucket it falls in (as Prometheus' histogram_quantile() does)
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+# Thread-safe instrumentation for a scrape: timing histograms per stage, labelled counters and a
+# live products-per-minute rate. The scraper's stages report into one instance, which is exported
+# in the Prometheus text format (see MetricsExporter) and summarized at the end of a run.
+#   pages:              listing pages handled
+#   products{result}:   products scraped or failed (or not modified, when refreshing)
+#   http_responses{status}: responses per HTTP status code ('error' for connection errors and timeouts)
+#   brand_methods{method}:  which Brand Extraction Method found each scraped product's brand
+#   missing_fields{field}:  scraped products with 'N/A' in a field
+class ScrapeMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.histograms = collections.defaultdict(Histogram)
+        self.counters = collections.defaultdict(collections.Counter)
+        self.recent = collections.deque()  # Monotonic times of the products finished in the last rate_window
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.histograms[stage].observe(seconds)
+
+    # Context manager timing the block as one observation of `stage`
+    def timer(self, stage):
+        return _StageTimer(self, stage)
+
+    def count(self, name, label='', amount=1):
+        with self.lock:
+            self.counters[name][label] += amount
+
+    # Record one finished product: its outcome ('scraped' or 'failed' unless `result` says otherwise)
+    # and, for a scraped ProductRecord, the brand extraction method that won and the fields that
+    # came back as 'N/A'
+    def product(self, record, result=None):
+        now = time.monotonic()
+        with self.lock:
+            self.counters['products'][result or ('scraped' if record is not None else 'failed')] += 1
+            self.recent.append(now)
+            if record is not None:
+                self.counters['brand_methods'][record.brand_extraction_method] += 1
+                for field, value in zip(raw_fields, (getattr(record, name) for name in record.__slots__)):
+                    if value == 'N/A':
+                        self.counters['missing_fields'][field] += 1
+
+    # Products finished per minute over the last rate_window seconds (or since the start, if sooner)
+    def products_per_minute(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > rate_window:
+                self.recent.popleft()
+            finished = len(self.recent)
+        window = min(rate_window, time.time() - self.started)
+        return finished * 60 / window if window > 0 else 0.0
+
+    # Fraction of the scraped products with 'N/A' in each field
+    def missing_rates(self):
+        with self.lock:
+            scraped = self.counters['products']['scraped']
+            return {field: count / scraped for field, count in self.counters['missing_fields'].items()} if scraped else {}
+
+    # The metrics in the Prometheus text exposition format
+    def prometheus(self):
+        rate = self.products_per_minute()
+        lines = []
+        with self.lock:
+            lines += ['# HELP scraper_stage_seconds Time spent per scrape stage.',
+                      '# TYPE scraper_stage_seconds histogram']
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            for name, label_name, help_text in [
+                ('pages', None, "Listing pages handled."),
+                ('products', 'result', "Products handled, by outcome."),
+                ('http_responses', 'status', "HTTP responses by status code ('error' for failed requests)."),
+                ('brand_methods', 'method', "Scraped products by the brand extraction method that won."),
+                ('missing_fields', 'field', "Scraped products with 'N/A' in a field."),
+            ]:
+                metric = f'scraper_{name}_total'
+                lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+                for label, value in sorted(self.counters[name].items()):
+                    labels = f'{{{label_name}="{_escape(label)}"}}' if label_name else ''
+                    lines.append(f'{metric}{labels} {value}')
+
+        lines += ['# HELP scraper_products_per_minute Products finished per minute over the last minute.',
+                  '# TYPE scraper_products_per_minute gauge',
+                  f'scraper_products_per_minute {rate:.3f}',
+                  '# HELP scraper_start_time_seconds Unix time the scrape started.',
+                  '# TYPE scraper_start_time_seconds gauge',
+                  f'scraper_start_time_seconds {self.started:.3f}']
+        return '\n'.join(lines) + '\n'
+
+    # Table of the time spent per stage and the counters, for the end of a run
+    def summary(self):
+        with self.lock:
+            histograms = {stage: histogram for stage, histogram in self.histograms.items() if histogram.count}
+            products = dict(self.counters['products'])
+            responses = dict(self.counters['http_responses'])
+            methods = self.counters['brand_methods'].most_common()
+        elapsed = time.time() - self.started
+        lines = [f"{'Stage':16} {'Count':>8} {'Total s':>9} {'Mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}"]
+        for stage in [stage for stage in stages if stage in histograms] + sorted(set(histograms) - set(stages)):
+            histogram = histograms[stage]
+            lines.append(f"{stage:16} {histogram.count:8} {histogram.sum:9.2f} {histogram.sum / histogram.count * 1000:9.3f} "
+                         f"{histogram.quantile(0.5) * 1000:8.3f} {histogram.quantile(0.95) * 1000:8.3f}")
+        finished = sum(products.values())
+        outcomes = ', '.join(f"{count} {result}" for result, count in sorted(products.items())) or "0"
+        lines.append(f"Products: {outcomes} in {elapsed:.0f}s ({finished * 60 / elapsed if elapsed else 0:.1f} per minute)")
+        if responses:
+            lines.append("HTTP responses: " + ', '.join(f"{status}: {count}" for status, count in sorted(responses.items())))
+        if methods:
+            lines.append("Brand extraction: " + ', '.join(f"{method}: {count}" for method, count in methods))
+        missing = self.missing_rates()
+        if missing:
+            lines.append("'N/A' rate: " + ', '.join(f"{field}: {rate:.1%}" for field, rate in sorted(missing.items())))
+        return '\n'.join(lines)
+
+class _StageTimer:
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+# Label values are quoted; backslashes, quotes and newlines must be escaped
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Publishes a ScrapeMetrics while the scrape runs: every `interval` seconds the Prometheus text is
+# written to `path` (through a temp file and a rename, so a reader such as node_exporter's textfile
+# collector never sees half a file) and a progress line is printed; with a `port`, it is also
+# served at http://<host>:<port>/metrics for Prometheus to scrape.
+class MetricsExporter:
+    def __init__(self, metrics, path=None, port=None, interval=15.0, host='127.0.0.1'):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.server = None
+        if port is not None:
+            self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            self.server.daemon_threads = True
+            self.server.metrics = metrics
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        if self.server is None:
+            return None
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.export()
+            with self.metrics.lock:
+                products = sum(self.metrics.counters['products'].values())
+            print(f"Progress: {products} products, {self.metrics.products_per_minute():.1f} per minute")
+
+    def export(self):
+        if self.path is not None:
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(self.metrics.prometheus())
+            os.replace(self.path + '.tmp', self.path)
+
+    # Stop the periodic export and the endpoint, writing the final values first
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self.export()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        payload = self.server.metrics.prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    # Keep the console quiet; the scraper prints its own progress
+    def log_message(self, format, *args):
+        pass
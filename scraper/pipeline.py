@@ -0,0 +1,151 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Marker that tells a stage its input is finished
+_stop = object()
+
+# Three-stage scraping pipeline, each stage sized on its own:
+#   1. fetch_workers I/O threads download product pages (fetch(url) -> HTML or None)
+#      into a bounded queue, so downloads pause when parsing falls behind;
+#   2. a ProcessPoolExecutor with parse_workers processes runs extract(html, url) -> row,
+#      outside the GIL (parse_workers=0 parses in the I/O threads instead);
+#   3. a single writer thread collects whatever products finished since its last write and hands
+#      them to write_rows([(page, url, row), ...]) in one batch (row is None when the product
+#      could not be scraped), then calls page_done(page) for every listing page fully handled.
+# `extract` must be picklable (a module-level function or a functools.partial of one).
+# If a parse process dies, the pool is broken: the products it was parsing count as failed and the
+# rest are parsed in the parse thread, so the fetch threads and close() never wait on a dead pool.
+class ScrapePipeline:
+    def __init__(self, fetch, extract, write_rows, page_done=None, fetch_workers=4, parse_workers=2,
+                 queue_size=64, batch_size=100):
+        self.fetch = fetch
+        self.extract = extract
+        self.write_rows = write_rows
+        self.page_done = page_done
+        self.parse_workers = parse_workers
+        self.batch_size = batch_size
+
+        self.links = queue.Queue(maxsize=queue_size)
+        self.pages = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue()
+        self.parse_slots = threading.BoundedSemaphore(max(1, parse_workers) * 2)
+        self.executor = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+        self.pool_broken = False
+
+        self.fetchers = [threading.Thread(target=self._fetch_stage, daemon=True) for _ in range(fetch_workers)]
+        self.threads = list(self.fetchers)
+        if self.executor is not None:
+            self.threads.append(threading.Thread(target=self._parse_stage, daemon=True))
+        self.threads.append(threading.Thread(target=self._write_stage, daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    # Queue every product of a listing page; blocks while the fetch stage is saturated
+    def submit_page(self, page, product_links):
+        self.results.put(('page', page, len(product_links)))
+        for product_url in product_links:
+            self.links.put((page, product_url))
+
+    def _extract_safely(self, page_source, product_url):
+        try:
+            return self.extract(page_source, product_url)
+        except Exception as e:
+            print(f"Parsing failed for product: {product_url} - {e}")
+            return None
+
+    def _fetch_stage(self):
+        while True:
+            item = self.links.get()
+            if item is _stop:
+                return
+            page, product_url = item
+            print(f"Scraping product: {product_url}")
+            # A fetch that raises counts as failed, so the thread keeps going and close() doesn't hang
+            try:
+                page_source = self.fetch(product_url)
+            except Exception as e:
+                print(f"Fetching failed for product: {product_url} - {e}")
+                page_source = None
+            if page_source is None:
+                self.results.put(('row', page, product_url, None))
+            elif self.executor is None:
+                self.results.put(('row', page, product_url, self._extract_safely(page_source, product_url)))
+            else:
+                self.pages.put((page, product_url, page_source))
+
+    def _parse_stage(self):
+        while True:
+            item = self.pages.get()
+            if item is _stop:
+                return
+            page, product_url, page_source = item
+            if self.pool_broken:
+                self.results.put(('row', page, product_url, self._extract_safely(page_source, product_url)))
+                continue
+            self.parse_slots.acquire()
+            try:
+                future = self.executor.submit(self.extract, page_source, product_url)
+            except BrokenProcessPool as e:
+                self.parse_slots.release()
+                print(f"Parse processes failed ({e}); parsing in the pipeline thread from now on")
+                self.pool_broken = True
+                self.results.put(('row', page, product_url, self._extract_safely(page_source, product_url)))
+                continue
+            future.add_done_callback(
+                lambda future, page=page, product_url=product_url: self._parsed(future, page, product_url))
+
+    def _parsed(self, future, page, product_url):
+        self.parse_slots.release()
+        try:
+            row = future.result()
+        except Exception as e:
+            print(f"Parsing failed for product: {product_url} - {e}")
+            row = None
+        self.results.put(('row', page, product_url, row))
+
+    def _write_stage(self):
+        remaining = {}  # page -> products not handled yet
+        stopping = False
+        while not stopping:
+            # Group commit: take everything that finished since the last write
+            items = [self.results.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.results.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = []
+            for item in items:
+                if item is _stop:
+                    stopping = True
+                elif item[0] == 'page':
+                    _, page, count = item
+                    remaining[page] = count
+                else:
+                    _, page, product_url, row = item
+                    rows.append((page, product_url, row))
+                    remaining[page] -= 1
+            if rows:
+                self.write_rows(rows)
+
+            # Report pages whose products are all written
+            for page in [page for page, count in remaining.items() if count == 0]:
+                del remaining[page]
+                if self.page_done is not None:
+                    self.page_done(page)
+
+    # Wait for every submitted product to be written, then stop all stages
+    def close(self):
+        for _ in self.fetchers:
+            self.links.put(_stop)
+        for thread in self.fetchers:
+            thread.join()
+        if self.executor is not None:
+            self.pages.put(_stop)
+            self.threads[len(self.fetchers)].join()
+            self.executor.shutdown(wait=True)
+        self.results.put(_stop)
+        self.threads[-1].join()
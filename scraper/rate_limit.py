@@ -0,0 +1,162 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from requests.exceptions import RequestException
+
+# Status codes that mean "slow down": rate limiting and server-side errors
+def is_throttled(status_code):
+    return status_code == 429 or 500 <= status_code < 600
+
+# Convert a Retry-After header (seconds or an HTTP date) into seconds to wait
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+# Token bucket: tokens refill at `rate` per second up to `burst`.
+# acquire() reserves a token (the count may go negative) and sleeps until it is due,
+# so concurrent callers are served in order without busy waiting.
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    # Stop handing out tokens for `seconds` (used for Retry-After and backoff)
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                paused = now < self.paused_until
+                if paused:
+                    delay = self.paused_until - now
+                else:
+                    self._refill(now)
+                    self.tokens -= 1
+                    delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            if delay > 0:
+                time.sleep(delay)
+            waited += delay
+            if not paused:
+                return waited
+
+# Rate limiter with one token bucket per host and AIMD rate control:
+# throttled responses (429/5xx) cut the rate by `backoff_factor` and pause the host with an
+# exponentially growing delay (or the server's Retry-After), while every `healthy_streak`
+# successful responses in a row raise the rate by `increase_step` up to `max_rate`.
+# With a `metrics` (scraper.metrics.ScrapeMetrics), the waits are timed as the 'rate_limit_wait' stage.
+class AdaptiveRateLimiter:
+    def __init__(self, rate, max_rate=None, min_rate=0.02, burst=1, backoff_factor=0.5,
+                 increase_step=None, healthy_streak=20, base_delay=2.0, max_delay=300.0, metrics=None):
+        self.initial_rate = rate
+        self.metrics = metrics
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.backoff_factor = backoff_factor
+        self.increase_step = increase_step if increase_step is not None else rate * 0.1
+        self.healthy_streak = healthy_streak
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _host_state(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = {
+                    'bucket': TokenBucket(min(self.initial_rate, self.max_rate), self.burst),
+                    'successes': 0,
+                    'failures': 0,
+                }
+            return self.hosts[host]
+
+    # Block until a request to the URL's host is allowed; returns the seconds waited
+    def acquire(self, url):
+        waited = self._host_state(url)['bucket'].acquire()
+        if self.metrics is not None:
+            self.metrics.observe('rate_limit_wait', waited)
+        return waited
+
+    def current_rate(self, url):
+        return self._host_state(url)['bucket'].rate
+
+    # Feed the outcome of a request back into the limiter. `status_code` is None for
+    # connection errors and timeouts, which are treated like a server error.
+    def record(self, url, status_code, retry_after=None):
+        state = self._host_state(url)
+        bucket = state['bucket']
+        with self.lock:
+            if status_code is None or is_throttled(status_code):
+                state['successes'] = 0
+                state['failures'] += 1
+                new_rate = max(self.min_rate, bucket.rate * self.backoff_factor)
+                delay = retry_after
+                if delay is None:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (state['failures'] - 1))
+                    delay *= random.uniform(0.8, 1.2)  # Jitter so workers don't retry in lockstep
+            else:
+                state['failures'] = 0
+                state['successes'] += 1
+                new_rate = None
+                if state['successes'] >= self.healthy_streak and bucket.rate < self.max_rate:
+                    state['successes'] = 0
+                    new_rate = min(self.max_rate, bucket.rate + self.increase_step)
+                delay = None
+        if new_rate is not None:
+            bucket.set_rate(new_rate)
+        if delay:
+            bucket.pause(delay)
+        return delay
+
+# GET a URL through the rate limiter, retrying throttled responses and connection errors.
+# Other client errors (404, ...) are raised right away; after `max_retries` the last error is raised.
+# A negative `max_retries` counts as 0, so the URL is always requested at least once.
+def fetch_with_retries(get, url, limiter, max_retries=5, **kwargs):
+    max_retries = max(0, max_retries)
+    for attempt in range(max_retries + 1):
+        limiter.acquire(url)
+        try:
+            response = get(url, **kwargs)
+        except RequestException as e:
+            limiter.record(url, None)
+            if attempt == max_retries:
+                raise
+            print(f"Request failed for {url} ({e}), retrying ({attempt + 1}/{max_retries})")
+            continue
+
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        limiter.record(url, response.status_code, retry_after)
+        if is_throttled(response.status_code) and attempt < max_retries:
+            print(f"Got HTTP {response.status_code} for {url}, retrying ({attempt + 1}/{max_retries})")
+            continue
+        response.raise_for_status()
+        return response
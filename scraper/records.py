@@ -0,0 +1,70 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Columns as scraped, in CSV order
+raw_fields = ['Product', 'Product URL', 'Price', 'Stars', 'Status', 'Seller', 'Marca',
+              'Brand Extraction Method', 'Description', 'Shipping', 'Discount', 'Reviews Count', 'Category']
+
+# Normalized columns written next to the raw ones
+typed_fields = ['Price Value', 'Discount Fraction', 'Stars Value', 'Reviews Count Value', 'Free Shipping']
+
+record_fields = raw_fields + typed_fields
+
+number_pattern = re.compile(r'\d[\d,]*(?:\.\d+)?')
+discount_pattern = re.compile(r'(\d+(?:\.\d+)?)\s*%\s*OFF', re.I)
+
+# First number in a scraped string ("1,299", "4.7", "(2,315)"), or None for 'N/A' and the like
+def parse_number(text):
+    match = number_pattern.search(text or '')
+    return float(match.group(0).replace(',', '')) if match else None
+
+# "35% OFF" -> 0.35; anything without a "% OFF" label (e.g. 'No Discount') -> 0.0
+def parse_discount(text):
+    match = discount_pattern.search(text or '')
+    return float(match.group(1)) / 100 if match else 0.0
+
+# "(2,315)" -> 2315, 'No Reviews' -> 0, unreadable text -> None
+def parse_reviews_count(text):
+    if text == 'No Reviews':
+        return 0
+    number = parse_number(text)
+    return int(number) if number is not None else None
+
+# One scraped product: the raw text of every field, plus numeric versions of the fields the
+# analysis scripts compute with, parsed once here instead of in every script
+@dataclass(slots=True)
+class ProductRecord:
+    product: str
+    product_url: str
+    price: str
+    stars: str
+    status: str
+    seller: str
+    marca: str
+    brand_extraction_method: str
+    description: str
+    shipping: str
+    discount: str
+    reviews_count: str
+    category: str
+    price_value: Optional[float] = None
+    discount_fraction: Optional[float] = None
+    stars_value: Optional[float] = None
+    reviews_count_value: Optional[int] = None
+    free_shipping: Optional[bool] = None
+
+    # Build a record from an extractor's dict of raw fields and fill in the typed fields
+    @classmethod
+    def from_details(cls, details):
+        record = cls(*(details[field] for field in raw_fields))
+        record.price_value = parse_number(record.price)
+        record.discount_fraction = parse_discount(record.discount)
+        record.stars_value = parse_number(record.stars)
+        record.reviews_count_value = parse_reviews_count(record.reviews_count)
+        record.free_shipping = record.shipping == 'Free Shipping'
+        return record
+
+    # Row dict keyed by the CSV column names (raw and typed)
+    def to_row(self):
+        return dict(zip(record_fields, (getattr(self, name) for name in self.__slots__)))
@@ -0,0 +1,87 @@
+import csv
+import sqlite3
+import time
+
+# Fields that change between visits and are compared on refresh
+tracked_fields = ['Price', 'Discount', 'Status', 'Reviews Count', 'Stars']
+
+# Extra columns of the delta file, in front of the product columns
+delta_fields = ['Checked At', 'Changed Fields']
+
+# Headers for a conditional request, so the server can answer 304 Not Modified
+def conditional_headers(etag, last_modified):
+    request_headers = {}
+    if etag:
+        request_headers['If-None-Match'] = etag
+    if last_modified:
+        request_headers['If-Modified-Since'] = last_modified
+    return request_headers
+
+# Tracked fields whose value differs between two scrapes of a product
+def changed_fields(old_values, details):
+    return [field for field in tracked_fields if old_values.get(field) != details.get(field)]
+
+# Refresh bookkeeping for known products, kept in SQLite: the last values of the tracked fields,
+# the validators (ETag/Last-Modified) from the last response, and how often each product was
+# checked and found changed. Products that changed most often per check are refreshed first.
+class RefreshState:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS products (
+                url TEXT PRIMARY KEY,
+                price TEXT, discount TEXT, status TEXT, reviews_count TEXT, stars TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                checks INTEGER NOT NULL DEFAULT 0,
+                changes INTEGER NOT NULL DEFAULT 0,
+                last_checked REAL NOT NULL DEFAULT 0
+            )
+        ''')
+
+    # Start tracking every product of the scraped CSV that isn't tracked yet,
+    # using its most recent row as the known values. Returns the number of new products.
+    def seed_from_csv(self, csv_path):
+        latest = {}
+        with open(csv_path, newline='', encoding='utf-8') as csvfile:
+            for row in csv.DictReader(csvfile):
+                latest[row['Product URL']] = [row.get(field) for field in tracked_fields]
+        before = self.db.total_changes
+        self.db.executemany(
+            'INSERT OR IGNORE INTO products (url, price, discount, status, reviews_count, stars) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            ([url] + values for url, values in latest.items()))
+        self.db.commit()
+        return self.db.total_changes - before
+
+    # Products to refresh, most volatile first (changes per check, with a prior so new products
+    # sit in the middle), then least recently checked.
+    # Yields (url, etag, last_modified, {field: last value}).
+    def queue(self, limit=None):
+        rows = self.db.execute(
+            'SELECT url, etag, last_modified, price, discount, status, reviews_count, stars FROM products '
+            'ORDER BY (changes + 1.0) / (checks + 2.0) DESC, last_checked ASC LIMIT ?',
+            (limit if limit is not None else -1,)).fetchall()
+        for url, etag, last_modified, *values in rows:
+            yield url, etag, last_modified, dict(zip(tracked_fields, values))
+
+    # Store the outcome of one refresh. `details` is None when the server answered 304.
+    def record(self, url, details, etag, last_modified, changed, checked_at=None):
+        checked_at = checked_at if checked_at is not None else time.time()
+        if details is None:
+            self.db.execute(
+                'UPDATE products SET checks = checks + 1, last_checked = ? WHERE url = ?', (checked_at, url))
+        else:
+            self.db.execute(
+                'UPDATE products SET price = ?, discount = ?, status = ?, reviews_count = ?, stars = ?, '
+                'etag = ?, last_modified = ?, checks = checks + 1, changes = changes + ?, last_checked = ? '
+                'WHERE url = ?',
+                [details.get(field) for field in tracked_fields]
+                + [etag, last_modified, 1 if changed else 0, checked_at, url])
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
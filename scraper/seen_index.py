@@ -0,0 +1,111 @@
+import array
+import bisect
+import hashlib
+import heapq
+import os
+import re
+import struct
+import threading
+import time
+from urllib.parse import urlsplit
+
+# MercadoLibre item IDs: site code (MLM for Mexico, MLA, MLB, ...) and a number,
+# written as "MLM-123456789" in article URLs and "MLM123456789" in catalog URLs
+item_id_pattern = re.compile(r'\b(ML[A-Z])-?(\d{6,})', re.I)
+
+# Index file layout: magic, entry count, then all keys (uint64) and all timestamps (uint32)
+index_magic = b'MLSEEN01'
+index_header = struct.Struct('<8sQ')
+
+# Normalized item ID of a product URL, e.g. 'MLM123456789'. URLs without an item ID fall back
+# to the URL without query string and fragment, so tracking parameters don't create duplicates.
+def normalize_item_id(url):
+    match = item_id_pattern.search(url)
+    if match:
+        return match.group(1).upper() + match.group(2)
+    parts = urlsplit(url)
+    return f'{parts.netloc.lower()}{parts.path.rstrip("/")}'
+
+# 64-bit key for an item: the item number tagged with its site letter, or a hash of the
+# fallback ID (top bit set, so it can't collide with a real item number)
+def item_key(url):
+    match = item_id_pattern.search(url)
+    if match:
+        return (ord(match.group(1)[2].upper()) - 64) << 48 | int(match.group(2))
+    digest = hashlib.blake2b(normalize_item_id(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') | 1 << 63
+
+# Persistent index of the products already scraped, with the time each was last seen.
+# Loaded entries live in two sorted flat arrays (12 bytes per item, searched with bisect) and
+# are read straight from disk with array.fromfile, so millions of entries load in milliseconds.
+# Items added during a run sit in a small dict until save() merges them in.
+class SeenIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.keys = array.array('Q')
+        self.times = array.array('I')
+        self.recent = {}
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                magic, count = index_header.unpack(f.read(index_header.size))
+                if magic != index_magic:
+                    raise ValueError(f"{path} is not a seen-items index")
+                self.keys.fromfile(f, count)
+                self.times.fromfile(f, count)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.keys) + sum(1 for key in self.recent if not self._find(key)[0])
+
+    def _find(self, key):
+        position = bisect.bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key, position
+
+    # Unix time the product was last scraped, or None if it never was
+    def last_seen(self, url):
+        key = item_key(url)
+        with self.lock:
+            if key in self.recent:
+                return self.recent[key]
+            found, position = self._find(key)
+            return self.times[position] if found else None
+
+    # True when the product was scraped, and (if max_age is given) less than max_age seconds ago
+    def is_fresh(self, url, max_age=None, now=None):
+        seen = self.last_seen(url)
+        if seen is None:
+            return False
+        if max_age is None:
+            return True
+        return (now if now is not None else time.time()) - seen <= max_age
+
+    def add(self, url, timestamp=None):
+        with self.lock:
+            self.recent[item_key(url)] = int(timestamp if timestamp is not None else time.time())
+
+    # Merge the recent items into the sorted arrays and rewrite the file atomically
+    def save(self):
+        with self.lock:
+            new_items = []
+            for key, timestamp in self.recent.items():
+                found, position = self._find(key)
+                if found:
+                    self.times[position] = timestamp
+                else:
+                    new_items.append((key, timestamp))
+            if new_items:
+                new_items.sort()
+                merged = list(heapq.merge(zip(self.keys, self.times), new_items))
+                self.keys = array.array('Q', (key for key, _ in merged))
+                self.times = array.array('I', (timestamp for _, timestamp in merged))
+            self.recent.clear()
+
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(index_header.pack(index_magic, len(self.keys)))
+                self.keys.tofile(f)
+                self.times.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
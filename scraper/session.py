@@ -0,0 +1,93 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Default (connect, read) timeouts in seconds, so a hung socket can't stall the run
+default_timeout = (10, 30)
+
+# Shared HTTP session for the scraper: keep-alive connection pooling sized to the number of
+# workers, compressed transfers and default timeouts. It also counts requests, bytes and new
+# connections so the savings of pooling and compression can be measured. With a `metrics`
+# (scraper.metrics.ScrapeMetrics), every request is timed as the 'http_request' stage and its
+# status code counted.
+#
+# ACCEPT_ENCODING comes from urllib3 and only offers brotli ("br") or zstd when the optional
+# brotli/zstandard packages are installed, since those are needed to decode the responses.
+class ScraperSession:
+    def __init__(self, pool_size=10, timeout=default_timeout, headers=None, metrics=None):
+        self.timeout = timeout
+        self.metrics = metrics
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        if headers:
+            self.session.headers.update(headers)
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.round_trips = 0
+        self.body_bytes = 0
+        self.wire_bytes = 0
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.RequestException:
+            if self.metrics is not None:
+                self.metrics.observe('http_request', time.perf_counter() - start)
+                self.metrics.count('http_responses', 'error')
+            raise
+
+        # Reading .content pulls the whole body, so raw.tell() is the compressed size on the wire
+        body_bytes = len(response.content)
+        wire_bytes = response.raw.tell() if response.raw is not None else body_bytes
+        if self.metrics is not None:
+            self.metrics.observe('http_request', time.perf_counter() - start)
+            self.metrics.count('http_responses', str(response.status_code))
+        with self.lock:
+            self.requests += 1
+            self.round_trips += 1 + len(response.history)  # Redirects cost an extra round-trip each
+            self.body_bytes += body_bytes
+            self.wire_bytes += wire_bytes
+        return response
+
+    # Number of pooled TCP/TLS connections opened so far, read from urllib3's connection pools.
+    # A keep-alive socket the server closed is reopened in the same slot and not counted again.
+    def connections_opened(self):
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def stats(self):
+        with self.lock:
+            requests_made, round_trips = self.requests, self.round_trips
+            body_bytes, wire_bytes = self.body_bytes, self.wire_bytes
+        connections = self.connections_opened()
+        return {
+            'requests': requests_made,
+            'round_trips': round_trips,
+            'connections': connections,
+            'requests_per_connection': requests_made / connections if connections else 0.0,
+            'body_bytes': body_bytes,
+            'wire_bytes': wire_bytes,
+            'compression_ratio': body_bytes / wire_bytes if wire_bytes else 0.0,
+            'wire_bytes_per_request': wire_bytes / requests_made if requests_made else 0.0,
+        }
+
+    def close(self):
+        self.session.close()
+
+# One-line summary of ScraperSession.stats() for the end of a run
+def format_stats(stats):
+    return (
+        f"{stats['requests']} requests ({stats['round_trips']} round-trips) over {stats['connections']} connections "
+        f"({stats['requests_per_connection']:.1f} per connection), "
+        f"{stats['wire_bytes'] / 1e6:.1f} MB on the wire for {stats['body_bytes'] / 1e6:.1f} MB of HTML "
+        f"(compression {stats['compression_ratio']:.1f}x, {stats['wire_bytes_per_request'] / 1e3:.1f} kB per request)"
+    )
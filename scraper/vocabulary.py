@@ -0,0 +1,35 @@
+# What the site's listings are made of, shared by the fake site (scraper.fakesite) and the
+# synthetic datasets (analysis.synthetic). The proportions are taken from the report outputs of
+# the real dataset (Visualizations/*/*.csv).
+
+# Categories as scraped (with accents) -> (share of the products, average price in USD)
+categories = {
+    'Computación': (0.070, 193.3), 'Hogar, Muebles y Jardín': (0.105, 74.7), 'Belleza y Cuidado Personal': (0.060, 60.2),
+    'Electrónica, Audio y Video': (0.070, 170.1), 'Herramientas': (0.050, 99.6), 'Ropa, Bolsas y Calzado': (0.060, 49.2),
+    'Accesorios para Vehículos': (0.045, 114.3), 'Deportes y Fitness': (0.040, 108.8), 'Celulares y Telefonía': (0.045, 224.4),
+    'Juegos y Juguetes': (0.040, 105.5), 'Animales y Mascotas': (0.030, 61.0), 'Salud y Equipamiento Médico': (0.030, 122.3),
+    'Electrodomésticos': (0.030, 152.4), 'Construcción': (0.025, 89.4), 'Industrias y Oficinas': (0.020, 121.0),
+    'Alimentos y Bebidas': (0.020, 56.7), 'Consolas y Videojuegos': (0.020, 161.1), 'Arte, Papelería y Mercería': (0.020, 45.0),
+    'Bebés': (0.015, 75.0), 'Joyas y Relojes': (0.015, 131.7), 'Cámaras y Accesorios': (0.010, 197.2),
+    'Instrumentos Musicales': (0.010, 107.7), 'Libros, Revistas y Comics': (0.010, 107.1), 'Antigüedades y Colecciones': (0.005, 76.6),
+    'Agro': (0.005, 135.4), 'Recuerdos, Cotillón y Fiestas': (0.015, 29.3), 'Otras categorías': (0.030, 81.8),
+    'Unknown': (0.010, 81.8), None: (0.015, 81.8),
+}
+
+# Availability statuses as scraped -> share of the products
+statuses = {
+    '(+50 disponibles)': 0.535, '(+20 disponibles)': 0.137, '(+10 disponibles)': 0.134, '(+5 disponibles)': 0.073,
+    'Available': 0.040, '(3 disponibles)': 0.022, '(2 disponibles)': 0.021, '(4 disponibles)': 0.020, '(5 disponibles)': 0.018,
+}
+
+# Words product titles, descriptions and seller and brand names are made of
+title_words = ('Tablet Alimento Seco Para Gato Perro Disco Duro Externo Audífonos Bluetooth Inalámbricos Silla Gamer '
+               'Mesa Plegable Lámpara Led Taladro Inalámbrico Juego Sartenes Antiadherente Bocina Portátil Reloj '
+               'Inteligente Mochila Escolar Tenis Deportivos Cafetera Licuadora Freidora Aire Colchón Matrimonial '
+               'Cámara Seguridad Wifi Teclado Mecánico Mouse Monitor Cable Usb Cargador Rápido Funda Kit Set Pack').split()
+title_attributes = ('Negro Blanco Gris Azul Rojo Pro Max Mini Plus Ultra 64gb 128gb 1tb 3kg 7.5kg 2 Piezas 10 Pzs '
+                    'Original Nuevo Premium Versión 2024 Recargable Acero Inoxidable').split()
+description_words = ('el la de para con tu y en un una producto calidad diseño garantía envío compra uso fácil '
+                     'material resistente incluye medidas peso color modelo potencia batería capacidad ideal '
+                     'hogar oficina mayor seguridad tecnología alta duración nuestro tienda oficial factura').split()
+name_syllables = 'ma ri co tec mex ex sol pro ga la to ni ven ta mar ka ro lu in dus net shop store go ar'.split()
@@ -0,0 +1,130 @@
+import csv
+import datetime
+import os
+
+# pyarrow is optional: only needed for Parquet output
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Buffered writers for the scraper's ProductRecords. Records are kept in memory until flush(), which makes
+# everything written so far durable and returns the writer's position (CSV size in bytes, or
+# number of the last Parquet part). The checkpoint records that position with the products,
+# and a writer created with the committed position drops anything written after it.
+
+# Appends rows to the products CSV
+class CsvWriter:
+    position_key = 'csv_size'
+
+    def __init__(self, path, fieldnames, committed=None):
+        self.path = path
+        self.recovered = 0
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if committed is not None and size > committed:
+            # Rows written after the last checkpoint commit; they will be scraped again
+            with open(path, 'r+b') as f:
+                f.truncate(committed)
+                os.fsync(f.fileno())
+            self.recovered = size - committed
+        elif committed is not None and size < committed:
+            print(f"Warning: {path} is smaller than the checkpoint expects ({size} < {committed} bytes)")
+
+        # If CSV exists, append data; if not, create a new file. A CSV started before the typed
+        # columns existed keeps its header, and only its columns are written.
+        header = None
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            with open(path, newline='', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
+        if header and header != fieldnames:
+            print(f"{path} has an older header; new rows are written with its {len(header)} columns only")
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=header or fieldnames, extrasaction='ignore')
+        if not header:
+            self.writer.writeheader()  # Write header only once
+        self.buffer = []
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def write(self, records):
+        self.buffer.extend(record.to_row() for record in records)
+
+    def flush(self):
+        self.writer.writerows(self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        self.file.close()
+
+# Arrow types of the typed record fields; every other column is text
+parquet_types = {
+    'Price Value': 'float64',
+    'Discount Fraction': 'float64',
+    'Stars Value': 'float64',
+    'Reviews Count Value': 'int64',
+    'Free Shipping': 'bool_',
+}
+
+# Writes each flushed batch as a new Parquet part, with the typed record fields as numeric and
+# boolean columns next to the raw text, partitioned by scrape date:
+#   <directory>/scrape_date=YYYY-MM-DD/part-000001.parquet
+# Parts are numbered across partitions, written to a temp name and renamed once complete.
+class ParquetWriter:
+    position_key = 'parquet_part'
+
+    def __init__(self, directory, fieldnames, committed=None):
+        if pa is None:
+            raise ImportError("Parquet output requires the pyarrow package")
+        self.directory = directory
+        self.fieldnames = fieldnames
+        self.recovered = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self.part = 0
+        for part_number, path in self._parts():
+            if committed is not None and part_number > committed:
+                os.remove(path)  # Written after the last checkpoint commit
+                self.recovered += 1
+            else:
+                self.part = max(self.part, part_number)
+        self.buffer = []
+
+        fields = [pa.field(name, getattr(pa, parquet_types.get(name, 'string'))()) for name in fieldnames]
+        fields.append(pa.field('Scraped At', pa.timestamp('s')))
+        self.schema = pa.schema(fields)
+
+    def _parts(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith('part-') and name.endswith('.parquet'):
+                    yield int(name[5:-8]), os.path.join(root, name)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def write(self, records):
+        self.buffer.extend(record.to_row() for record in records)
+
+    def flush(self):
+        if self.buffer:
+            now = datetime.datetime.now().replace(microsecond=0)
+            columns = {name: [row[name] for row in self.buffer] for name in self.fieldnames}
+            columns['Scraped At'] = [now] * len(self.buffer)
+            table = pa.table(columns, schema=self.schema)
+
+            partition = os.path.join(self.directory, f'scrape_date={now:%Y-%m-%d}')
+            os.makedirs(partition, exist_ok=True)
+            self.part += 1
+            path = os.path.join(partition, f'part-{self.part:06d}.parquet')
+            pq.write_table(table, path + '.tmp', compression='zstd')
+            os.replace(path + '.tmp', path)
+            self.buffer.clear()
+        return self.part
+
+    def close(self):
+        pass